@@ -0,0 +1,122 @@
+"""Batch ingestion from the command line.
+
+Walks directories and/or a manifest of paths and extracts every PDF through
+ExtractionService, writing documents to the database in batches:
+
+    python -m app.cli ingest archive/2023 archive/2024 --concurrency 8
+    python -m app.cli ingest --manifest files.txt --checkpoint files.checkpoint
+
+With ``--llm-batch openai`` the LLM calls go to the OpenAI Batch API as one
+JSONL job per ``--batch-documents`` files, at batch pricing; results can take
+up to the completion window (24h) to arrive. Progress is checkpointed, so an interrupted run resumes where it stopped when
+started again with the same checkpoint file. Files already in the database
+(by content hash) are skipped.
+"""
+from typing import Optional
+import argparse
+import asyncio
+import logging
+import sys
+
+from app.config import settings
+
+def format_duration(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "--:--:--"
+    seconds = int(seconds)
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+def format_progress(progress) -> str:
+    elapsed = max(progress.elapsed, 1e-9)
+    return (
+        f"{progress.handled}/{progress.total} files "
+        f"({progress.completed} done, {progress.skipped} skipped, {progress.failed} failed) "
+        f"{progress.completed / elapsed:.2f} docs/s {progress.pages / elapsed:.1f} pages/s "
+        f"elapsed {format_duration(progress.elapsed)} ETA {format_duration(progress.eta_seconds())}"
+    )
+
+async def run_ingest(args: argparse.Namespace) -> int:
+    from app.services.batch_llm_service import LocalBatchBackend, OpenAIBatchBackend
+    from app.services.extraction_service import ExtractionService
+    from app.services.ingest_service import BatchIngestService, IngestCheckpoint, iter_pdf_paths
+    from app.services.storage_service import DocumentStore
+
+    paths = list(iter_pdf_paths(args.paths, args.manifest))
+    extraction_service = ExtractionService()
+    batch_backend = None
+    if args.llm_batch == "openai":
+        batch_backend = OpenAIBatchBackend()
+    elif args.llm_batch == "local":
+        batch_backend = LocalBatchBackend(extraction_service.llm_service)
+    service = BatchIngestService(
+        extraction_service,
+        DocumentStore(),
+        IngestCheckpoint(args.checkpoint),
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        retry_failed=args.retry_failed,
+        versioning=False if args.no_versioning else None,
+        llm_batch_backend=batch_backend,
+        batch_documents=args.batch_documents
+    )
+
+    interactive = sys.stderr.isatty()
+    task = asyncio.create_task(service.run(paths))
+    try:
+        while not task.done():
+            await asyncio.wait([task], timeout=args.progress_interval)
+            if task.done():
+                break
+            line = format_progress(service.progress)
+            print(f"\r{line}\033[K" if interactive else line, end="" if interactive else "\n", file=sys.stderr, flush=True)
+        progress = task.result()
+    finally:
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        extraction_service.close()
+    if interactive:
+        print(file=sys.stderr)
+    print(format_progress(progress))
+    return 1 if progress.failed else 0
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="extract PDFs from directories or a manifest into the database")
+    ingest.add_argument("paths", nargs="*", help="PDF files or directories, walked recursively")
+    ingest.add_argument("--manifest", help="file listing one PDF path per line")
+    ingest.add_argument("--checkpoint", default="ingest.checkpoint.jsonl", help="progress file used to resume")
+    ingest.add_argument("--concurrency", type=int, default=4, help="documents extracted at once")
+    ingest.add_argument("--parse-workers", type=int, default=settings.PDF_PARSE_WORKERS,
+                        help="PDF parsing processes (default: one per CPU; 0 parses in this process)")
+    ingest.add_argument("--llm-concurrency", type=int, default=settings.LLM_MAX_CONCURRENCY,
+                        help="LLM requests in flight")
+    ingest.add_argument("--batch-size", type=int, default=50, help="documents written per transaction")
+    ingest.add_argument("--retry-failed", action="store_true", help="retry files the checkpoint marks as failed")
+    ingest.add_argument("--no-versioning", action="store_true",
+                        help="do not link files to earlier documents stored under the same name (the path "
+                             "relative to the directory given, or the manifest line)")
+    ingest.add_argument("--llm-batch", choices=["openai", "local"],
+                        help="send LLM calls as batch jobs instead of interactive requests: the OpenAI Batch API, "
+                             "or run locally one at a time")
+    ingest.add_argument("--batch-documents", type=int, default=1000, help="documents per LLM batch job; each keeps its page text in memory, "
+                             "but not its file open, until the job finishes")
+    ingest.add_argument("--progress-interval", type=float, default=2.0, help="seconds between progress lines")
+    ingest.add_argument("-v", "--verbose", action="store_true", help="log each document and page")
+    args = parser.parse_args()
+    if not args.paths and not args.manifest:
+        parser.error("give at least one path or --manifest")
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    from app.database.schema import SchemaOutOfDateError, check_schema
+    try:
+        check_schema()
+    except SchemaOutOfDateError as e:
+        parser.exit(1, f"error: {e}\n")
+    settings.PDF_PARSE_WORKERS = args.parse_workers
+    settings.LLM_MAX_CONCURRENCY = args.llm_concurrency
+    sys.exit(asyncio.run(run_ingest(args)))
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict, List, Optional
 import os
 from dotenv import load_dotenv
 
@@ -12,17 +13,94 @@ class Settings(BaseSettings):
     
     # Database Configuration
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./doc_parser.db")
+    ASYNC_DATABASE_URL: Optional[str] = None  # Default: DATABASE_URL with the aiosqlite/asyncpg driver
+    SQLITE_JOURNAL_MODE: str = "WAL"  # Readers do not block the writer
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # No fsync per commit in WAL mode
+    SQLITE_BUSY_TIMEOUT_MS: int = 30000  # Wait for another process's write lock instead of failing
+    SQLITE_CACHE_SIZE_KB: int = 65536  # Page cache per connection
+    SQLITE_MMAP_SIZE: int = 256 * 1024 * 1024
+    DB_POOL_SIZE: int = 10  # Connections kept open per process (not SQLite)
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+    # Writes from requests and jobs are queued to one writer task per process,
+    # which commits up to DB_WRITE_BATCH_SIZE of them per transaction
+    DB_WRITE_BATCH_SIZE: int = 64
+    DB_WRITE_BATCH_DELAY: float = 0.005  # Seconds to wait for more writes once one is queued
     
     # OpenAI Configuration
     OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
+    LLM_MAX_CONCURRENCY: int = 4  # Pages sent to the LLM in parallel per process
+    LLM_REQUEST_TIMEOUT: float = 120.0  # Seconds per OpenAI request
+    LLM_REQUESTS_PER_MINUTE: int = 500  # Client-side limits; 0 disables
+    LLM_TOKENS_PER_MINUTE: int = 150000
+    LLM_MAX_RETRIES: int = 5
+    LLM_RETRY_BASE_DELAY: float = 1.0  # Seconds; doubled per retry, with jitter
+    LLM_RETRY_MAX_DELAY: float = 60.0
+    LLM_TOKEN_BUDGET: int = 6000  # Max estimated page-text tokens per LLM request
+    LLM_CHUNK_OVERLAP_TOKENS: int = 200  # Overlap between chunks of oversized pages
+    LLM_BATCH_MAX_PAGE_TOKENS: int = 500  # Pages this small are packed together
+    LLM_BATCH_MAX_PAGES: int = 8
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # 256MB of cached responses
+    LLM_CACHE_ACCESS_FLUSH_INTERVAL: float = 30.0  # Seconds between bulk writes of cache hit counts and access times
+    LLM_BATCH_JOB_DIR: str = "storage/batches"  # Batch API input and output files (app.cli ingest --llm-batch)
+    LLM_BATCH_JOB_COMPLETION_WINDOW: str = "24h"
+    LLM_BATCH_JOB_POLL_INTERVAL: float = 30.0  # Seconds between batch status checks
+
+    # Model cascade: requests go to the first model and move to the next when
+    # the answer fails validation (malformed JSON, a page without fields, or
+    # values not found verbatim in the text)
+    LLM_MODEL_TIERS: List[str] = ["gpt-4o-mini", "gpt-4-turbo-preview"]
+    LLM_CASCADE_MIN_FIELDS_PER_PAGE: int = 1
+    LLM_CASCADE_MIN_VERBATIM_RATIO: float = 0.8  # Share of values that must appear in the page text
+    LLM_MODEL_PRICES: Dict[str, List[float]] = {  # USD per 1M prompt and completion tokens
+        "gpt-4o-mini": [0.15, 0.60],
+        "gpt-4-turbo-preview": [10.0, 30.0]
+    }
+
+    # Rule-based pre-extraction
+    RULE_EXTRACTION_ENABLED: bool = True
+    RULE_MIN_REMAINING_CHARS: int = 40  # Skip the LLM when fewer letters/digits remain
+
+    # Take bounding boxes from PDF word positions instead of asking the LLM
+    LAYOUT_BOUNDING_BOXES: bool = True
+
+    # Tables found by column alignment are stored as rows instead of sent to the LLM
+    TABLE_EXTRACTION_ENABLED: bool = True  # Needs LAYOUT_BOUNDING_BOXES
+    TABLE_MIN_ROWS: int = 3
+    TABLE_MIN_COLUMNS: int = 3
+    TABLE_LABEL_SAMPLE_ROWS: int = 5  # Rows shown to the LLM to name a table's columns
+
+    # PDF text extraction runs in worker processes, off the event loop
+    PDF_PARSE_WORKERS: Optional[int] = None  # None = one per CPU; 0 parses in the server process
+    PDF_PARSE_PAGES_PER_TASK: int = 16  # Larger documents are split into page ranges of this size
     
     # File Upload Configuration
     MAX_UPLOAD_SIZE: int = 10 * 1024 * 1024  # 10MB
+    UPLOAD_CHUNK_SIZE: int = 1024 * 1024  # Uploads are spooled to disk in 1MB chunks
     MAX_DOCUMENTS: int = 5
     ALLOWED_EXTENSIONS: set = {"pdf"}
     
     # Temporary File Storage
     UPLOAD_DIR: str = "uploads"
+
+    # Background Ingestion
+    JOB_WORKERS: int = 2  # Documents processed concurrently by the job queue
+
+    # Re-uploads of a filename become a new version that reuses unchanged pages' fields
+    DOCUMENT_VERSIONING: bool = True
+
+    # Document storage and page rendering
+    DOCUMENT_STORE_DIR: str = "storage/documents"  # Original PDFs, by content hash
+    RENDER_CACHE_DIR: str = "storage/renders"
+    RENDER_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # 512MB of rendered page images
+    RENDER_DEFAULT_DPI: int = 100
+    RENDER_MAX_DPI: int = 300
+    RENDER_MAX_WIDTH: int = 2000  # Pixels, for thumbnails rendered by width
+
+    # Export
+    EXPORT_BATCH_SIZE: int = 10000  # Rows fetched, encoded and sent per chunk (one Parquet row group)
     
     class Config:
         case_sensitive = True
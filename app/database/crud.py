@@ -0,0 +1,249 @@
+from datetime import date
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import column, func, insert, literal_column, select, table
+from sqlalchemy.orm import Session, noload, selectinload
+from app.database import models
+from app.schemas.document import DocumentCreate
+from app.schemas.field import FieldRow
+from app.schemas.table import TableRecord
+from app.utils import metrics
+
+def insert_extracted_fields(db: Session, document_id: int, fields: List[FieldRow]) -> None:
+    """Insert extracted field rows for a document in one executemany statement.
+
+    Rows are passed to a Core insert as-is, skipping ORM object creation and
+    the unit of work. ``document_id`` is set on each row in place. The insert
+    targets the table rather than the mapped class: an ORM bulk insert leaves
+    out None values, splitting rows with and without a parsed number or date
+    into separate statements.
+    """
+    if not fields:
+        return
+    for field in fields:
+        field["document_id"] = document_id
+    with metrics.stage("db_insert"):
+        db.execute(insert(models.ExtractedField.__table__), fields)
+
+def insert_tables(db: Session, document_id: int, tables: List[TableRecord]) -> None:
+    """Insert a document's tables, each with its rows in one executemany statement."""
+    for table in tables:
+        values = {key: value for key, value in table.items() if key != "rows"}
+        result = db.execute(insert(models.ExtractedTable).values(
+            document_id=document_id, row_count=len(table["rows"]), **values
+        ))
+        table_id = result.inserted_primary_key[0]
+        if table["rows"]:
+            db.execute(insert(models.TableRow), [
+                {"table_id": table_id, "row_index": index, "cells": cells}
+                for index, cells in enumerate(table["rows"])
+            ])
+
+def insert_page_fingerprints(db: Session, document_id: int, stats: Dict[str, Any]) -> None:
+    """Record the fingerprints of a processed document's pages.
+
+    Pages whose LLM extraction failed are left out so a later version
+    extracts them again instead of reusing incomplete fields.
+    """
+    failed_pages = set(stats["failed_pages"])
+    rows = [
+        {"document_id": document_id, "page_number": page_number, "fingerprint": fingerprint}
+        for page_number, fingerprint in enumerate(stats["page_fingerprints"], 1)
+        if page_number not in failed_pages
+    ]
+    if rows:
+        db.execute(insert(models.PageFingerprint), rows)
+
+def create_document(
+    db: Session,
+    document: DocumentCreate,
+    stats: Dict[str, Any],
+    fields: List[FieldRow],
+    content_hash: Optional[str] = None,
+    previous_version: Optional[models.Document] = None,
+    tables: Optional[List[TableRecord]] = None
+) -> models.Document:
+    """Add a processed document and bulk-insert its fields and tables, without committing."""
+    db_document = models.Document(
+        filename=document.filename,
+        total_pages=document.total_pages,
+        llm_requests=stats["requests"],
+        prompt_tokens=stats["prompt_tokens"],
+        completion_tokens=stats["completion_tokens"],
+        content_hash=content_hash,
+        version=previous_version.version + 1 if previous_version else 1,
+        previous_version_id=previous_version.id if previous_version else None
+    )
+    db.add(db_document)
+    db.flush()  # Get the document ID
+    insert_extracted_fields(db, db_document.id, fields)
+    insert_tables(db, db_document.id, tables or [])
+    insert_page_fingerprints(db, db_document.id, stats)
+    return db_document
+
+def find_previous_version(db: Session, filename: str, before_id: Optional[int] = None) -> Optional[models.Document]:
+    """Return the latest document uploaded under ``filename``, if any.
+
+    ``before_id`` excludes that document and later ones, for a document that
+    is already being recorded.
+    """
+    query = db.query(models.Document).filter(models.Document.filename == filename)
+    if before_id is not None:
+        query = query.filter(models.Document.id < before_id)
+    return query.order_by(models.Document.id.desc()).first()
+
+def ingested_content_hashes(db: Session) -> Set[str]:
+    """Content hashes of every stored document, for skipping files already ingested."""
+    return set(db.scalars(
+        select(models.Document.content_hash).where(models.Document.content_hash.isnot(None))
+    ))
+
+REUSABLE_FIELD_COLUMNS = (
+    "field_name", "field_value", "description", "bounding_box_x", "bounding_box_y",
+    "bounding_box_width", "bounding_box_height", "section_name", "page_number",
+    "value_number", "value_date"
+)
+
+def reusable_page_fields(db: Session, document: Optional[models.Document]) -> Optional[Dict[str, List[FieldRow]]]:
+    """Map each fingerprinted page of ``document`` to its fields.
+
+    The result is passed to ``ExtractionService.process_document`` so pages
+    that did not change in a new version keep their fields without being
+    extracted again.
+    """
+    if document is None:
+        return None
+    fingerprints = dict(db.execute(
+        select(models.PageFingerprint.page_number, models.PageFingerprint.fingerprint)
+        .where(models.PageFingerprint.document_id == document.id)
+        .order_by(models.PageFingerprint.page_number.desc())
+    ).all())
+    # Identical pages share a fingerprint; the first one supplies the fields
+    first_pages = {fingerprint: page_number for page_number, fingerprint in fingerprints.items()}
+    fingerprints = {page_number: fingerprint for fingerprint, page_number in first_pages.items()}
+    pages: Dict[str, List[FieldRow]] = {fingerprint: [] for fingerprint in first_pages}
+    rows = db.execute(
+        select(*(getattr(models.ExtractedField, name) for name in REUSABLE_FIELD_COLUMNS))
+        .where(models.ExtractedField.document_id == document.id)
+        .order_by(models.ExtractedField.page_number, models.ExtractedField.id)
+    ).mappings()
+    for row in rows:
+        fingerprint = fingerprints.get(row["page_number"])
+        if fingerprint is not None:
+            pages[fingerprint].append(dict(row))
+    return pages
+
+def _keyset_page(rows: List[Any], limit: int) -> Tuple[List[Any], Optional[int]]:
+    """Trim a ``limit + 1`` row fetch to ``limit`` and return the next cursor."""
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1].id
+    return rows, None
+
+def list_documents(
+    db: Session,
+    limit: int,
+    after_id: Optional[int] = None,
+    include_fields: bool = False
+) -> Tuple[List[models.Document], Optional[int]]:
+    """Return up to ``limit`` documents with ID greater than ``after_id``.
+
+    Pages are keyed on the primary key, so each page is an index range scan
+    regardless of how deep it is. Fields are loaded for the whole page in one
+    extra query when ``include_fields`` is set and not loaded at all otherwise.
+    """
+    query = db.query(models.Document).options(
+        selectinload(models.Document.extracted_fields) if include_fields
+        else noload(models.Document.extracted_fields)
+    )
+    if after_id is not None:
+        query = query.filter(models.Document.id > after_id)
+    documents = query.order_by(models.Document.id).limit(limit + 1).all()
+    return _keyset_page(documents, limit)
+
+def list_document_summaries(
+    db: Session,
+    limit: int,
+    after_id: Optional[int] = None
+) -> Tuple[List[Any], Optional[int]]:
+    """Like ``list_documents`` but selects only summary columns and a field count.
+
+    The count is a correlated subquery answered from the
+    ``(document_id, page_number)`` index, without touching field rows.
+    """
+    field_count = (
+        select(func.count())
+        .where(models.ExtractedField.document_id == models.Document.id)
+        .correlate(models.Document)
+        .scalar_subquery()
+    )
+    query = db.query(
+        models.Document.id,
+        models.Document.filename,
+        models.Document.total_pages,
+        models.Document.upload_date,
+        field_count.label("field_count")
+    )
+    if after_id is not None:
+        query = query.filter(models.Document.id > after_id)
+    rows = query.order_by(models.Document.id).limit(limit + 1).all()
+    return _keyset_page(rows, limit)
+
+def fts_query(text: str) -> str:
+    """Quote each term of free text so FTS5 matches all of them literally."""
+    return " ".join('"' + term.replace('"', '""') + '"' for term in text.split())
+
+def search_fields(
+    db: Session,
+    limit: int,
+    after_id: Optional[int] = None,
+    q: Optional[str] = None,
+    field_name: Optional[str] = None,
+    value: Optional[str] = None,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    document_id: Optional[int] = None
+) -> Tuple[List[Tuple[models.ExtractedField, str]], Optional[int]]:
+    """Return a page of fields matching every given criterion, with their filenames.
+
+    ``q`` is matched against field names, values and descriptions through
+    the FTS5 index on SQLite (a substring match elsewhere). The structured
+    filters are served by the ``field_name`` composite indexes.
+    """
+    Field = models.ExtractedField
+    query = db.query(Field, models.Document.filename).join(models.Document)
+
+    if q:
+        if db.get_bind().dialect.name == "sqlite":
+            fts = table(models.FIELD_SEARCH_TABLE, column("rowid"))
+            query = query.filter(Field.id.in_(
+                select(fts.c.rowid).where(
+                    literal_column(models.FIELD_SEARCH_TABLE).op("MATCH")(fts_query(q))
+                )
+            ))
+        else:
+            for term in q.split():
+                query = query.filter(Field.field_value.ilike(f"%{term}%"))
+    if field_name is not None:
+        query = query.filter(Field.field_name == field_name)
+    if value is not None:
+        query = query.filter(Field.field_value == value)
+    if min_value is not None:
+        query = query.filter(Field.value_number >= min_value)
+    if max_value is not None:
+        query = query.filter(Field.value_number <= max_value)
+    if date_from is not None:
+        query = query.filter(Field.value_date >= date_from)
+    if date_to is not None:
+        query = query.filter(Field.value_date <= date_to)
+    if document_id is not None:
+        query = query.filter(Field.document_id == document_id)
+    if after_id is not None:
+        query = query.filter(Field.id > after_id)
+
+    rows = query.order_by(Field.id).limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, rows[-1][0].id
+    return rows, None
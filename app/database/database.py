@@ -1,12 +1,55 @@
-from sqlalchemy import create_engine
+from typing import Any, Dict, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from app.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {}
-)
+# Async drivers for the sync URL schemes DATABASE_URL is usually given in
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def engine_options(url: str) -> Dict[str, Any]:
+    """Connection settings: SQLite connections are shared across threads, other databases are pooled."""
+    if is_sqlite(url):
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True
+    }
+
+def set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Tune each new SQLite connection for concurrent readers and writers.
+
+    In WAL mode readers do not block the writer or each other, and with
+    ``synchronous=NORMAL`` commits skip the fsync (the database stays
+    consistent; a power cut can lose the last commits). The busy timeout
+    makes a connection wait for another process's write lock instead of
+    failing with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+    cursor.execute(f"PRAGMA cache_size={-int(settings.SQLITE_CACHE_SIZE_KB)}")
+    cursor.execute(f"PRAGMA mmap_size={int(settings.SQLITE_MMAP_SIZE)}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+if is_sqlite(settings.DATABASE_URL):
+    event.listen(engine, "connect", set_sqlite_pragmas)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -19,3 +62,33 @@ def get_db():
         yield db
     finally:
         db.close()
+
+def async_database_url(url: str) -> str:
+    """``url`` with its async driver (aiosqlite or asyncpg), unless ASYNC_DATABASE_URL is set."""
+    if settings.ASYNC_DATABASE_URL:
+        return settings.ASYNC_DATABASE_URL
+    parsed = make_url(url)
+    if parsed.drivername in ASYNC_DRIVERS:
+        parsed = parsed.set(drivername=ASYNC_DRIVERS[parsed.drivername])
+    return parsed.render_as_string(hide_password=False)
+
+_async_engine: Optional[AsyncEngine] = None
+
+def get_async_engine() -> AsyncEngine:
+    """The async engine, created on first use so only the API needs the async driver installed."""
+    global _async_engine
+    if _async_engine is None:
+        url = async_database_url(settings.DATABASE_URL)
+        _async_engine = create_async_engine(url, **engine_options(url))
+        if is_sqlite(url):
+            event.listen(_async_engine.sync_engine, "connect", set_sqlite_pragmas)
+    return _async_engine
+
+def async_session() -> AsyncSession:
+    """A new async session. Objects stay loaded after commit, as they cannot lazy-load."""
+    return AsyncSession(get_async_engine(), autoflush=False, expire_on_commit=False)
+
+# Async dependency
+async def get_async_db():
+    async with async_session() as db:
+        yield db
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Float, JSON
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Float, JSON, Text, Index, DDL, event
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.database.database import Base
@@ -10,8 +10,17 @@ class Document(Base):
     filename = Column(String, index=True)
     upload_date = Column(DateTime, default=datetime.utcnow)
     total_pages = Column(Integer)
+    llm_requests = Column(Integer, default=0)
+    prompt_tokens = Column(Integer, default=0)
+    completion_tokens = Column(Integer, default=0)
+    content_hash = Column(String, index=True, nullable=True)  # sha256 of the PDF in the document store
+    # Re-uploads of a filename form a version chain
+    version = Column(Integer, default=1)
+    previous_version_id = Column(Integer, ForeignKey("documents.id"), index=True, nullable=True)
     
     extracted_fields = relationship("ExtractedField", back_populates="document")
+    page_fingerprints = relationship("PageFingerprint", back_populates="document")
+    tables = relationship("ExtractedTable", back_populates="document")
 
 class ExtractedField(Base):
     __tablename__ = "extracted_fields"
@@ -27,5 +36,143 @@ class ExtractedField(Base):
     bounding_box_height = Column(Float)
     section_name = Column(String)
     page_number = Column(Integer)
+    # Normalized copies of field_value for range queries, when it parses
+    value_number = Column(Float, nullable=True)
+    value_date = Column(Date, nullable=True)
 
     document = relationship("Document", back_populates="extracted_fields")
+
+    __table_args__ = (
+        # Serves lookups by document (leftmost prefix) and by document page
+        Index("ix_extracted_fields_document_id_page_number", "document_id", "page_number"),
+        # Serve search by field name with an exact value or a value range
+        Index("ix_extracted_fields_field_name_field_value", "field_name", "field_value"),
+        Index("ix_extracted_fields_field_name_value_number", "field_name", "value_number"),
+        Index("ix_extracted_fields_field_name_value_date", "field_name", "value_date"),
+    )
+
+# Full-text index over extracted fields (SQLite only). An external-content
+# FTS5 table stores just the inverted index; triggers keep it in sync with
+# extracted_fields as rows are inserted, updated and deleted.
+FIELD_SEARCH_TABLE = "extracted_fields_fts"
+FIELD_SEARCH_DDL = (
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FIELD_SEARCH_TABLE} USING fts5(
+        field_name, field_value, description,
+        content='extracted_fields', content_rowid='id'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS extracted_fields_fts_insert AFTER INSERT ON extracted_fields BEGIN
+        INSERT INTO {FIELD_SEARCH_TABLE}(rowid, field_name, field_value, description)
+        VALUES (new.id, new.field_name, new.field_value, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS extracted_fields_fts_delete AFTER DELETE ON extracted_fields BEGIN
+        INSERT INTO {FIELD_SEARCH_TABLE}({FIELD_SEARCH_TABLE}, rowid, field_name, field_value, description)
+        VALUES ('delete', old.id, old.field_name, old.field_value, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS extracted_fields_fts_update AFTER UPDATE ON extracted_fields BEGIN
+        INSERT INTO {FIELD_SEARCH_TABLE}({FIELD_SEARCH_TABLE}, rowid, field_name, field_value, description)
+        VALUES ('delete', old.id, old.field_name, old.field_value, old.description);
+        INSERT INTO {FIELD_SEARCH_TABLE}(rowid, field_name, field_value, description)
+        VALUES (new.id, new.field_name, new.field_value, new.description);
+    END""",
+)
+
+for statement in FIELD_SEARCH_DDL:
+    event.listen(ExtractedField.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+
+class ExtractedTable(Base):
+    """A table detected on a page; its rows are stored in ``table_rows``."""
+    __tablename__ = "extracted_tables"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"))
+    page_number = Column(Integer)
+    section_name = Column(String)
+    columns = Column(JSON)  # Column names, labeled by the LLM
+    header = Column(JSON, nullable=True)  # Header row as printed, if any
+    row_count = Column(Integer)
+    bounding_box_x = Column(Float)
+    bounding_box_y = Column(Float)
+    bounding_box_width = Column(Float)
+    bounding_box_height = Column(Float)
+
+    document = relationship("Document", back_populates="tables")
+    rows = relationship("TableRow", order_by="TableRow.row_index")
+
+    __table_args__ = (
+        Index("ix_extracted_tables_document_id_page_number", "document_id", "page_number"),
+    )
+
+class TableRow(Base):
+    """One table row, stored compactly as a JSON array of cell values."""
+    __tablename__ = "table_rows"
+
+    id = Column(Integer, primary_key=True)
+    table_id = Column(Integer, ForeignKey("extracted_tables.id"), index=True)
+    row_index = Column(Integer)
+    cells = Column(JSON)
+
+class PageFingerprint(Base):
+    """Hash of a page's extracted text, recorded for pages extracted without errors.
+
+    A later version of the document reuses the fields of any page whose
+    fingerprint it already has.
+    """
+    __tablename__ = "page_fingerprints"
+
+    id = Column(Integer, primary_key=True, index=True)
+    document_id = Column(Integer, ForeignKey("documents.id"))
+    page_number = Column(Integer)
+    fingerprint = Column(String)  # sha256 of the cleaned page text
+
+    document = relationship("Document", back_populates="page_fingerprints")
+
+    __table_args__ = (
+        Index("ix_page_fingerprints_document_id_page_number", "document_id", "page_number", unique=True),
+    )
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    filename = Column(String)
+    status = Column(String, index=True, default="queued")
+    file_path = Column(String)
+    document_id = Column(Integer, ForeignKey("documents.id"), nullable=True)
+    total_pages = Column(Integer, nullable=True)
+    pages_completed = Column(Integer, default=0)
+    error = Column(String, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    document = relationship("Document")
+    pages = relationship(
+        "IngestionJobPage",
+        back_populates="job",
+        order_by="IngestionJobPage.page_number",
+        cascade="all, delete-orphan"
+    )
+
+class IngestionJobPage(Base):
+    __tablename__ = "ingestion_job_pages"
+
+    id = Column(Integer, primary_key=True, index=True)
+    job_id = Column(Integer, ForeignKey("ingestion_jobs.id"), index=True)
+    page_number = Column(Integer)
+    status = Column(String)
+    field_count = Column(Integer, default=0)
+    error = Column(String, nullable=True)
+    completed_at = Column(DateTime, default=datetime.utcnow)
+
+    job = relationship("IngestionJob", back_populates="pages")
+
+class LLMCacheEntry(Base):
+    __tablename__ = "llm_cache"
+
+    key = Column(String, primary_key=True)  # sha256 of model, prompt version and page text
+    model = Column(String)
+    prompt_version = Column(String)
+    response = Column(Text)  # JSON-encoded list of extracted fields
+    size_bytes = Column(Integer)
+    hits = Column(Integer, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    last_accessed = Column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,41 @@
+"""Schema management through Alembic.
+
+Tables are created and changed only by migrations (``alembic upgrade
+head``), not when the app is imported. The API and CLI check at startup
+that the database is at the latest revision, so an out-of-date database
+fails fast with a clear message instead of on its first query.
+"""
+import os
+
+from sqlalchemy.engine import Engine
+from app.database.database import engine as default_engine
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "alembic.ini")
+
+class SchemaOutOfDateError(RuntimeError):
+    """The database is not at the latest migration."""
+
+def _alembic_config():
+    from alembic.config import Config
+
+    return Config(ALEMBIC_INI)
+
+def check_schema(engine: Engine = default_engine) -> None:
+    """Raise ``SchemaOutOfDateError`` unless the database is at the latest migration."""
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    heads = set(ScriptDirectory.from_config(_alembic_config()).get_heads())
+    with engine.connect() as connection:
+        current = set(MigrationContext.configure(connection).get_current_heads())
+    if current != heads:
+        raise SchemaOutOfDateError(
+            f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, "
+            f"expected {', '.join(sorted(heads))}: run `alembic upgrade head`"
+        )
+
+def upgrade_schema() -> None:
+    """Migrate the database in DATABASE_URL to the latest revision, creating it if empty."""
+    from alembic import command
+
+    command.upgrade(_alembic_config(), "head")
@@ -0,0 +1,122 @@
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
+import asyncio
+import logging
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database.database import async_session
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# A queued write and the future its result is delivered to
+Write = Tuple[Callable[[Session], Any], asyncio.Future]
+
+class DatabaseWriter:
+    """Runs the process's database writes on one task, many per transaction.
+
+    A write is a function taking a sync ``Session`` that adds or inserts
+    rows without committing and returns plain values such as new IDs. Once
+    a write is queued the writer waits up to ``max_delay`` for others and
+    commits up to ``max_batch`` of them together, so concurrent requests
+    share one transaction instead of each taking SQLite's write lock. Writes
+    run in the order they were queued. If a batch fails, its writes are
+    retried one per transaction so one bad write does not fail the rest.
+
+    The writer task starts with the first write; ``stop`` finishes the
+    queued writes.
+    """
+
+    def __init__(
+        self,
+        max_batch: Optional[int] = None,
+        max_delay: Optional[float] = None,
+        session_factory: Callable[[], AsyncSession] = async_session
+    ):
+        self.max_batch = max_batch or settings.DB_WRITE_BATCH_SIZE
+        self.max_delay = settings.DB_WRITE_BATCH_DELAY if max_delay is None else max_delay
+        self.session_factory = session_factory
+        self.queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def qsize(self) -> int:
+        return self.queue.qsize() if self.queue else 0
+
+    def submit_nowait(self, write: Callable[[Session], T]) -> "asyncio.Future[T]":
+        """Queue a write and return a future for its result, without waiting."""
+        if self._task is None or self._task.done():
+            self.queue = asyncio.Queue()
+            self._task = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((write, future))
+        return future
+
+    async def submit(self, write: Callable[[Session], T]) -> T:
+        """Queue a write and wait until it is committed; returns its result."""
+        return await self.submit_nowait(write)
+
+    async def stop(self) -> None:
+        """Commit the writes queued so far and stop the writer task."""
+        if self._task is None:
+            return
+        await self.queue.join()
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def _next_batch(self) -> List[Write]:
+        batch = [await self.queue.get()]
+        deadline = time.perf_counter() + self.max_delay
+        while len(batch) < self.max_batch:
+            if self.queue.empty():
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                batch.append(self.queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            try:
+                await self._commit(batch)
+            except Exception as e:
+                if len(batch) == 1:
+                    self._set_exception(batch[0], e)
+                else:
+                    logger.warning(f"Batch of {len(batch)} writes failed, writing one at a time: {str(e)}")
+                    for write in batch:
+                        try:
+                            await self._commit([write])
+                        except Exception as e:
+                            self._set_exception(write, e)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    async def _commit(self, batch: List[Write]) -> None:
+        async with self.session_factory() as db:
+            results = []
+            for write, future in batch:
+                results.append(await db.run_sync(write))
+            with metrics.stage("db_commit"):
+                await db.commit()
+        metrics.DB_WRITE_BATCH.observe(len(batch))
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    @staticmethod
+    def _set_exception(write: Write, error: Exception) -> None:
+        future = write[1]
+        if not future.done():
+            future.set_exception(error)
@@ -1,26 +1,104 @@
-from fastapi import FastAPI, UploadFile, File, Depends, HTTPException
+from fastapi import FastAPI, UploadFile, File, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.responses import FileResponse, PlainTextResponse, StreamingResponse
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
+from contextlib import asynccontextmanager
+from typing import List, Optional
+from datetime import date, datetime
+import asyncio
 import shutil
 import os
 import logging
+import tempfile
+import time
 import traceback
 
-from app.database.database import get_db, engine
+from app.database.database import get_async_db, get_db
 from app.database import models
-from app.schemas.document import Document, DocumentCreate, ExtractedField
+from app.database.schema import check_schema
+from app.database.writer import DatabaseWriter
+from app.database.crud import (
+    create_document, find_previous_version, list_document_summaries, list_documents, reusable_page_fields,
+    search_fields
+)
+from app.schemas.document import Document, DocumentCreate, DocumentPage, DocumentSummaryPage, ExtractedField
+from app.schemas.job import Job, JobDetail
+from app.schemas.search import SearchHit, SearchPage
+from app.schemas.table import Table
+from app.services.export_service import EXPORT_FORMATS, ExportService, parquet_available
 from app.services.extraction_service import ExtractionService
+from app.services.job_service import JobService
+from app.services.render_service import RENDER_FORMATS, RenderService
+from app.services.storage_service import DocumentStore
+from app.services.stream_service import UploadStreamService
+from app.utils import metrics
 from app.config import settings
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+class Services:
+    """The API's long-lived services, created once per server process at startup.
+
+    Building them starts LLM threads and PDF parse workers, so it happens in
+    ``lifespan`` rather than on every import of ``app.main``.
+    """
+
+    def __init__(self, extraction_service: Optional[ExtractionService] = None):
+        self.extraction_service = extraction_service or ExtractionService()
+        self.document_store = DocumentStore()
+        self.database_writer = DatabaseWriter()
+        self.job_service = JobService(
+            self.extraction_service, self.document_store, database_writer=self.database_writer
+        )
+        self.export_service = ExportService()
+        self.render_service = RenderService(self.document_store)
+        self.upload_stream_service = UploadStreamService(
+            self.extraction_service, self.document_store, self.database_writer
+        )
+
+    async def start(self) -> None:
+        if self.extraction_service.parse_pool:
+            await self.extraction_service.parse_pool.start()
+        await self.job_service.start()
+
+        # Gauges read at scrape time
+        rate_limiter = self.extraction_service.llm_service.rate_limiter
+        metrics.LLM_IN_FLIGHT.set_function(lambda: rate_limiter.concurrency.in_flight)
+        metrics.LLM_CONCURRENCY_LIMIT.set_function(lambda: int(rate_limiter.concurrency.limit))
+        metrics.DB_WRITE_QUEUE_DEPTH.set_function(self.database_writer.qsize)
+        metrics.JOB_QUEUE_DEPTH.set_function(
+            lambda: self.job_service.queue.qsize() if self.job_service.queue else 0
+        )
+        metrics.RENDER_CACHE_BYTES.set_function(lambda: self.render_service.cache.stats()["total_bytes"])
+
+    async def stop(self) -> None:
+        await self.job_service.stop()
+        await self.database_writer.stop()
+        self.extraction_service.close()
 
-app = FastAPI(title=settings.PROJECT_NAME)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Check the database schema, then start the services for the server's lifetime.
+
+    Services already on ``app.state.services`` are used as given (e.g. with
+    a fake LLM, by ``benchmarks.serve``).
+    """
+    check_schema()
+    if getattr(app.state, "services", None) is None:
+        app.state.services = Services()
+    await app.state.services.start()
+    try:
+        yield
+    finally:
+        await app.state.services.stop()
+
+app = FastAPI(title=settings.PROJECT_NAME, lifespan=lifespan)
 
 # Configure CORS
 app.add_middleware(
@@ -31,13 +109,87 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize services
-extraction_service = ExtractionService()
+# Dependency
+def get_services(request: Request) -> Services:
+    return request.app.state.services
+
+class TraceMiddleware:
+    """Record per-stage timings for requests sent with ``X-Trace: 1`` or ``?trace=1``.
+
+    The stages are returned in a ``Server-Timing`` header and logged. For
+    streamed responses only the work done before the first byte is included.
+    This is plain ASGI: untraced requests, including SSE streams and
+    exports, are passed through without wrapping their messages.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    @staticmethod
+    def is_traced(scope: Scope) -> bool:
+        if Headers(scope=scope).get("x-trace") == "1":
+            return True
+        query_string = scope.get("query_string", b"")
+        return b"trace" in query_string and QueryParams(query_string).get("trace") == "1"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.is_traced(scope):
+            await self.app(scope, receive, send)
+            return
+
+        trace = metrics.Trace()
+        token = metrics.current_trace.set(trace)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                metrics.observe_stage("request", time.perf_counter() - started)
+                MutableHeaders(scope=message).append("Server-Timing", trace.server_timing())
+                logger.info(f"Trace {scope['method']} {scope['path']}: {trace.summary()}")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            metrics.current_trace.reset(token)
+
+app.add_middleware(TraceMiddleware)
+
+async def spool_upload(file: UploadFile) -> str:
+    """Stream an uploaded file to a spool file in chunks and return its path.
+
+    Non-PDF files are rejected up front and oversized files as soon as the
+    limit is crossed, so at most one chunk per upload is held in memory.
+    """
+    if not file.filename.endswith('.pdf'):
+        raise HTTPException(
+            status_code=400,
+            detail=f"File {file.filename} is not a PDF"
+        )
+
+    os.makedirs(settings.UPLOAD_DIR, exist_ok=True)
+    spool = tempfile.NamedTemporaryFile(dir=settings.UPLOAD_DIR, suffix=".pdf", delete=False)
+    try:
+        with spool, metrics.stage("spool"):
+            size = 0
+            while chunk := await file.read(settings.UPLOAD_CHUNK_SIZE):
+                size += len(chunk)
+                if size > settings.MAX_UPLOAD_SIZE:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"File {file.filename} exceeds maximum size of {settings.MAX_UPLOAD_SIZE/1024/1024}MB"
+                    )
+                spool.write(chunk)
+    except BaseException:
+        os.remove(spool.name)
+        raise
+    return spool.name
 
 @app.post("/api/upload", response_model=List[Document])
 async def upload_documents(
     files: List[UploadFile] = File(...),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db),
+    services: Services = Depends(get_services)
 ):
     """Upload and process multiple PDF documents."""
     try:
@@ -47,57 +199,49 @@ async def upload_documents(
                 detail=f"Maximum {settings.MAX_DOCUMENTS} documents allowed per upload"
             )
 
-        processed_files = []
+        document_ids = []
         for file in files:
             try:
-                if not file.filename.endswith('.pdf'):
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"File {file.filename} is not a PDF"
-                    )
-
-                # Read file content
-                content = await file.read()
-                if len(content) > settings.MAX_UPLOAD_SIZE:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"File {file.filename} exceeds maximum size of {settings.MAX_UPLOAD_SIZE/1024/1024}MB"
-                    )
+                # Spool file content to disk
+                file_path = await spool_upload(file)
 
                 logger.info(f"Processing file: {file.filename}")
                 
-                # Process document
-                result = await extraction_service.process_document(content, file.filename)
+                # Process document, reusing unchanged pages of its previous version
+                previous = None
+                if settings.DOCUMENT_VERSIONING:
+                    previous = await db.run_sync(find_previous_version, file.filename)
+                previous_pages = await db.run_sync(reusable_page_fields, previous)
+                # Release the connection while the document is extracted
+                await db.commit()
+                try:
+                    result = await services.extraction_service.process_document(
+                        file_path, file.filename, previous_pages=previous_pages
+                    )
+                    # Keep the original for page rendering
+                    if "error" in result:
+                        content_hash = None
+                    else:
+                        with metrics.stage("store"):
+                            content_hash = await asyncio.to_thread(services.document_store.put, file_path)
+                finally:
+                    if os.path.exists(file_path):
+                        os.remove(file_path)
                 if "error" in result:
                     logger.error(f"Error processing document {file.filename}: {result['error']}")
                     raise HTTPException(status_code=400, detail=result["error"])
 
-                # Create document in database
-                db_document = models.Document(
-                    filename=result["document"].filename,
-                    total_pages=result["document"].total_pages
-                )
-                db.add(db_document)
-                db.flush()  # Get the document ID
-
-                # Create extracted fields
-                for field in result["extracted_fields"]:
-                    db_field = models.ExtractedField(
-                        document_id=db_document.id,
-                        field_name=field.field_name,
-                        field_value=field.field_value,
-                        description=field.description,
-                        bounding_box_x=field.bounding_box.x,
-                        bounding_box_y=field.bounding_box.y,
-                        bounding_box_width=field.bounding_box.width,
-                        bounding_box_height=field.bounding_box.height,
-                        section_name=field.section_name,
-                        page_number=field.page_number
-                    )
-                    db.add(db_field)
+                def write(session: Session) -> int:
+                    return create_document(
+                        session, result["document"], result["stats"], result["extracted_fields"], content_hash, previous,
+                        result["tables"]
+                    ).id
 
-                db.commit()
-                processed_files.append(db_document)
+                # Write each document before the next is processed, so a later
+                # file with the same name finds it as its previous version.
+                # The writer shares the transaction with concurrent requests.
+                with metrics.stage("db_write"):
+                    document_ids.append(await services.database_writer.submit(write))
                 logger.info(f"Successfully processed document: {file.filename}")
 
             except Exception as e:
@@ -108,7 +252,13 @@ async def upload_documents(
                     detail=f"Error processing file {file.filename}: {str(e)}"
                 )
 
-        return processed_files
+        documents = await db.scalars(
+            select(models.Document)
+            .options(selectinload(models.Document.extracted_fields))
+            .where(models.Document.id.in_(document_ids))
+            .order_by(models.Document.id)
+        )
+        return documents.all()
 
     except Exception as e:
         logger.error(f"Upload error: {str(e)}")
@@ -118,10 +268,206 @@ async def upload_documents(
             detail=f"Upload error: {str(e)}"
         )
 
-@app.get("/api/documents", response_model=List[Document])
-def list_documents(db: Session = Depends(get_db)):
-    """List all processed documents."""
-    return db.query(models.Document).all()
+@app.post("/api/upload/stream")
+async def upload_documents_stream(
+    files: List[UploadFile] = File(...),
+    services: Services = Depends(get_services)
+):
+    """Upload and process PDF documents, streaming results as Server-Sent Events.
+
+    Each page's fields are sent as soon as the page is extracted, followed
+    by the saved document with per-stage timings.
+    """
+    if len(files) > settings.MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.MAX_DOCUMENTS} documents allowed per upload"
+        )
+
+    # Spool everything before responding; the uploads are closed once the
+    # handler returns, while the stream keeps running
+    uploads = []
+    try:
+        for file in files:
+            uploads.append((await spool_upload(file), file.filename))
+    except BaseException:
+        for path, _ in uploads:
+            os.remove(path)
+        raise
+
+    return StreamingResponse(
+        services.upload_stream_service.stream(uploads),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.post("/api/jobs", response_model=List[Job], status_code=202)
+async def submit_jobs(
+    files: List[UploadFile] = File(...),
+    services: Services = Depends(get_services)
+):
+    """Queue PDF documents for background processing and return their job IDs."""
+    if len(files) > settings.MAX_DOCUMENTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {settings.MAX_DOCUMENTS} documents allowed per upload"
+        )
+
+    uploads = []
+    try:
+        for file in files:
+            uploads.append((await spool_upload(file), file.filename))
+        return await services.job_service.submit(uploads)
+    except BaseException:
+        for path, _ in uploads:
+            if os.path.exists(path):
+                os.remove(path)
+        raise
+
+@app.get("/api/jobs", response_model=List[Job])
+def list_jobs(status: Optional[str] = None, db: Session = Depends(get_db)):
+    """List ingestion jobs, optionally filtered by status."""
+    query = db.query(models.IngestionJob)
+    if status:
+        query = query.filter(models.IngestionJob.status == status)
+    return query.order_by(models.IngestionJob.id.desc()).all()
+
+@app.get("/api/jobs/{job_id}", response_model=JobDetail)
+def get_job(job_id: int, db: Session = Depends(get_db)):
+    """Get job progress, per-page status and the fields extracted so far."""
+    job = db.query(models.IngestionJob).filter(models.IngestionJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    fields = []
+    if job.document_id is not None:
+        fields = db.query(models.ExtractedField).filter(
+            models.ExtractedField.document_id == job.document_id
+        ).order_by(models.ExtractedField.page_number, models.ExtractedField.id).all()
+
+    detail = JobDetail.model_validate(job)
+    detail.extracted_fields = [ExtractedField.model_validate(field) for field in fields]
+    return detail
+
+@app.get("/api/llm/stats")
+def get_llm_stats(services: Services = Depends(get_services)):
+    """Get LLM result cache, throttling and per-model-tier counters."""
+    llm_service = services.extraction_service.llm_service
+    return {
+        "cache": llm_service.cache.stats() if llm_service.cache else None,
+        "rate_limiter": llm_service.rate_limiter.stats(),
+        "tiers": llm_service.cascade.stats()
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Expose stage latencies and counters in the Prometheus text format."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/search", response_model=SearchPage)
+def search(
+    q: Optional[str] = None,
+    field_name: Optional[str] = None,
+    value: Optional[str] = None,
+    min_value: Optional[float] = None,
+    max_value: Optional[float] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    document_id: Optional[int] = None,
+    limit: int = Query(50, ge=1, le=500),
+    after_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """Search extracted fields by text, exact value, numeric range or date range.
+
+    All given criteria must match. ``min_value``/``max_value`` and
+    ``date_from``/``date_to`` compare against the parsed number or date of
+    each field's value.
+    """
+    criteria = (q, field_name, value, min_value, max_value, date_from, date_to, document_id)
+    if all(criterion is None for criterion in criteria) or (q is not None and not q.strip()):
+        raise HTTPException(status_code=400, detail="No search criteria given")
+
+    rows, next_after_id = search_fields(
+        db, limit, after_id,
+        q=q,
+        field_name=field_name,
+        value=value,
+        min_value=min_value,
+        max_value=max_value,
+        date_from=date_from,
+        date_to=date_to,
+        document_id=document_id
+    )
+    return SearchPage(
+        items=[
+            SearchHit(**ExtractedField.model_validate(field).model_dump(), filename=filename)
+            for field, filename in rows
+        ],
+        next_after_id=next_after_id
+    )
+
+@app.get("/api/export")
+def export_fields(
+    export_format: str = Query("ndjson", alias="format"),
+    document_id: Optional[List[int]] = Query(None),
+    field_name: Optional[str] = None,
+    uploaded_from: Optional[datetime] = None,
+    uploaded_to: Optional[datetime] = None,
+    services: Services = Depends(get_services)
+):
+    """Stream extracted fields as NDJSON, CSV or Parquet.
+
+    Filter by one or more ``document_id``, ``field_name`` and document upload
+    date. Rows are ordered by document and sent in batches as they are read.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported export format. Use one of: {', '.join(EXPORT_FORMATS)}"
+        )
+    if export_format == "parquet" and not parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires pyarrow to be installed")
+
+    content = services.export_service.export(
+        export_format,
+        document_ids=document_id,
+        field_name=field_name,
+        uploaded_from=uploaded_from,
+        uploaded_to=uploaded_to
+    )
+    return StreamingResponse(
+        content,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="fields.{export_format}"'}
+    )
+
+@app.get("/api/documents", response_model=DocumentPage)
+def get_documents(
+    limit: int = Query(50, ge=1, le=500),
+    after_id: Optional[int] = None,
+    include_fields: bool = False,
+    db: Session = Depends(get_db)
+):
+    """List processed documents, one page at a time.
+
+    Fields are only embedded when ``include_fields`` is set.
+    """
+    documents, next_after_id = list_documents(db, limit, after_id, include_fields)
+    return DocumentPage(
+        items=[Document.model_validate(document) for document in documents],
+        next_after_id=next_after_id
+    )
+
+@app.get("/api/documents/summary", response_model=DocumentSummaryPage)
+def get_document_summaries(
+    limit: int = Query(100, ge=1, le=1000),
+    after_id: Optional[int] = None,
+    db: Session = Depends(get_db)
+):
+    """List document summaries with field counts, one page at a time."""
+    rows, next_after_id = list_document_summaries(db, limit, after_id)
+    return DocumentSummaryPage(items=rows, next_after_id=next_after_id)
 
 @app.get("/api/documents/{doc_id}", response_model=Document)
 def get_document(doc_id: int, db: Session = Depends(get_db)):
@@ -136,11 +482,21 @@ def get_document_fields(doc_id: int, db: Session = Depends(get_db)):
     """Get extracted fields for a document."""
     fields = db.query(models.ExtractedField).filter(
         models.ExtractedField.document_id == doc_id
-    ).all()
+    ).order_by(models.ExtractedField.page_number, models.ExtractedField.id).all()
     if not fields:
         raise HTTPException(status_code=404, detail="No fields found for document")
     return fields
 
+@app.get("/api/documents/{doc_id}/tables", response_model=List[Table])
+def get_document_tables(doc_id: int, db: Session = Depends(get_db)):
+    """Get the tables detected in a document, with their rows."""
+    document = db.query(models.Document).filter(models.Document.id == doc_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    return db.query(models.ExtractedTable).options(selectinload(models.ExtractedTable.rows)).filter(
+        models.ExtractedTable.document_id == doc_id
+    ).order_by(models.ExtractedTable.page_number, models.ExtractedTable.id).all()
+
 @app.get("/api/documents/{doc_id}/pages/{page_number}")
 def get_page_details(doc_id: int, page_number: int, db: Session = Depends(get_db)):
     """Get details for a specific page of a document."""
@@ -161,3 +517,44 @@ def get_page_details(doc_id: int, page_number: int, db: Session = Depends(get_db
         "page_number": page_number,
         "fields": fields
     }
+
+@app.get("/api/documents/{doc_id}/pages/{page_number}/image")
+def get_page_image(
+    doc_id: int,
+    page_number: int,
+    request: Request,
+    dpi: int = Query(settings.RENDER_DEFAULT_DPI, ge=36, le=settings.RENDER_MAX_DPI),
+    width: Optional[int] = Query(None, ge=16, le=settings.RENDER_MAX_WIDTH),
+    image_format: str = Query("png", alias="format"),
+    db: Session = Depends(get_db),
+    services: Services = Depends(get_services)
+):
+    """Render one page as PNG or WebP, at ``dpi`` or scaled to ``width`` pixels.
+
+    Rendered pages are cached on disk. Responses carry an ETag, and a matching
+    ``If-None-Match`` gets a 304 without touching the PDF.
+    """
+    if image_format not in RENDER_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported image format. Use one of: {', '.join(RENDER_FORMATS)}"
+        )
+    document = db.query(models.Document).filter(models.Document.id == doc_id).first()
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if page_number < 1 or page_number > document.total_pages:
+        raise HTTPException(status_code=400, detail="Invalid page number")
+    if not document.content_hash:
+        raise HTTPException(status_code=404, detail="Original PDF is not stored for this document")
+
+    # Stored PDFs never change, so the variant name identifies the image
+    etag = f'"{services.render_service.variant_name(document.content_hash, page_number, dpi, width, image_format)}"'
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=86400"}
+    if etag in (tag.strip() for tag in request.headers.get("if-none-match", "").split(",")):
+        return Response(status_code=304, headers=headers)
+
+    try:
+        path = services.render_service.render(document.content_hash, page_number, dpi, width, image_format)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Original PDF is not stored for this document")
+    return FileResponse(path, media_type=RENDER_FORMATS[image_format], headers=headers)
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
-from datetime import datetime
+from datetime import date, datetime
 
 class BoundingBox(BaseModel):
     x: float
@@ -31,6 +31,8 @@ class ExtractedField(BaseModel):
     bounding_box_height: float
     section_name: str
     page_number: int
+    value_number: Optional[float] = None
+    value_date: Optional[date] = None
 
     @property
     def bounding_box(self) -> BoundingBox:
@@ -54,6 +56,11 @@ class DocumentCreate(DocumentBase):
 class Document(DocumentBase):
     id: int
     upload_date: datetime
+    llm_requests: Optional[int] = 0
+    prompt_tokens: Optional[int] = 0
+    completion_tokens: Optional[int] = 0
+    version: Optional[int] = 1
+    previous_version_id: Optional[int] = None
     extracted_fields: List[ExtractedField] = []
 
     class Config:
@@ -61,3 +68,24 @@ class Document(DocumentBase):
 
 class DocumentInDB(Document):
     pass
+
+class DocumentPage(BaseModel):
+    """One page of documents, ordered by ID.
+
+    Pass ``next_after_id`` back as ``after_id`` to fetch the next page; it is
+    ``None`` on the last page.
+    """
+    items: List[Document]
+    next_after_id: Optional[int] = None
+
+class DocumentSummary(DocumentBase):
+    id: int
+    upload_date: datetime
+    field_count: int
+
+    class Config:
+        from_attributes = True
+
+class DocumentSummaryPage(BaseModel):
+    items: List[DocumentSummary]
+    next_after_id: Optional[int] = None
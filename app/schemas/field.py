@@ -0,0 +1,50 @@
+from datetime import date
+from typing import Any, Dict, Optional
+from typing_extensions import TypedDict
+from app.utils.helpers import parse_date, parse_number
+
+class FieldRow(TypedDict, total=False):
+    """An extracted field as a plain dict keyed by ``extracted_fields`` columns.
+
+    The extraction pipeline passes fields around in this shape so they can be
+    bulk-inserted without building an ORM object or pydantic model per field.
+    """
+    document_id: int
+    field_name: str
+    field_value: str
+    description: Optional[str]
+    bounding_box_x: float
+    bounding_box_y: float
+    bounding_box_width: float
+    bounding_box_height: float
+    section_name: str
+    page_number: int
+    value_number: Optional[float]
+    value_date: Optional[date]
+
+def make_field_row(
+    field_name: str,
+    field_value: str,
+    description: Optional[str],
+    section_name: str,
+    page_number: int,
+    bounding_box: Optional[Dict[str, Any]] = None
+) -> FieldRow:
+    """Build a field row, defaulting the bounding box to zeros.
+
+    The value's numeric and date forms are filled in for range search.
+    """
+    box = bounding_box if isinstance(bounding_box, dict) else {}
+    return {
+        "field_name": field_name,
+        "field_value": field_value,
+        "description": description,
+        "bounding_box_x": float(box.get("x") or 0),
+        "bounding_box_y": float(box.get("y") or 0),
+        "bounding_box_width": float(box.get("width") or 0),
+        "bounding_box_height": float(box.get("height") or 0),
+        "section_name": section_name,
+        "page_number": page_number,
+        "value_number": parse_number(field_value),
+        "value_date": parse_date(field_value)
+    }
@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+from app.schemas.document import ExtractedField
+
+class JobPage(BaseModel):
+    page_number: int
+    status: str
+    field_count: int
+    error: Optional[str] = None
+    completed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class Job(BaseModel):
+    id: int
+    filename: str
+    status: str
+    document_id: Optional[int] = None
+    total_pages: Optional[int] = None
+    pages_completed: int = 0
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class JobDetail(Job):
+    pages: List[JobPage] = []
+    extracted_fields: List[ExtractedField] = []
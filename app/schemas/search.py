@@ -0,0 +1,14 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from app.schemas.document import ExtractedField
+
+class SearchHit(ExtractedField):
+    filename: str
+
+class SearchPage(BaseModel):
+    """One page of matching fields, ordered by field ID.
+
+    Pass ``next_after_id`` back as ``after_id`` to fetch the next page.
+    """
+    items: List[SearchHit]
+    next_after_id: Optional[int] = None
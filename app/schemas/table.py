@@ -0,0 +1,38 @@
+from pydantic import BaseModel, field_validator
+from typing import Any, List, Optional
+from typing_extensions import TypedDict
+
+class TableRecord(TypedDict):
+    """A detected table as the extraction pipeline hands it to the database layer."""
+    page_number: int
+    section_name: str
+    columns: List[str]
+    header: Optional[List[str]]
+    rows: List[List[str]]
+    bounding_box_x: float
+    bounding_box_y: float
+    bounding_box_width: float
+    bounding_box_height: float
+
+class Table(BaseModel):
+    id: int
+    document_id: int
+    page_number: int
+    section_name: str
+    columns: List[str]
+    header: Optional[List[str]] = None
+    row_count: int
+    bounding_box_x: float
+    bounding_box_y: float
+    bounding_box_width: float
+    bounding_box_height: float
+    rows: List[List[str]] = []
+
+    @field_validator("rows", mode="before")
+    @classmethod
+    def row_cells(cls, rows: List[Any]) -> List[Any]:
+        # Accept TableRow objects as well as plain cell lists
+        return [getattr(row, "cells", row) for row in rows]
+
+    class Config:
+        from_attributes = True
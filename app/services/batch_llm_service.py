@@ -0,0 +1,317 @@
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+
+from app.config import settings
+from app.services.llm_service import ExtractionRequest, LLMRequestError, LLMService
+from app.utils import metrics
+
+if TYPE_CHECKING:
+    from openai import OpenAI
+
+logger = logging.getLogger(__name__)
+
+# Batch API job states that are not final yet
+RUNNING_STATES = ("validating", "in_progress", "finalizing", "cancelling")
+
+class BatchJobError(Exception):
+    """A batch job was rejected or failed as a whole."""
+
+def completion_body(response: Any) -> Dict[str, Any]:
+    """The parts of a chat completion the batch results are read from, as JSON."""
+    body: Dict[str, Any] = {"choices": [{"message": {"content": response.choices[0].message.content}}]}
+    if response.usage:
+        body["usage"] = {
+            "prompt_tokens": response.usage.prompt_tokens,
+            "completion_tokens": response.usage.completion_tokens,
+            "total_tokens": response.usage.total_tokens
+        }
+    return body
+
+class BatchBackend(ABC):
+    """Runs a JSONL file of chat completion requests as one job.
+
+    Input and output lines use the OpenAI Batch API format: requests are
+    ``{"custom_id", "method", "url", "body"}`` and results
+    ``{"custom_id", "response": {"status_code", "body"}, "error"}``.
+    """
+
+    @abstractmethod
+    def submit(self, input_path: str) -> str:
+        """Start a job for a batch file and return its ID."""
+
+    @abstractmethod
+    def poll(self, job_id: str, output_path: str) -> bool:
+        """Write the job's results to ``output_path`` and return True once it has finished."""
+
+class OpenAIBatchBackend(BatchBackend):
+    """The OpenAI Batch API: half the price of interactive requests and separate rate limits."""
+
+    def __init__(self, client: Optional["OpenAI"] = None):
+        if client is None:
+            from openai import OpenAI
+
+            client = OpenAI(api_key=settings.OPENAI_API_KEY, timeout=settings.LLM_REQUEST_TIMEOUT)
+        self.client = client
+
+    def submit(self, input_path: str) -> str:
+        with open(input_path, "rb") as f:
+            upload = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window=settings.LLM_BATCH_JOB_COMPLETION_WINDOW
+        )
+        return batch.id
+
+    def poll(self, job_id: str, output_path: str) -> bool:
+        batch = self.client.batches.retrieve(job_id)
+        if batch.status in RUNNING_STATES:
+            counts = batch.request_counts
+            if counts:
+                logger.info(f"Batch {job_id} {batch.status}: {counts.completed + counts.failed}/{counts.total} requests done")
+            return False
+        if batch.status == "failed":
+            errors = "; ".join(error.message for error in batch.errors.data) if batch.errors and batch.errors.data else ""
+            raise BatchJobError(f"Batch {job_id} failed: {errors}")
+        # Completed, expired or cancelled: take whatever results there are
+        with open(output_path, "w") as out:
+            for file_id in (batch.output_file_id, batch.error_file_id):
+                if file_id:
+                    content = self.client.files.content(file_id).text
+                    out.write(content if content.endswith("\n") else content + "\n")
+        return True
+
+class LocalBatchBackend(BatchBackend):
+    """Runs a batch file's requests one at a time through an ``LLMService``.
+
+    A stand-in for the Batch API: with ``benchmarks.fake_llm.FakeLLMService``
+    the whole batch flow runs without network access.
+    """
+
+    def __init__(self, llm_service: LLMService):
+        self.llm_service = llm_service
+        self._jobs: Dict[str, str] = {}
+
+    def submit(self, input_path: str) -> str:
+        job_id = f"local-{uuid.uuid4().hex}"
+        self._jobs[job_id] = input_path
+        return job_id
+
+    def poll(self, job_id: str, output_path: str) -> bool:
+        with open(self._jobs.pop(job_id)) as f, open(output_path, "w") as out:
+            for line in f:
+                request = json.loads(line)
+                result: Dict[str, Any] = {"custom_id": request["custom_id"], "response": None, "error": None}
+                try:
+                    response = self.llm_service._create_completion(**request["body"])
+                    result["response"] = {"status_code": 200, "body": completion_body(response)}
+                except Exception as e:
+                    result["error"] = {"code": type(e).__name__, "message": str(e)}
+                out.write(json.dumps(result) + "\n")
+        return True
+
+class BatchDocument:
+    """One document's part of an ``LLMBatch``, passed to ``process_document`` as its ``llm_runner``."""
+
+    def __init__(self, batch: "LLMBatch"):
+        self.batch = batch
+        self.submitted = asyncio.Event()
+
+    def submit(
+        self,
+        requests: List[ExtractionRequest],
+        tables: List[Tuple[Optional[List[str]], List[List[str]]]]
+    ) -> Tuple[List[asyncio.Future], List[asyncio.Future]]:
+        results = self.batch.add(requests, tables)
+        self.submitted.set()
+        return results
+
+class LLMBatch:
+    """LLM calls from many documents, sent as one batch job.
+
+    Documents add their planned requests and column-labeling calls through
+    ``document()`` runners and get futures back. Calls with a cached result
+    resolve once the cache has been read; the rest are appended to a JSONL
+    file. ``run`` submits the file, polls until the job is done and resolves
+    every future from the output by ``custom_id``. Extraction requests
+    missing from the output or failed in it raise ``LLMRequestError``, so
+    their pages are reported as failed as they would be after an interactive
+    request gave up. Cache reads and the parsing of results, which stores
+    them in the cache, run on worker threads.
+    """
+
+    def __init__(self, llm_service: LLMService, backend: BatchBackend, directory: Optional[str] = None):
+        self.llm_service = llm_service
+        self.backend = backend
+        self.directory = directory or settings.LLM_BATCH_JOB_DIR
+        name = f"batch-{datetime.utcnow():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self.input_path = os.path.join(self.directory, f"{name}.jsonl")
+        self.output_path = os.path.join(self.directory, f"{name}.output.jsonl")
+        self._file = None
+        # custom_id -> (future, request or (header, sample_rows))
+        self._pending: Dict[str, Tuple[asyncio.Future, Any]] = {}
+        self._adding: Set[asyncio.Task] = set()  # Cache lookups not finished yet
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def document(self) -> BatchDocument:
+        return BatchDocument(self)
+
+    def _append(self, body: Dict[str, Any], call: Any, future: asyncio.Future) -> None:
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            self._file = open(self.input_path, "w")
+        custom_id = str(len(self._pending))
+        self._file.write(json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": body
+        }) + "\n")
+        self._pending[custom_id] = (future, call)
+
+    def add(
+        self,
+        requests: List[ExtractionRequest],
+        tables: List[Tuple[Optional[List[str]], List[List[str]]]]
+    ) -> Tuple[List[asyncio.Future], List[asyncio.Future]]:
+        """Queue a document's calls; returns futures as ``ExtractionService._submit_llm`` does."""
+        loop = asyncio.get_running_loop()
+        request_results = [loop.create_future() for _ in requests]
+        label_results = [loop.create_future() for _ in tables]
+        task = asyncio.create_task(self._add(requests, tables, request_results, label_results))
+        self._adding.add(task)
+        task.add_done_callback(self._adding.discard)
+        return request_results, label_results
+
+    async def _add(
+        self,
+        requests: List[ExtractionRequest],
+        tables: List[Tuple[Optional[List[str]], List[List[str]]]],
+        request_results: List[asyncio.Future],
+        label_results: List[asyncio.Future]
+    ) -> None:
+        """Resolve a document's cached calls and append the others to the batch file."""
+        calls = [*requests, *tables]
+        futures = [*request_results, *label_results]
+        try:
+            cached_results = await asyncio.to_thread(lambda: [
+                *(self.llm_service.cached_request(request) for request in requests),
+                *(self.llm_service.cached_labels(header, sample) for header, sample in tables)
+            ])
+            for call, future, cached in zip(calls, futures, cached_results):
+                if cached is None:
+                    if isinstance(call, ExtractionRequest):
+                        body = self.llm_service.request_body(call)
+                    else:
+                        body = self.llm_service.label_body(*call)
+                    self._append(body, call, future)
+                elif isinstance(call, ExtractionRequest):
+                    future.set_result((cached, {"cached_requests": 1}))
+                else:
+                    future.set_result(cached)
+        except Exception as e:
+            logger.error(f"Could not queue batch calls: {str(e)}")
+            for call, future in zip(calls, futures):
+                self._settle(future, *self._outcome(call, None, str(e)))
+
+    @staticmethod
+    def _settle(future: asyncio.Future, result: Any, exception: Optional[Exception]) -> None:
+        if future.done():
+            return
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def _outcome(self, call: Any, body: Optional[Dict[str, Any]], error: str) -> Tuple[Any, Optional[Exception]]:
+        """A call's result or exception from its output ``body``, or from ``error`` if it has none.
+
+        Parsing stores the result in the cache, so this runs on a worker
+        thread for the batch output.
+        """
+        if body is None:
+            metrics.LLM_REQUESTS.labels("failed").inc()
+            if isinstance(call, ExtractionRequest):
+                return None, LLMRequestError(f"Batch request for pages {call.page_numbers} failed: {error}")
+            return None, None
+
+        token_usage = body.get("usage") or {}
+        metrics.LLM_TOKENS.labels("prompt").inc(token_usage.get("prompt_tokens", 0))
+        metrics.LLM_TOKENS.labels("completion").inc(token_usage.get("completion_tokens", 0))
+        content = body["choices"][0]["message"]["content"]
+        if not isinstance(call, ExtractionRequest):
+            header, sample = call
+            labels = self.llm_service.parse_labels(content, header, sample)
+            metrics.LLM_REQUESTS.labels("failed" if labels is None else "ok").inc()
+            return labels, None
+        usage = {
+            "requests": 1,
+            "prompt_tokens": token_usage.get("prompt_tokens", 0),
+            "completion_tokens": token_usage.get("completion_tokens", 0)
+        }
+        try:
+            fields = self.llm_service.parse_request_response(call, content)
+        except Exception as e:
+            metrics.LLM_REQUESTS.labels("failed").inc()
+            logger.error(f"Error in LLM extraction for pages {call.page_numbers}: {str(e)}")
+            fields = []
+        else:
+            metrics.LLM_REQUESTS.labels("ok").inc()
+        return (fields, usage), None
+
+    def _read_output(self) -> List[Tuple[asyncio.Future, Any, Optional[Exception]]]:
+        """Parse the job's output into ``(future, result, exception)`` for each call it answers."""
+        outcomes = []
+        answered = set()
+        with open(self.output_path) as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                result = json.loads(line)
+                custom_id = result.get("custom_id")
+                entry = self._pending.get(custom_id)
+                if entry is None or custom_id in answered:
+                    continue
+                answered.add(custom_id)
+                future, call = entry
+                response = result.get("response") or {}
+                if response.get("status_code") == 200:
+                    outcomes.append((future, *self._outcome(call, response["body"], "")))
+                else:
+                    detail = result.get("error") or (response.get("body") or {}).get("error") or {}
+                    error = detail.get("message") or f"status {response.get('status_code')}"
+                    outcomes.append((future, *self._outcome(call, None, error)))
+        return outcomes
+
+    async def run(self, poll_interval: Optional[float] = None) -> None:
+        """Submit the batch, wait for it to finish and resolve every queued call."""
+        if self._adding:
+            await asyncio.gather(*self._adding)
+        if self._file is None:
+            return
+        self._file.close()
+        poll_interval = settings.LLM_BATCH_JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+        error = "no result in the batch output"
+        try:
+            job_id = await asyncio.to_thread(self.backend.submit, self.input_path)
+            logger.info(f"Submitted batch {job_id} with {len(self._pending)} requests from {self.input_path}")
+            while not await asyncio.to_thread(self.backend.poll, job_id, self.output_path):
+                await asyncio.sleep(poll_interval)
+            logger.info(f"Batch {job_id} finished, results in {self.output_path}")
+            for future, result, exception in await asyncio.to_thread(self._read_output):
+                self._settle(future, result, exception)
+        except Exception as e:
+            logger.error(f"Batch {self.input_path} failed: {str(e)}")
+            error = str(e)
+        finally:
+            for future, call in self._pending.values():
+                if not future.done():
+                    self._settle(future, *self._outcome(call, None, error))
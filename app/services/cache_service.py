@@ -0,0 +1,203 @@
+from typing import List, Dict, Any, Optional, Tuple
+from datetime import datetime
+import hashlib
+import json
+import logging
+import threading
+import time
+
+from sqlalchemy import bindparam, func, select, update
+from app.config import settings
+from app.database import models
+from app.database.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+class LLMCache:
+    """Content-addressed cache of LLM extraction results stored in the database.
+
+    Entries are keyed by a hash of the normalized page text, the model name and
+    the prompt version, so identical pages share a result across documents.
+    Least recently used entries are evicted once the total size exceeds
+    ``max_bytes``.
+
+    Lookups only read. Hit counts and access times are kept in memory and
+    written in bulk every ``LLM_CACHE_ACCESS_FLUSH_INTERVAL`` seconds, with
+    the next stored entry, before an eviction and on ``flush``. The total
+    size is tracked as entries are stored and only summed from the table
+    when it first passes the limit.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes or settings.LLM_CACHE_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        # key -> (hits, last access) not written yet
+        self._accesses: Dict[str, Tuple[int, datetime]] = {}
+        self._last_flush = time.monotonic()
+        self._size_bytes: Optional[int] = None  # Summed on the first store
+
+    @staticmethod
+    def make_key(text: str, model: str, prompt_version: str) -> str:
+        """Build the cache key for a page of text."""
+        normalized = ' '.join(text.split())
+        digest = hashlib.sha256()
+        for part in (model, prompt_version, normalized):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _count(self, attr: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, attr, getattr(self, attr) + amount)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Return the cached fields for a key, or None on a miss."""
+        db = SessionLocal()
+        try:
+            response = db.scalar(select(models.LLMCacheEntry.response).where(models.LLMCacheEntry.key == key))
+        except Exception as e:
+            logger.warning(f"LLM cache lookup failed: {str(e)}")
+            response = None
+        finally:
+            db.close()
+        if response is None:
+            self._count("misses")
+            return None
+        with self._lock:
+            self.hits += 1
+            hits, _ = self._accesses.get(key, (0, None))
+            self._accesses[key] = (hits + 1, datetime.utcnow())
+            due = time.monotonic() - self._last_flush >= settings.LLM_CACHE_ACCESS_FLUSH_INTERVAL
+        if due:
+            self.flush()
+        return json.loads(response)
+
+    def _take_accesses(self) -> Dict[str, Tuple[int, datetime]]:
+        with self._lock:
+            accesses, self._accesses = self._accesses, {}
+            self._last_flush = time.monotonic()
+        return accesses
+
+    def _write_accesses(self, db, accesses: Dict[str, Tuple[int, datetime]]) -> None:
+        """Add hit counts and set access times in one statement, without committing."""
+        if accesses:
+            entries = models.LLMCacheEntry.__table__
+            db.connection().execute(
+                update(entries)
+                .where(entries.c.key == bindparam("entry_key"))
+                .values(hits=entries.c.hits + bindparam("new_hits"), last_accessed=bindparam("accessed")),
+                [
+                    {"entry_key": key, "new_hits": hits, "accessed": accessed}
+                    for key, (hits, accessed) in accesses.items()
+                ]
+            )
+
+    def flush(self) -> None:
+        """Write the hit counts and access times recorded since the last write."""
+        accesses = self._take_accesses()
+        if not accesses:
+            return
+        db = SessionLocal()
+        try:
+            self._write_accesses(db, accesses)
+            db.commit()
+        except Exception as e:
+            # Access times only order evictions; losing some is harmless
+            logger.warning(f"LLM cache access update failed: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _total_size(self, db) -> int:
+        return db.query(func.coalesce(func.sum(models.LLMCacheEntry.size_bytes), 0)).scalar()
+
+    def set(self, key: str, model: str, prompt_version: str, fields: List[Dict[str, Any]]) -> None:
+        """Store fields for a key and evict old entries if over the size limit."""
+        response = json.dumps(fields)
+        size_bytes = len(response.encode("utf-8"))
+        accesses = self._take_accesses()
+        db = SessionLocal()
+        try:
+            self._write_accesses(db, accesses)
+            replaced = db.scalar(select(models.LLMCacheEntry.size_bytes).where(models.LLMCacheEntry.key == key)) or 0
+            db.merge(models.LLMCacheEntry(
+                key=key,
+                model=model,
+                prompt_version=prompt_version,
+                response=response,
+                size_bytes=size_bytes,
+                hits=0,
+                last_accessed=datetime.utcnow()
+            ))
+            if self._size_bytes is None:
+                db.flush()
+                total = self._total_size(db)
+            db.commit()
+            with self._lock:
+                if self._size_bytes is None:
+                    self._size_bytes = total
+                else:
+                    self._size_bytes += size_bytes - replaced
+                over = self._size_bytes > self.max_bytes
+            if over:
+                self._evict(db)
+        except Exception as e:
+            logger.warning(f"LLM cache store failed: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _evict(self, db) -> None:
+        # Other processes share the table, so the tracked size may be off;
+        # sum it once now that it looks over the limit
+        self._write_accesses(db, self._take_accesses())
+        total = self._total_size(db)
+        with self._lock:
+            self._size_bytes = total
+        if total <= self.max_bytes:
+            db.commit()
+            return
+
+        stale_keys = []
+        entries = db.query(
+            models.LLMCacheEntry.key, models.LLMCacheEntry.size_bytes
+        ).order_by(models.LLMCacheEntry.last_accessed).all()
+        for key, size_bytes in entries:
+            if total <= self.max_bytes:
+                break
+            stale_keys.append(key)
+            total -= size_bytes
+
+        db.query(models.LLMCacheEntry).filter(
+            models.LLMCacheEntry.key.in_(stale_keys)
+        ).delete(synchronize_session=False)
+        db.commit()
+        with self._lock:
+            self._size_bytes = total
+        self._count("evictions", len(stale_keys))
+        logger.info(f"Evicted {len(stale_keys)} LLM cache entries")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current size of the cache."""
+        self.flush()
+        db = SessionLocal()
+        try:
+            entries, size_bytes = db.query(
+                func.count(models.LLMCacheEntry.key),
+                func.coalesce(func.sum(models.LLMCacheEntry.size_bytes), 0)
+            ).one()
+        finally:
+            db.close()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": entries,
+            "size_bytes": size_bytes,
+            "max_bytes": self.max_bytes
+        }
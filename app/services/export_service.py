@@ -0,0 +1,171 @@
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+import csv
+import io
+import json
+import logging
+
+from sqlalchemy import select
+from app.config import settings
+from app.database import models
+from app.database.database import SessionLocal
+from app.utils.helpers import json_default
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# Exported columns, in output order
+EXPORT_COLUMNS = (
+    models.ExtractedField.id,
+    models.ExtractedField.document_id,
+    models.Document.filename,
+    models.Document.upload_date,
+    models.ExtractedField.page_number,
+    models.ExtractedField.section_name,
+    models.ExtractedField.field_name,
+    models.ExtractedField.field_value,
+    models.ExtractedField.description,
+    models.ExtractedField.value_number,
+    models.ExtractedField.value_date,
+    models.ExtractedField.bounding_box_x,
+    models.ExtractedField.bounding_box_y,
+    models.ExtractedField.bounding_box_width,
+    models.ExtractedField.bounding_box_height,
+)
+COLUMN_NAMES = [column.key for column in EXPORT_COLUMNS]
+
+def parquet_available() -> bool:
+    """Whether the optional pyarrow dependency is installed."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that buffers bytes until they are taken by ``drain``.
+
+    ``tell`` reports the total bytes written so Parquet footer offsets stay
+    correct after earlier chunks have been sent.
+    """
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+class ExportService:
+    """Streams extracted fields out of the database in batches.
+
+    Rows are read through a streaming cursor ``batch_size`` at a time and
+    encoded one batch at a time, so memory use does not grow with the size
+    of the export.
+    """
+
+    def __init__(self, batch_size: Optional[int] = None):
+        self.batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+
+    def _query(
+        self,
+        document_ids: Optional[List[int]] = None,
+        field_name: Optional[str] = None,
+        uploaded_from: Optional[datetime] = None,
+        uploaded_to: Optional[datetime] = None
+    ):
+        query = select(*EXPORT_COLUMNS).join(models.Document)
+        if document_ids:
+            query = query.where(models.ExtractedField.document_id.in_(document_ids))
+        if field_name is not None:
+            query = query.where(models.ExtractedField.field_name == field_name)
+        if uploaded_from is not None:
+            query = query.where(models.Document.upload_date >= uploaded_from)
+        if uploaded_to is not None:
+            query = query.where(models.Document.upload_date <= uploaded_to)
+        return query.order_by(models.ExtractedField.document_id, models.ExtractedField.id)
+
+    def iter_batches(self, **filters) -> Iterator[List[Dict[str, Any]]]:
+        """Yield matching rows as lists of dicts of at most ``batch_size`` rows.
+
+        Opens its own session: the generator outlives the request handler
+        that created it when used in a streaming response.
+        """
+        db = SessionLocal()
+        try:
+            result = db.execute(
+                self._query(**filters).execution_options(stream_results=True, yield_per=self.batch_size)
+            )
+            for partition in result.mappings().partitions():
+                yield [dict(row) for row in partition]
+        finally:
+            db.close()
+
+    def ndjson(self, **filters) -> Iterator[bytes]:
+        for batch in self.iter_batches(**filters):
+            yield "".join(json.dumps(row, default=json_default) + "\n" for row in batch).encode()
+
+    def csv(self, **filters) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=COLUMN_NAMES)
+        writer.writeheader()
+        for batch in self.iter_batches(**filters):
+            writer.writerows(batch)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+
+    def parquet(self, **filters) -> Iterator[bytes]:
+        """Write each batch as one Parquet row group and yield the bytes written."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ("id", pa.int64()),
+            ("document_id", pa.int64()),
+            ("filename", pa.string()),
+            ("upload_date", pa.timestamp("us")),
+            ("page_number", pa.int32()),
+            ("section_name", pa.string()),
+            ("field_name", pa.string()),
+            ("field_value", pa.string()),
+            ("description", pa.string()),
+            ("value_number", pa.float64()),
+            ("value_date", pa.date32()),
+            ("bounding_box_x", pa.float64()),
+            ("bounding_box_y", pa.float64()),
+            ("bounding_box_width", pa.float64()),
+            ("bounding_box_height", pa.float64()),
+        ])
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, schema) as writer:
+            for batch in self.iter_batches(**filters):
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                yield sink.drain()
+        yield sink.drain()
+
+    def export(self, export_format: str, **filters) -> Iterator[bytes]:
+        """Stream matching fields encoded as ``export_format``."""
+        logger.info(f"Exporting fields as {export_format} with filters {filters}")
+        return getattr(self, export_format)(**filters)
@@ -1,34 +1,402 @@
-from typing import List, Dict, Any
-from app.services.pdf_service import PDFService
-from app.services.llm_service import LLMService
-from app.schemas.document import DocumentCreate, ExtractedFieldCreate
+from typing import List, Dict, Any, Optional, Tuple, Union
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from app.services.pdf_service import ParsedPDF, ParsePool, PDFService, clean_text, page_fingerprint
+from app.services.llm_service import ExtractionRequest, LLMRequestError, LLMService, build_extraction_prompt
+from app.services.rule_extractor import RuleExtractor
+from app.services.layout_index import PageLayout
+from app.services.table_detector import DetectedTable, column_names
+from app.schemas.document import DocumentCreate
+from app.schemas.field import FieldRow, make_field_row
+from app.schemas.table import TableRecord
+from app.utils.helpers import estimate_tokens
+from app.utils import metrics
+from app.config import settings
 from datetime import datetime
+import asyncio
+import contextvars
 import logging
+import time
 import traceback
 
 logger = logging.getLogger(__name__)
 
+class ExtractionListener:
+    """Receives progress callbacks while a document is being processed."""
+
+    def on_document(self, total_pages: int) -> None:
+        """Called once the page count is known, before any page is extracted."""
+
+    def on_page(self, page_number: int, fields: List[FieldRow], error: Optional[str] = None) -> None:
+        """Called as soon as a page's fields are available, in completion order.
+
+        ``error`` is set when an LLM request for the page failed; ``fields``
+        then holds whatever was extracted without it.
+        """
+
 class ExtractionService:
-    def __init__(self):
+    def __init__(self, pre_extractors: Optional[List[Any]] = None):
         self.pdf_service = PDFService()
         self.llm_service = LLMService()
+        # Pre-extractors run in order before the LLM. Each has an
+        # ``extract(text, page_number)`` method returning the fields it found
+        # and the text left for the next stage.
+        if pre_extractors is None:
+            pre_extractors = [RuleExtractor()] if settings.RULE_EXTRACTION_ENABLED else []
+        self.pre_extractors = pre_extractors
+        # The OpenAI client is blocking, so LLM calls run on a bounded pool
+        # instead of the event loop. The pool size caps in-flight requests.
+        self._llm_executor = ThreadPoolExecutor(
+            max_workers=settings.LLM_MAX_CONCURRENCY,
+            thread_name_prefix="llm"
+        )
+        # PDF text extraction is CPU-bound, so it runs on worker processes
+        self.parse_pool = ParsePool(settings.PDF_PARSE_WORKERS) if settings.PDF_PARSE_WORKERS != 0 else None
+
+    def close(self) -> None:
+        """Shut down the LLM threads and parse worker processes, and write pending cache hit counts."""
+        self._llm_executor.shutdown(wait=False, cancel_futures=True)
+        if self.llm_service.cache:
+            self.llm_service.cache.flush()
+        if self.parse_pool:
+            self.parse_pool.shutdown()
+
+    @staticmethod
+    def _needs_llm(text: str) -> bool:
+        """Whether enough text is left after pre-extraction to ask the LLM."""
+        return sum(c.isalnum() for c in text) >= settings.RULE_MIN_REMAINING_CHARS
+
+    def _pre_extract(self, text: str, page_num: int, stats: Dict[str, int]) -> Tuple[List[FieldRow], str]:
+        """Run the pre-extractors over a page and return their fields and the text left."""
+        extracted_fields = []
+        remaining_text = text
+        for extractor in self.pre_extractors:
+            fields, remaining_text = extractor.extract(remaining_text, page_num)
+            extracted_fields.extend(fields)
+        stats["rule_fields"] += len(extracted_fields)
+        metrics.FIELDS.labels("rules").inc(len(extracted_fields))
+
+        if self._needs_llm(remaining_text):
+            stats["tokens_saved"] += estimate_tokens(text) - estimate_tokens(remaining_text)
+        else:
+            # Page fully covered by pre-extraction; the whole request is saved
+            stats["tokens_saved"] += estimate_tokens(build_extraction_prompt(
+                text, page_num, not settings.LAYOUT_BOUNDING_BOXES
+            ))
+            stats["llm_pages_skipped"] += 1
+        return extracted_fields, remaining_text
+
+    def _submit_llm(
+        self,
+        requests: List[ExtractionRequest],
+        tables: List[Tuple[Optional[List[str]], List[List[str]]]]
+    ) -> Tuple[List[asyncio.Future], List[asyncio.Future]]:
+        """Start a document's LLM calls on the LLM executor.
+
+        Returns futures for each request's ``(fields, usage)`` and each
+        ``(header, sample_rows)`` table's column labels. A runner passed to
+        ``process_document`` replaces this with the same signature.
+        """
+        # The OpenAI client blocks, so calls run on the LLM executor. The
+        # context is copied so the request's trace follows the call.
+        loop = asyncio.get_running_loop()
+
+        def call(function, *args) -> asyncio.Future:
+            return loop.run_in_executor(self._llm_executor, contextvars.copy_context().run, function, *args)
+
+        return (
+            [call(self.llm_service.extract_request, request) for request in requests],
+            [call(self.llm_service.label_columns, header, sample) for header, sample in tables]
+        )
+
+    @staticmethod
+    def _remove_tables(layout: PageLayout, tables: List[DetectedTable]) -> str:
+        """The page text without its tables, so later stages only see the rest.
+
+        The text is rebuilt from the layout leaving out the tables' words by
+        index, so identical text elsewhere on the page is kept.
+        """
+        return clean_text(layout.text_without({i for table in tables for i in table.words}))
+
+    @staticmethod
+    def _table_fields(page_num: int, tables: List[DetectedTable], label: Dict[str, Any]) -> List[FieldRow]:
+        """A field per non-empty cell, named by its column, so table rows are searched and exported like other fields."""
+        section_name = label["section_name"]
+        fields = []
+        for table in tables:
+            for row_number, (row, boxes) in enumerate(zip(table.rows, table.cell_boxes), 1):
+                for name, value, box in zip(label["columns"], row, boxes):
+                    if not value:
+                        continue
+                    x, y, width, height = box
+                    fields.append(make_field_row(
+                        name, value, f"Row {row_number} of the {section_name} table", section_name, page_num,
+                        {"x": x, "y": y, "width": width, "height": height}
+                    ))
+        return fields
+
+    @staticmethod
+    def _table_records(page_tables: Dict[int, List[DetectedTable]], labels: Dict[Tuple, Dict[str, Any]]) -> List[TableRecord]:
+        records = []
+        for page_num in sorted(page_tables):
+            for table in page_tables[page_num]:
+                label = labels[table.signature]
+                x, y, width, height = table.box
+                records.append({
+                    "page_number": page_num,
+                    "section_name": label["section_name"],
+                    "columns": label["columns"],
+                    "header": table.header,
+                    "rows": table.rows,
+                    "bounding_box_x": x,
+                    "bounding_box_y": y,
+                    "bounding_box_width": width,
+                    "bounding_box_height": height
+                })
+        return records
+
+    @staticmethod
+    def _merge_chunks(chunk_fields: Dict[int, List[FieldRow]]) -> List[FieldRow]:
+        """Merge the fields of a split page's chunks, in chunk order.
+
+        A field is dropped when the previous chunk returned the same name and
+        value, as it was read from the text the two chunks overlap on. Each
+        match drops one field, so repeated rows within a chunk are kept.
+        """
+        merged = []
+        previous = Counter()
+        for index in sorted(chunk_fields):
+            overlap = previous
+            previous = Counter((field["field_name"], field["field_value"]) for field in chunk_fields[index])
+            for field in chunk_fields[index]:
+                key = (field["field_name"], field["field_value"])
+                if overlap[key]:
+                    overlap[key] -= 1
+                    continue
+                merged.append(field)
+        return merged
+
+    @staticmethod
+    def _finish_page(fields: List[FieldRow], layout: Optional[PageLayout]) -> List[FieldRow]:
+        """Attach layout bounding boxes to a page's fields."""
+        if layout is not None:
+            # Replace guessed coordinates with the field's real position
+            for field in fields:
+                box = layout.find_box(field["field_value"])
+                if box is not None:
+                    (field["bounding_box_x"], field["bounding_box_y"],
+                     field["bounding_box_width"], field["bounding_box_height"]) = box
+        return fields
+
+    async def _extract_pages(
+        self,
+        pdf: ParsedPDF,
+        filename: str,
+        stats: Dict[str, int],
+        listener: Optional[ExtractionListener] = None,
+        previous_pages: Optional[Dict[str, List[FieldRow]]] = None,
+        llm_runner: Optional[Any] = None
+    ) -> Tuple[List[FieldRow], List[TableRecord]]:
+        """Extract all pages: tables, then pre-extractors, then the LLM on what is left.
+
+        Tables are detected from the page layout and taken out of the page
+        text; the LLM only names their columns, once per distinct header.
+        Each table cell then becomes a field named by its column.
+        LLM requests are planned across pages (chunked or packed) and run
+        concurrently. Each page is finished and reported to the listener as
+        soon as every request covering it is done. Pages whose fingerprint is
+        in ``previous_pages`` take their fields from there instead.
+        """
+        with metrics.stage("pdf_text") as text_timer:
+            texts = pdf.texts()
+        stats["page_fingerprints"] = [page_fingerprint(text) for text in texts]
+        page_tables: Dict[int, List[DetectedTable]] = {}
+        if settings.TABLE_EXTRACTION_ENABLED:
+            with metrics.stage("tables") as tables_timer:
+                for page_num in range(1, len(texts) + 1):
+                    layout = pdf.page_layout(page_num)
+                    tables = self.pdf_service.detect_tables(layout) if layout is not None else []
+                    if tables:
+                        page_tables[page_num] = tables
+                        texts[page_num - 1] = self._remove_tables(layout, tables)
+            stats["timings"]["tables_ms"] = tables_timer.ms
+        # Every page's text and layout is cached now. Release the file and its
+        # memory map, which a document waiting on a batch job would otherwise
+        # hold until the job finishes.
+        pdf.close()
+        samples = {table.signature: table for tables in page_tables.values() for table in reversed(tables)}
+        previous_pages = previous_pages or {}
+        page_fields: Dict[int, List[FieldRow]] = {}
+        reused_pages = set()
+        llm_pages = []
+        with metrics.stage("pre_extract") as pre_extract_timer:
+            for page_num, text in enumerate(texts, 1):
+                reused = previous_pages.get(stats["page_fingerprints"][page_num - 1])
+                if reused is not None:
+                    # Unchanged since the previous version
+                    page_fields[page_num] = [dict(field, page_number=page_num) for field in reused]
+                    reused_pages.add(page_num)
+                    stats["reused_pages"] += 1
+                    metrics.FIELDS.labels("reused").inc(len(reused))
+                    continue
+                page_fields[page_num], remaining_text = self._pre_extract(text, page_num, stats)
+                if self._needs_llm(remaining_text):
+                    llm_pages.append((page_num, remaining_text))
+        stats["timings"]["pdf_text_ms"] = text_timer.ms
+        stats["timings"]["pre_extract_ms"] = pre_extract_timer.ms
 
-    async def process_document(self, file_content: bytes, filename: str) -> Dict[str, Any]:
-        """Process a PDF document and extract all relevant information."""
+        requests = self.llm_service.plan_requests(llm_pages)
+        logger.info(f"Planned {len(requests)} LLM requests for {len(llm_pages)} pages of {filename}")
+        if samples:
+            logger.info(f"Found {sum(map(len, page_tables.values()))} tables in {filename}, {len(samples)} to label")
+        pending = Counter(page_num for request in requests for page_num in request.page_numbers)
+        page_errors: Dict[int, str] = {}
+        # Fields of split pages by chunk, merged once every chunk is done
+        chunk_fields: Dict[int, Dict[int, List[FieldRow]]] = {}
+        # Pages with tables also wait for their column labels; the fields of
+        # reused pages already include their table cells
+        table_pages: Dict[Tuple, List[int]] = {}
+        table_fields: Dict[int, List[FieldRow]] = {}
+        for page_num, tables in page_tables.items():
+            if page_num not in reused_pages:
+                for signature in {table.signature for table in tables}:
+                    table_pages.setdefault(signature, []).append(page_num)
+                    pending[page_num] += 1
+
+        def finish(page_num: int) -> None:
+            with metrics.stage("finish_page"):
+                if page_num in chunk_fields:
+                    page_fields[page_num].extend(self._merge_chunks(chunk_fields.pop(page_num)))
+                page_fields[page_num] = (
+                    self._finish_page(page_fields[page_num], pdf.page_layout(page_num))
+                    + table_fields.pop(page_num, [])
+                )
+            metrics.PAGES.inc()
+            logger.info(f"Extracted {len(page_fields[page_num])} fields from page {page_num}")
+            if listener:
+                listener.on_page(page_num, page_fields[page_num], page_errors.get(page_num))
+
+        for page_num in page_fields:
+            if page_num not in pending:
+                finish(page_num)
+
+        async def run(request: ExtractionRequest, result: asyncio.Future) -> None:
+            try:
+                fields, usage = await result
+            except LLMRequestError as e:
+                logger.error(f"LLM request for pages {request.page_numbers} of {filename} failed: {str(e)}")
+                fields, usage = [], {"failed_requests": 1}
+                for page_num in request.page_numbers:
+                    page_errors[page_num] = str(e)
+            for key, value in usage.items():
+                stats[key] += value
+
+            # Convert straight to insertable rows
+            metrics.FIELDS.labels("llm").inc(len(fields))
+            rows = [
+                make_field_row(
+                    str(field["field_name"]),
+                    str(field["field_value"]),
+                    field.get("description"),
+                    str(field.get("section_name") or "unknown"),
+                    field["page_number"],
+                    field.get("bounding_box")
+                )
+                for field in fields
+                if field.get("field_name") is not None and field.get("field_value") is not None  # Skip malformed model output
+            ]
+            if request.chunk is not None:
+                chunk_fields.setdefault(request.page_numbers[0], {})[request.chunk] = rows
+            else:
+                for row in rows:
+                    page_fields[row["page_number"]].append(row)
+            for page_num in request.page_numbers:
+                pending[page_num] -= 1
+                if pending[page_num] == 0:
+                    finish(page_num)
+
+        labels: Dict[Tuple, Dict[str, Any]] = {}
+
+        async def label(table: DetectedTable, future: asyncio.Future) -> None:
+            result = await future
+            if result is None:
+                logger.warning(f"Could not label a {table.column_count}-column table in {filename}, using its header")
+                result = {"section_name": "table", "columns": column_names(table.header, table.column_count)}
+            labels[table.signature] = result
+            for page_num in table_pages.pop(table.signature, []):
+                fields = self._table_fields(
+                    page_num, [t for t in page_tables[page_num] if t.signature == table.signature], result
+                )
+                metrics.FIELDS.labels("tables").inc(len(fields))
+                table_fields.setdefault(page_num, []).extend(fields)
+                pending[page_num] -= 1
+                if pending[page_num] == 0:
+                    finish(page_num)
+
+        label_tables = list(samples.values())
+        submit = llm_runner.submit if llm_runner else self._submit_llm
+        request_results, label_results = submit(
+            requests,
+            [(table.header, table.rows[:settings.TABLE_LABEL_SAMPLE_ROWS]) for table in label_tables]
+        )
+        with metrics.stage("llm") as llm_timer:
+            await asyncio.gather(
+                *(run(request, result) for request, result in zip(requests, request_results)),
+                *(label(table, result) for table, result in zip(label_tables, label_results))
+            )
+        stats["timings"]["llm_ms"] = llm_timer.ms
+        stats["failed_pages"] = sorted(page_errors)
+
+        tables = self._table_records(page_tables, labels)
+        stats["tables"] = len(tables)
+        stats["table_rows"] = sum(len(table["rows"]) for table in tables)
+        metrics.TABLE_ROWS.inc(stats["table_rows"])
+        fields = [field for page_num in sorted(page_fields) for field in page_fields[page_num]]
+        return fields, tables
+
+    async def process_document(
+        self,
+        source: Union[bytes, str],
+        filename: str,
+        listener: Optional[ExtractionListener] = None,
+        previous_pages: Optional[Dict[str, List[FieldRow]]] = None,
+        llm_runner: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """Process a PDF document and extract all relevant information.
+
+        ``source`` is either the file content or the path of a spooled upload,
+        which is memory-mapped instead of read into memory. ``previous_pages``
+        maps page fingerprints of an earlier version of the document to their
+        fields (see ``crud.reusable_page_fields``); matching pages are not
+        extracted again. ``llm_runner`` sends the LLM calls some other way,
+        e.g. ``batch_llm_service.LLMBatch`` (see ``_submit_llm``).
+        """
+        pdf = None
+        started = time.perf_counter()
         try:
-            # Validate PDF
-            is_valid, message = self.pdf_service.validate_pdf(file_content)
+            # Parse the PDF once and validate it; page count and page text
+            # below reuse the same reader and the text extracted here
+            with metrics.stage("parse") as parse_timer:
+                try:
+                    pdf = self.pdf_service.open_pdf(source)
+                    if self.parse_pool and pdf.page_count and not pdf.is_encrypted:
+                        try:
+                            await self.parse_pool.extract(pdf, source)
+                        except Exception as e:
+                            # Pages left unparsed are extracted in-process
+                            # below, where a damaged page fails the same way
+                            logger.warning(f"Parse workers failed for {filename}, parsing in-process: {str(e)}")
+                    is_valid, message = self.pdf_service.validate_pdf(pdf)
+                except Exception as e:
+                    is_valid, message = False, f"Invalid PDF file: {str(e)}"
             if not is_valid:
                 logger.error(f"PDF validation failed for {filename}: {message}")
+                metrics.DOCUMENTS.labels("invalid").inc()
                 return {"error": message}
 
-            # Save file temporarily
-            file_path = self.pdf_service.save_uploaded_file(file_content, filename)
-            logger.info(f"Saved temporary file: {file_path}")
-            
             try:
                 # Get document metadata
-                total_pages = self.pdf_service.get_page_count(file_path)
+                total_pages = pdf.page_count
                 logger.info(f"Document {filename} has {total_pages} pages")
                 
                 # Create document record
@@ -36,53 +404,75 @@ class ExtractionService:
                     filename=filename,
                     total_pages=total_pages
                 )
+                if listener:
+                    listener.on_document(total_pages)
 
-                # Extract text from all pages
-                page_texts = self.pdf_service.extract_text(file_path)
-                logger.info(f"Extracted text from {len(page_texts)} pages")
-                
-                # Process each page
-                extracted_fields = []
-                for page_num, text in enumerate(page_texts, 1):
-                    logger.info(f"Processing page {page_num} of {filename}")
-                    # Extract fields from the page
-                    fields = self.llm_service.extract_fields(text, page_num)
-                    logger.info(f"Extracted {len(fields)} fields from page {page_num}")
-                    
-                    # Convert to ExtractedFieldCreate objects
-                    for field in fields:
-                        extracted_field = ExtractedFieldCreate(
-                            field_name=field["field_name"],
-                            field_value=field["field_value"],
-                            description=field.get("description"),
-                            bounding_box=field["bounding_box"],
-                            section_name=field["section_name"],
-                            page_number=page_num
-                        )
-                        extracted_fields.append(extracted_field)
+                # Extract fields from all pages, in page order. Timings are
+                # wall-clock milliseconds per stage.
+                stats = {
+                    "rule_fields": 0,
+                    "reused_pages": 0,
+                    "llm_pages_skipped": 0,
+                    "tokens_saved": 0,
+                    "requests": 0,
+                    "cached_requests": 0,
+                    "escalated_requests": 0,
+                    "failed_requests": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "cost_usd": 0.0,
+                    "timings": {"parse_ms": parse_timer.ms}
+                }
+                extracted_fields, tables = await self._extract_pages(
+                    pdf, filename, stats, listener, previous_pages, llm_runner
+                )
+                elapsed = time.perf_counter() - started
+                stats["timings"]["total_ms"] = round(elapsed * 1000, 1)
+                stats["cost_usd"] = round(stats["cost_usd"], 6)
+                metrics.observe_stage("document", elapsed)
+                metrics.DOCUMENTS.labels("completed").inc()
 
                 logger.info(f"Total fields extracted from {filename}: {len(extracted_fields)}")
+                if tables:
+                    logger.info(f"Tables extracted from {filename}: {stats['tables']} with {stats['table_rows']} rows")
+                if stats["reused_pages"]:
+                    logger.info(f"Reused fields of {stats['reused_pages']} unchanged pages of {filename}")
+                logger.info(
+                    f"Pre-extraction for {filename}: {stats['rule_fields']} fields, "
+                    f"{stats['llm_pages_skipped']} pages without LLM, ~{stats['tokens_saved']} tokens saved"
+                )
+                logger.info(
+                    f"LLM usage for {filename}: {stats['requests']} requests "
+                    f"({stats['cached_requests']} cached, {stats['escalated_requests']} escalated), "
+                    f"{stats['prompt_tokens']} prompt tokens, {stats['completion_tokens']} completion tokens, "
+                    f"~${stats['cost_usd']:.4f}"
+                )
+                logger.info(f"Stage timings for {filename}: {stats['timings']}")
+                if stats["failed_pages"]:
+                    logger.warning(f"LLM extraction failed for pages {stats['failed_pages']} of {filename}")
 
                 return {
                     "document": document,
-                    "extracted_fields": extracted_fields
+                    "extracted_fields": extracted_fields,
+                    "tables": tables,
+                    "stats": stats
                 }
 
             except Exception as e:
                 logger.error(f"Error processing document {filename}: {str(e)}")
                 logger.error(traceback.format_exc())
+                metrics.DOCUMENTS.labels("failed").inc()
                 return {"error": f"Error processing document: {str(e)}"}
 
-            finally:
-                # Clean up temporary file
-                self.pdf_service.cleanup_file(file_path)
-                logger.info(f"Cleaned up temporary file: {file_path}")
-
         except Exception as e:
             logger.error(f"Unexpected error processing {filename}: {str(e)}")
             logger.error(traceback.format_exc())
             return {"error": f"Unexpected error: {str(e)}"}
 
+        finally:
+            if pdf is not None:
+                pdf.close()
+
     async def process_multiple_documents(self, files: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Process multiple PDF documents."""
         results = []
@@ -0,0 +1,357 @@
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+import asyncio
+import json
+import logging
+import os
+import time
+
+from sqlalchemy.orm import Session
+from app.database.crud import create_document, find_previous_version, ingested_content_hashes, reusable_page_fields
+from app.database.database import SessionLocal
+from app.schemas.field import FieldRow
+from app.services.batch_llm_service import BatchBackend, BatchDocument, LLMBatch
+from app.services.extraction_service import ExtractionService
+from app.services.storage_service import DocumentStore, file_sha256
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+def iter_pdf_paths(paths: List[str], manifest: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    """Yield ``(path, name)`` for the PDFs under each path and in a manifest.
+
+    ``name`` is stored as the document's filename and identifies its
+    versions: the path relative to the directory it was found under, the
+    line itself for a manifest entry, and the base name for a file given
+    directly. Archives often reuse a base name, such as ``statement.pdf`` in
+    every month's directory, for unrelated documents.
+
+    A manifest lists one path per line; blank lines and ``#`` comments are
+    ignored. Directories are walked in sorted order so runs are repeatable.
+    """
+    for path in paths:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if name.lower().endswith(".pdf"):
+                        file_path = os.path.join(root, name)
+                        yield file_path, os.path.relpath(file_path, path)
+        else:
+            yield path, os.path.basename(path)
+    if manifest:
+        with open(manifest) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line, line
+
+class IngestCheckpoint:
+    """Append-only JSON-lines record of the files a batch ingest has handled.
+
+    Each line is ``{"path", "status", "content_hash", "document_id", "error"}``
+    and the last line for a path wins. Lines are written and synced once per
+    database batch, after its commit, so a crash loses at most the batches
+    in flight; their files are either extracted again or, if the commit had
+    landed, skipped by content hash.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.statuses: Dict[str, str] = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # Torn last line from a crash
+                    self.statuses[entry["path"]] = entry["status"]
+
+    def status(self, path: str) -> Optional[str]:
+        return self.statuses.get(path)
+
+    def record(self, entries: List[Dict[str, Any]]) -> None:
+        if not entries:
+            return
+        with open(self.path, "a") as f:
+            for entry in entries:
+                f.write(json.dumps(entry) + "\n")
+                self.statuses[entry["path"]] = entry["status"]
+            f.flush()
+            os.fsync(f.fileno())
+
+class IngestProgress:
+    """Running totals of a batch ingest."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.pages = 0
+        self.started = time.perf_counter()
+
+    @property
+    def handled(self) -> int:
+        return self.completed + self.failed + self.skipped
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def eta_seconds(self) -> Optional[float]:
+        """Time left at the current rate, once anything has been processed."""
+        processed = self.completed + self.failed
+        if not processed:
+            return None
+        return (self.total - self.handled) * self.elapsed / processed
+
+class BatchIngestService:
+    """Ingests many PDFs from disk through ``ExtractionService``.
+
+    ``concurrency`` documents are extracted at once; PDF parsing uses the
+    extraction service's worker processes and LLM calls its thread pool.
+    Extracted documents are written ``batch_size`` at a time in one
+    transaction, and the original files are copied into the document store.
+    Files whose content hash is already in the database, or that the
+    checkpoint marks as done, are skipped. With versioning, a file becomes
+    a new version of the latest document stored under the same name,
+    including one extracted earlier in the same run.
+
+    With ``llm_batch_backend`` the LLM calls of every ``batch_documents``
+    files are sent as one batch job instead of interactive requests. A run
+    interrupted while waiting for a job extracts that group again.
+    """
+
+    def __init__(
+        self,
+        extraction_service: ExtractionService,
+        document_store: DocumentStore,
+        checkpoint: IngestCheckpoint,
+        concurrency: int = 4,
+        batch_size: int = 50,
+        retry_failed: bool = False,
+        versioning: Optional[bool] = None,
+        llm_batch_backend: Optional[BatchBackend] = None,
+        batch_documents: int = 1000
+    ):
+        self.extraction_service = extraction_service
+        self.document_store = document_store
+        self.checkpoint = checkpoint
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.retry_failed = retry_failed
+        self.versioning = settings.DOCUMENT_VERSIONING if versioning is None else versioning
+        self.llm_batch_backend = llm_batch_backend
+        self.batch_documents = batch_documents
+        self.progress = IngestProgress(0)
+        self._known_hashes: Set[str] = set()
+        self._pending: List[Dict[str, Any]] = []  # Extracted, not yet written
+        self._entries: List[Dict[str, Any]] = []  # Checkpoint lines for the next flush
+        self._unwritten: Counter = Counter()  # Names of extracted documents not yet committed
+        self._flush_lock = asyncio.Lock()
+
+    def _should_process(self, path: str) -> bool:
+        status = self.checkpoint.status(path)
+        return status is None or (status == "failed" and self.retry_failed)
+
+    async def _flush(self) -> None:
+        """Write pending documents in one transaction, then checkpoint them.
+
+        The commit, the copies into the document store and the checkpoint sync
+        run on a worker thread, so extraction goes on meanwhile. Flushes run
+        one at a time, in order.
+        """
+        batch, self._pending = self._pending, []
+        async with self._flush_lock:
+            if batch:
+                entries, failures = await asyncio.to_thread(self._write_batch, batch)
+                self._unwritten.subtract(item["name"] for item in batch)
+                self._entries.extend(entries)
+                for item, error in failures:
+                    self.progress.completed -= 1
+                    self.progress.pages -= item["result"]["document"].total_pages
+                    self._fail(item["path"], item["content_hash"], error)
+            entries, self._entries = self._entries, []
+            await asyncio.to_thread(self.checkpoint.record, entries)
+
+    def _write_batch(self, batch: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Tuple[Dict[str, Any], str]]]:
+        """Write documents in one transaction; returns their checkpoint entries and the failures.
+
+        If the batch fails, its documents are written one per transaction so
+        a single bad document does not fail the rest.
+        """
+        entries = []
+        failures = []
+        db = SessionLocal()
+        try:
+            try:
+                entries = self._write(db, batch)
+            except Exception as e:
+                db.rollback()
+                logger.warning(f"Batch of {len(batch)} documents failed, writing one at a time: {str(e)}")
+                for item in batch:
+                    try:
+                        entries.extend(self._write(db, [item]))
+                    except Exception as e:
+                        db.rollback()
+                        failures.append((item, str(e)))
+        finally:
+            db.close()
+        return entries, failures
+
+    def _write(self, db: Session, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        entries = []
+        for item in batch:
+            result = item["result"]
+            self.document_store.add(item["path"], item["content_hash"])
+            # Looked up again here: an earlier version may have been written
+            # while this one was extracted, possibly in this transaction
+            previous = find_previous_version(db, item["name"]) if self.versioning else None
+            db_document = create_document(
+                db, result["document"], result["stats"], result["extracted_fields"],
+                item["content_hash"], previous, result["tables"]
+            )
+            entries.append({
+                "path": item["path"],
+                "status": "done",
+                "content_hash": item["content_hash"],
+                "document_id": db_document.id,
+                "error": None
+            })
+        db.commit()
+        return entries
+
+    def _fail(self, path: str, content_hash: Optional[str], error: str) -> None:
+        logger.error(f"Failed to ingest {path}: {error}")
+        self._known_hashes.discard(content_hash)
+        self.progress.failed += 1
+        self._entries.append({
+            "path": path, "status": "failed", "content_hash": content_hash, "document_id": None, "error": error
+        })
+
+    @staticmethod
+    def _previous_pages(name: str) -> Optional[Dict[str, List[FieldRow]]]:
+        """Fields of the unchanged-page candidates of the latest document stored as ``name``."""
+        db = SessionLocal()
+        try:
+            return reusable_page_fields(db, find_previous_version(db, name))
+        finally:
+            db.close()
+
+    async def _ingest(self, path: str, name: str, llm_runner: Optional[BatchDocument] = None) -> None:
+        try:
+            content_hash = await asyncio.to_thread(file_sha256, path)
+        except OSError as e:
+            self._fail(path, None, str(e))
+            return
+        if content_hash in self._known_hashes:
+            # Already in the database, or a duplicate earlier in this run
+            self.progress.skipped += 1
+            self._entries.append({
+                "path": path, "status": "skipped", "content_hash": content_hash, "document_id": None, "error": None
+            })
+            return
+        self._known_hashes.add(content_hash)
+
+        previous_pages = None
+        if self.versioning:
+            if self._unwritten[name]:
+                # Commit the earlier version first so its pages can be reused
+                await self._flush()
+            previous_pages = await asyncio.to_thread(self._previous_pages, name)
+
+        result = await self.extraction_service.process_document(
+            path, name, previous_pages=previous_pages, llm_runner=llm_runner
+        )
+        if "error" in result:
+            self._fail(path, content_hash, result["error"])
+            return
+        # Counted as completed once extracted; a failed write undoes it
+        self.progress.completed += 1
+        self.progress.pages += result["document"].total_pages
+        self._pending.append({"path": path, "name": name, "content_hash": content_hash, "result": result})
+        self._unwritten[name] += 1
+        if len(self._pending) >= self.batch_size:
+            await self._flush()
+
+    async def _ingest_safely(self, path: str, name: str, llm_runner: Optional[BatchDocument] = None) -> None:
+        try:
+            await self._ingest(path, name, llm_runner)
+        except Exception as e:
+            self._fail(path, None, str(e))
+
+    async def _run_interactive(self, files: List[Tuple[str, str]]) -> None:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def ingest(path: str, name: str) -> None:
+            try:
+                await self._ingest_safely(path, name)
+            finally:
+                semaphore.release()
+
+        tasks = set()
+        for path, name in files:
+            # Start a document only when a slot is free so memory stays flat
+            await semaphore.acquire()
+            task = asyncio.create_task(ingest(path, name))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        await asyncio.gather(*tasks)
+
+    @staticmethod
+    async def _until_submitted(task: asyncio.Task, runner: BatchDocument) -> None:
+        submitted = asyncio.create_task(runner.submitted.wait())
+        await asyncio.wait([task, submitted], return_when=asyncio.FIRST_COMPLETED)
+        submitted.cancel()
+
+    async def _run_batch(self, files: List[Tuple[str, str]]) -> None:
+        """Extract a group of documents with all their LLM calls in one batch job.
+
+        Documents are parsed and pre-extracted ``concurrency`` at a time. Each
+        frees its slot once its LLM calls are queued and finishes when the
+        job's results come back.
+        """
+        batch = LLMBatch(self.extraction_service.llm_service, self.llm_batch_backend)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = []
+        gates = []
+        for path, name in files:
+            await semaphore.acquire()
+            runner = batch.document()
+            task = asyncio.create_task(self._ingest_safely(path, name, runner))
+            gate = asyncio.create_task(self._until_submitted(task, runner))
+            gate.add_done_callback(lambda _: semaphore.release())
+            tasks.append(task)
+            gates.append(gate)
+        await asyncio.gather(*gates)
+        logger.info(f"Sending the LLM calls of {len(files)} documents as one batch job")
+        await batch.run()
+        await asyncio.gather(*tasks)
+
+    @staticmethod
+    def _ingested_content_hashes() -> Set[str]:
+        db = SessionLocal()
+        try:
+            return ingested_content_hashes(db)
+        finally:
+            db.close()
+
+    async def run(self, files: List[Tuple[str, str]]) -> IngestProgress:
+        """Ingest ``(path, name)`` pairs from ``iter_pdf_paths``, returning the final progress counts."""
+        self._known_hashes = await asyncio.to_thread(self._ingested_content_hashes)
+
+        todo = [(path, name) for path, name in dict(files).items() if self._should_process(path)]
+        self.progress = IngestProgress(len(todo))
+        logger.info(f"Ingesting {len(todo)} files ({len(files) - len(todo)} already in the checkpoint)")
+        if self.extraction_service.parse_pool:
+            await self.extraction_service.parse_pool.start()
+
+        if self.llm_batch_backend is None:
+            await self._run_interactive(todo)
+        else:
+            for start in range(0, len(todo), self.batch_documents):
+                await self._run_batch(todo[start:start + self.batch_documents])
+        await self._flush()
+        return self.progress
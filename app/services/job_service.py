@@ -0,0 +1,254 @@
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+import os
+import traceback
+from functools import partial
+
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import models
+from app.database.crud import (
+    find_previous_version, insert_extracted_fields, insert_page_fingerprints, insert_tables, reusable_page_fields
+)
+from app.database.database import SessionLocal, async_session
+from app.database.writer import DatabaseWriter
+from app.schemas.field import FieldRow
+from app.schemas.job import Job
+from app.services.extraction_service import ExtractionListener, ExtractionService
+from app.services.storage_service import DocumentStore
+
+logger = logging.getLogger(__name__)
+
+# Jobs in these states were interrupted if found at startup
+UNFINISHED_STATUSES = ("queued", "processing")
+
+def create_jobs(db: Session, uploads: List[Tuple[str, str]], storage_dir: str) -> List[Job]:
+    """Add a queued job per ``(spooled_path, filename)`` upload, with its storage path."""
+    jobs = [models.IngestionJob(filename=filename, status="queued") for _, filename in uploads]
+    db.add_all(jobs)
+    db.flush()  # Get the job IDs
+    for job in jobs:
+        job.file_path = os.path.join(storage_dir, f"{job.id}.pdf")
+    db.flush()
+    return [Job.model_validate(job) for job in jobs]
+
+def start_job(db: Session, job_id: int) -> Optional[Tuple[str, str, Optional[int]]]:
+    """Mark a job as processing; returns its filename, file path and document ID, or None if it is done."""
+    job = db.get(models.IngestionJob, job_id)
+    if job is None or job.status not in UNFINISHED_STATUSES:
+        return None
+    job.status = "processing"
+    return job.filename, job.file_path, job.document_id
+
+def _job_document(
+    db: Session,
+    job: models.IngestionJob,
+    total_pages: int,
+    previous_version: Optional[Tuple[int, int]]
+) -> models.Document:
+    if job.document is None:
+        job.document = models.Document(
+            filename=job.filename,
+            total_pages=total_pages,
+            version=previous_version[1] + 1 if previous_version else 1,
+            previous_version_id=previous_version[0] if previous_version else None
+        )
+        db.flush()
+    return job.document
+
+def record_job_document(
+    db: Session,
+    job_id: int,
+    total_pages: int,
+    previous_version: Optional[Tuple[int, int]] = None
+) -> None:
+    job = db.get(models.IngestionJob, job_id)
+    job.total_pages = total_pages
+    _job_document(db, job, total_pages, previous_version)
+
+def record_job_page(
+    db: Session,
+    job_id: int,
+    page_number: int,
+    fields: List[FieldRow],
+    error: Optional[str] = None,
+    previous_version: Optional[Tuple[int, int]] = None
+) -> None:
+    job = db.get(models.IngestionJob, job_id)
+    document = _job_document(db, job, job.total_pages, previous_version)
+    insert_extracted_fields(db, document.id, fields)
+    job.pages.append(models.IngestionJobPage(
+        page_number=page_number,
+        status="failed" if error else "completed",
+        field_count=len(fields),
+        error=error
+    ))
+    job.pages_completed = len(job.pages)
+
+def finish_job(
+    db: Session,
+    job_id: int,
+    result: Dict[str, Any],
+    content_hash: Optional[str] = None
+) -> None:
+    """Record a job's outcome and, if it completed, its document's totals, tables and fingerprints."""
+    job = db.get(models.IngestionJob, job_id)
+    if "error" in result:
+        job.status = "failed"
+        job.error = result["error"]
+        return
+    job.status = "completed"
+    stats = result["stats"]
+    job.document.llm_requests = stats["requests"]
+    job.document.prompt_tokens = stats["prompt_tokens"]
+    job.document.completion_tokens = stats["completion_tokens"]
+    job.document.content_hash = content_hash
+    insert_tables(db, job.document.id, result["tables"])
+    insert_page_fingerprints(db, job.document.id, stats)
+    if stats["failed_pages"]:
+        job.error = f"LLM extraction failed for pages {stats['failed_pages']}"
+
+class JobProgressRecorder(ExtractionListener):
+    """Persists per-page progress and partial fields of an ingestion job.
+
+    Callbacks run on the event loop, so they queue their writes on the
+    database writer without waiting; ``writes`` holds the pending results.
+    """
+
+    def __init__(self, writer: DatabaseWriter, job_id: int, previous_version: Optional[models.Document] = None):
+        self.writer = writer
+        self.job_id = job_id
+        # ID and version, as the document is read in another session
+        self.previous_version = (previous_version.id, previous_version.version) if previous_version else None
+        self.writes: List[asyncio.Future] = []
+
+    def on_document(self, total_pages: int) -> None:
+        self.writes.append(self.writer.submit_nowait(
+            partial(record_job_document, job_id=self.job_id, total_pages=total_pages,
+                    previous_version=self.previous_version)
+        ))
+
+    def on_page(self, page_number: int, fields: List[FieldRow], error: Optional[str] = None) -> None:
+        self.writes.append(self.writer.submit_nowait(
+            partial(record_job_page, job_id=self.job_id, page_number=page_number, fields=fields, error=error,
+                    previous_version=self.previous_version)
+        ))
+
+class JobService:
+    """Queues uploaded documents and processes them on a pool of async workers."""
+
+    def __init__(
+        self,
+        extraction_service: ExtractionService,
+        document_store: Optional[DocumentStore] = None,
+        num_workers: Optional[int] = None,
+        database_writer: Optional[DatabaseWriter] = None
+    ):
+        self.extraction_service = extraction_service
+        self.document_store = document_store or DocumentStore()
+        self.writer = database_writer or DatabaseWriter()
+        self.num_workers = num_workers or settings.JOB_WORKERS
+        self.storage_dir = os.path.join(settings.UPLOAD_DIR, "jobs")
+        self.queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start the worker pool and re-enqueue jobs interrupted by a restart."""
+        os.makedirs(self.storage_dir, exist_ok=True)
+        self.queue = asyncio.Queue()
+        for job_id in self._recover_jobs():
+            self.queue.put_nowait(job_id)
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.num_workers)
+        ]
+        logger.info(f"Started {self.num_workers} ingestion workers")
+
+    async def stop(self) -> None:
+        """Cancel the workers. Unfinished jobs are picked up again on next start."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, uploads: List[Tuple[str, str]]) -> List[Job]:
+        """Record a job per ``(spooled_path, filename)`` upload, move the files into job storage and queue them."""
+        jobs = await self.writer.submit(partial(create_jobs, uploads=uploads, storage_dir=self.storage_dir))
+        for job, (spooled_path, _) in zip(jobs, uploads):
+            os.replace(spooled_path, os.path.join(self.storage_dir, f"{job.id}.pdf"))
+            self.queue.put_nowait(job.id)
+            logger.info(f"Queued job {job.id} for {job.filename}")
+        return jobs
+
+    def _recover_jobs(self) -> List[int]:
+        """Reset jobs left unfinished by a previous process and return their IDs."""
+        db = SessionLocal()
+        try:
+            jobs = db.query(models.IngestionJob).filter(
+                models.IngestionJob.status.in_(UNFINISHED_STATUSES)
+            ).order_by(models.IngestionJob.id).all()
+            for job in jobs:
+                # Pages are re-extracted from scratch, so drop partial results
+                if job.document_id is not None:
+                    db.query(models.ExtractedField).filter(
+                        models.ExtractedField.document_id == job.document_id
+                    ).delete()
+                job.pages.clear()
+                job.pages_completed = 0
+                job.status = "queued"
+            db.commit()
+            if jobs:
+                logger.info(f"Recovered {len(jobs)} unfinished ingestion jobs")
+            return [job.id for job in jobs]
+        finally:
+            db.close()
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            job_id = await self.queue.get()
+            try:
+                await self._run_job(job_id)
+            except Exception as e:
+                logger.error(f"Worker {worker_id} failed on job {job_id}: {str(e)}")
+                logger.error(traceback.format_exc())
+            finally:
+                self.queue.task_done()
+
+    async def _run_job(self, job_id: int) -> None:
+        job = await self.writer.submit(partial(start_job, job_id=job_id))
+        if job is None:
+            return
+        filename, file_path, document_id = job
+
+        previous = None
+        previous_pages = None
+        if settings.DOCUMENT_VERSIONING:
+            async with async_session() as db:
+                # A job resumed after a restart may already have its document
+                previous = await db.run_sync(find_previous_version, filename, document_id)
+                previous_pages = await db.run_sync(reusable_page_fields, previous)
+
+        recorder = JobProgressRecorder(self.writer, job_id, previous)
+        try:
+            result = await self.extraction_service.process_document(
+                file_path,
+                filename,
+                listener=recorder,
+                previous_pages=previous_pages
+            )
+        except Exception as e:
+            result = {"error": f"Unexpected error: {str(e)}"}
+        # Progress writes are committed before the outcome
+        for write in await asyncio.gather(*recorder.writes, return_exceptions=True):
+            if isinstance(write, Exception) and "error" not in result:
+                result = {"error": f"Unexpected error: {str(write)}"}
+
+        content_hash = None
+        if "error" in result:
+            logger.error(f"Job {job_id} failed: {result['error']}")
+        elif os.path.exists(file_path):
+            # Keep the original for page rendering
+            content_hash = await asyncio.to_thread(self.document_store.put, file_path)
+        await self.writer.submit(partial(finish_job, job_id=job_id, result=result, content_hash=content_hash))
+        if "error" not in result:
+            logger.info(f"Job {job_id} completed")
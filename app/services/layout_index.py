@@ -0,0 +1,154 @@
+from array import array
+from bisect import bisect_right
+from typing import Any, List, Optional, Set, Tuple
+import math
+import re
+
+# Average Helvetica/Times glyph advance as a fraction of the font size. PDF
+# content streams do not carry glyph widths without the font metrics, so
+# word widths are estimated from character counts.
+AVERAGE_CHAR_WIDTH = 0.5
+ASCENT = 0.8
+DESCENT = 0.2
+# Bounding boxes are scaled to this range to match the API's existing contract
+BOX_SCALE = 1000.0
+
+WORD_PATTERN = re.compile(r"\S+")
+
+def _multiply(m: List[float], n: List[float]) -> List[float]:
+    """Multiply two PDF transformation matrices given as [a, b, c, d, e, f]."""
+    return [
+        m[0] * n[0] + m[1] * n[2],
+        m[0] * n[1] + m[1] * n[3],
+        m[2] * n[0] + m[3] * n[2],
+        m[2] * n[1] + m[3] * n[3],
+        m[4] * n[0] + m[5] * n[2] + n[4],
+        m[4] * n[1] + m[5] * n[3] + n[5],
+    ]
+
+class PageLayout:
+    """Word positions for one page, stored in flat arrays.
+
+    ``text`` is every word of the page lowercased and joined by single spaces,
+    and ``starts[i]`` is the offset of word ``i`` in it. ``cased`` is the same
+    text with the original case, at the same offsets. Coordinates are in PDF
+    points with a top-left origin.
+    """
+
+    __slots__ = ("width", "height", "text", "cased", "starts", "x0", "y0", "x1", "y1")
+
+    def __init__(self, width: float, height: float):
+        self.width = width
+        self.height = height
+        self.text = ""
+        self.cased = ""
+        self.starts = array("I")
+        self.x0 = array("f")
+        self.y0 = array("f")
+        self.x1 = array("f")
+        self.y1 = array("f")
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def word(self, index: int) -> str:
+        """The original-case text of word ``index``."""
+        end = self.starts[index + 1] - 1 if index + 1 < len(self.starts) else len(self.cased)
+        return self.cased[self.starts[index]:end]
+
+    def text_without(self, words: Set[int]) -> str:
+        """The original-case page text with the words at the indices in ``words`` left out."""
+        return " ".join(self.word(i) for i in range(len(self.starts)) if i not in words)
+
+    def scale_box(self, x0: float, y0: float, x1: float, y1: float) -> Tuple[float, float, float, float]:
+        """Convert a box in points to the API's (x, y, width, height) in ``BOX_SCALE`` units."""
+        scale_x = BOX_SCALE / self.width if self.width else 1.0
+        scale_y = BOX_SCALE / self.height if self.height else 1.0
+        return (
+            round(x0 * scale_x, 1),
+            round(y0 * scale_y, 1),
+            round((x1 - x0) * scale_x, 1),
+            round((y1 - y0) * scale_y, 1)
+        )
+
+    def _find(self, needle: str) -> int:
+        """Offset of the first whole-word match, else of the first substring match."""
+        text = self.text
+        first = offset = text.find(needle)
+        while offset >= 0:
+            end = offset + len(needle)
+            if (offset == 0 or text[offset - 1] == " ") and (end == len(text) or text[end] == " "):
+                return offset
+            offset = text.find(needle, offset + 1)
+        return first
+
+    def find_box(self, value: str) -> Optional[Tuple[float, float, float, float]]:
+        """Find the (x, y, width, height) box of the first occurrence of ``value``."""
+        needle = " ".join(value.lower().split())
+        if not needle:
+            return None
+        offset = self._find(needle)
+        if offset < 0:
+            return None
+
+        first = bisect_right(self.starts, offset) - 1
+        last = bisect_right(self.starts, offset + len(needle) - 1) - 1
+        return self.scale_box(
+            min(self.x0[first:last + 1]),
+            min(self.y0[first:last + 1]),
+            max(self.x1[first:last + 1]),
+            max(self.y1[first:last + 1])
+        )
+
+class LayoutBuilder:
+    """Collects word positions through PyPDF2's ``extract_text`` visitors.
+
+    ``visitor_text`` reports the text matrix in effect when a chunk is flushed,
+    which is already the position of the next chunk. The position of the first
+    text-showing operator of each chunk is recorded instead.
+    """
+
+    SHOW_OPERATORS = (b"Tj", b"TJ", b"'", b'"')
+
+    def __init__(self, width: float, height: float):
+        self.layout = PageLayout(width, height)
+        self._words: List[str] = []
+        self._cased: List[str] = []
+        self._length = 0
+        self._chunk_matrix: Optional[List[float]] = None
+
+    def visit_operand(self, operator: bytes, args: Any, cm: List[float], tm: List[float]) -> None:
+        if operator in self.SHOW_OPERATORS and self._chunk_matrix is None:
+            self._chunk_matrix = _multiply(tm, cm)
+
+    def visit_text(self, text: str, cm: Any, tm: Any, font_dict: Any, font_size: float) -> None:
+        if not text.strip():
+            return
+        matrix = self._chunk_matrix
+        self._chunk_matrix = None
+        if matrix is None:
+            return
+
+        scale = math.hypot(matrix[0], matrix[1]) or 1.0
+        size = (font_size or 1.0) * scale
+        advance = size * AVERAGE_CHAR_WIDTH
+        baseline = self.layout.height - matrix[5]
+        layout = self.layout
+        for match in WORD_PATTERN.finditer(text):
+            cased = match.group()
+            word = cased.lower()
+            layout.starts.append(self._length)
+            self._words.append(word)
+            # Keep offsets shared with the lowercased text
+            self._cased.append(cased if len(cased) == len(word) else word)
+            self._length += len(word) + 1
+            x0 = matrix[4] + match.start() * advance
+            layout.x0.append(x0)
+            layout.x1.append(x0 + len(word) * advance)
+            layout.y0.append(baseline - size * ASCENT)
+            layout.y1.append(baseline + size * DESCENT)
+
+    def build(self) -> PageLayout:
+        self.layout.text = " ".join(self._words)
+        self.layout.cased = " ".join(self._cased)
+        return self.layout
@@ -1,89 +1,488 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 import json
-from openai import OpenAI
+import logging
+import re
+import time
 from app.config import settings
+from app.services.cache_service import LLMCache
+from app.services.model_cascade import ModelCascade
+from app.services.rate_limiter import get_rate_limiter
+from app.utils import metrics
+from app.utils.helpers import CHARS_PER_TOKEN, estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the extraction prompt changes so cached results are not reused
+PROMPT_VERSION = "1"
+
+BOUNDING_BOX_INSTRUCTION = """
+    5. The approximate bounding box coordinates where this field appears in the document (x, y, width, height)"""
+
+BOUNDING_BOX_SCHEMA = """,
+                "bounding_box": {
+                    "x": float,
+                    "y": float,
+                    "width": float,
+                    "height": float
+                }"""
+
+BOUNDING_BOX_RULE = """
+    - Make bounding box coordinates reasonable (0-1000 range)"""
+
+PAGE_NUMBER_SCHEMA = """,
+                "page_number": integer"""
+
+PAGE_NUMBER_RULE = """
+    - Set page_number to the number in the "=== PAGE n ===" line above the field"""
+
+def build_column_label_prompt(header: Optional[List[str]], sample_rows: List[List[str]]) -> str:
+    """Build the prompt that names a detected table's columns."""
+    column_count = len(sample_rows[0])
+    lines = []
+    if header:
+        lines.append("Header: " + " | ".join(header))
+    for row in sample_rows:
+        lines.append("Row: " + " | ".join(row))
+    table = "\n".join(lines)
+    return f"""
+    The following table was found in a document such as a phone bill or invoice.
+    Cells are separated by " | "; empty cells are blank.
+
+    {table}
+
+    Return a JSON object with:
+    - "section_name": a snake_case name for the table, e.g. "call_details" or "line_items"
+    - "columns": exactly {column_count} snake_case column names, in order, e.g. "date", "number_called", "amount"
+    """
+
+def build_extraction_prompt(
+    text: str,
+    page_number: int,
+    include_bounding_boxes: bool = True,
+    page_numbers: Optional[List[int]] = None
+) -> str:
+    """Build the field extraction prompt for a page of text.
+
+    Without ``include_bounding_boxes`` the model is not asked for coordinates,
+    which keeps responses smaller when boxes come from the PDF layout instead.
+    With ``page_numbers`` the text holds several pages, each introduced by an
+    ``=== PAGE n ===`` line, and every field must say which page it is from.
+    """
+    box_instruction = BOUNDING_BOX_INSTRUCTION if include_bounding_boxes else ""
+    box_schema = BOUNDING_BOX_SCHEMA if include_bounding_boxes else ""
+    box_rule = BOUNDING_BOX_RULE if include_bounding_boxes else ""
+    if page_numbers:
+        source = f"pages {', '.join(str(n) for n in page_numbers)}"
+        page_schema = PAGE_NUMBER_SCHEMA
+        page_rule = PAGE_NUMBER_RULE
+    else:
+        source = f"page {page_number}"
+        page_schema = ""
+        page_rule = ""
+    return f"""
+    You are a document analysis expert. Analyze the following text from {source} of a document and extract key-value pairs.
+    Focus on common fields in documents like:
+    - Dates
+    - Amounts (with currency symbols)
+    - Names
+    - Account numbers
+    - Reference numbers
+    - Addresses
+    - Phone numbers
+    - Email addresses
+    - Status indicators
+    - Section headers
+    - Total amounts
+    - Due dates
+    - Service periods
+
+    For each field you find, provide:
+    1. A clear, concise field name (e.g., "total_amount", "due_date", "account_number")
+    2. The exact value as it appears in the document
+    3. A brief description of what the field represents
+    4. The section name where this field appears (e.g., "header", "billing_summary", "call_details"){box_instruction}
+
+    Text to analyze:
+    {text}
+
+    Return the results as a JSON object with a "fields" array containing objects with this structure:
+    {{
+        "fields": [
+            {{
+                "field_name": "string",
+                "field_value": "string",
+                "description": "string",
+                "section_name": "string"{box_schema}{page_schema}
+            }}
+        ]
+    }}
+
+    Important:
+    - Extract ALL fields you can find, even if they seem obvious
+    - Use consistent field names (lowercase, underscores)
+    - Include currency symbols with amounts
+    - Preserve exact formatting of values{box_rule}{page_rule}
+    - Identify clear section boundaries
+    """
+
+def split_text(text: str, max_tokens: int, overlap_tokens: int) -> List[str]:
+    """Split text into chunks of at most ``max_tokens`` that overlap by ``overlap_tokens``.
+
+    Chunks end on whitespace where possible so values are not cut in half.
+    """
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    overlap_chars = min(overlap_tokens * CHARS_PER_TOKEN, max_chars // 2)
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + max_chars, len(text))
+        if end < len(text):
+            boundary = text.rfind(" ", start + max_chars // 2, end)
+            if boundary > start:
+                end = boundary
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        # Step back for the overlap, then forward to the next word start
+        start = max(end - overlap_chars, start + 1)
+        match = re.search(r"\s", text[start:end])
+        if match:
+            start += match.end()
+    return chunks
+
+class LLMRequestError(Exception):
+    """An OpenAI request failed after all retries."""
+
+class ExtractionRequest:
+    """One LLM call: a chunk of a page, a whole page, or several small pages.
+
+    ``chunk`` is the chunk's position when an oversized page was split.
+    """
+
+    def __init__(self, segments: List[Tuple[int, str]], chunk: Optional[int] = None):
+        self.segments = segments
+        self.chunk = chunk
+
+    @property
+    def page_numbers(self) -> List[int]:
+        return [page_number for page_number, _ in self.segments]
+
+    @property
+    def is_batch(self) -> bool:
+        return len(self.segments) > 1
+
+    @property
+    def text(self) -> str:
+        """The request text, with page tags when several pages are packed."""
+        if not self.is_batch:
+            return self.segments[0][1]
+        return "\n\n".join(
+            f"=== PAGE {page_number} ===\n{text}" for page_number, text in self.segments
+        )
 
 class LLMService:
     def __init__(self):
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
-        self.model = "gpt-4-turbo-preview"
+        self._client = None
+        # Cheaper models first; see ModelCascade. Single-model calls
+        # (batch jobs, section detection) use the last, strongest tier.
+        self.cascade = ModelCascade()
+        self.model = self.cascade.models[-1]
+        self.cache = LLMCache() if settings.LLM_CACHE_ENABLED else None
+        self.rate_limiter = get_rate_limiter()
+        # Boxes are resolved from the PDF layout when layout mode is on
+        self.include_bounding_boxes = not settings.LAYOUT_BOUNDING_BOXES
+        self.prompt_version = PROMPT_VERSION if self.include_bounding_boxes else f"{PROMPT_VERSION}-nobox"
+
+    @property
+    def client(self) -> Any:
+        """The OpenAI client, created on first use: the openai package is slow to import."""
+        if self._client is None:
+            from openai import OpenAI
+            # Retries are handled by the shared rate limiter, not the client
+            self._client = OpenAI(
+                api_key=settings.OPENAI_API_KEY,
+                max_retries=0,
+                timeout=settings.LLM_REQUEST_TIMEOUT
+            )
+        return self._client
+
+    def plan_requests(self, pages: List[Tuple[int, str]]) -> List[ExtractionRequest]:
+        """Group page texts into LLM requests within the token budget.
+
+        Pages over ``LLM_TOKEN_BUDGET`` are split into overlapping chunks.
+        Consecutive pages under ``LLM_BATCH_MAX_PAGE_TOKENS`` are packed into
+        one page-tagged request, up to the budget and ``LLM_BATCH_MAX_PAGES``.
+        """
+        requests = []
+        batch: List[Tuple[int, str]] = []
+        batch_tokens = 0
+        for page_number, text in pages:
+            tokens = estimate_tokens(text)
+            if tokens > settings.LLM_TOKEN_BUDGET:
+                chunks = split_text(text, settings.LLM_TOKEN_BUDGET, settings.LLM_CHUNK_OVERLAP_TOKENS)
+                for index, chunk in enumerate(chunks):
+                    requests.append(ExtractionRequest([(page_number, chunk)], chunk=index))
+            elif tokens <= settings.LLM_BATCH_MAX_PAGE_TOKENS:
+                if batch and (
+                    batch_tokens + tokens > settings.LLM_TOKEN_BUDGET
+                    or len(batch) >= settings.LLM_BATCH_MAX_PAGES
+                ):
+                    requests.append(ExtractionRequest(batch))
+                    batch, batch_tokens = [], 0
+                batch.append((page_number, text))
+                batch_tokens += tokens
+            else:
+                requests.append(ExtractionRequest([(page_number, text)]))
+        if batch:
+            requests.append(ExtractionRequest(batch))
+        return requests
+
+    def extract_request(self, request: ExtractionRequest) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+        """Run one planned request and return its fields and token usage.
+
+        Every returned field has a ``page_number``. For packed requests it
+        comes from the model and is checked against the pages in the request.
+        """
+        fields, usage = self._extract(
+            request.text, self._request_prompt(request), request.page_numbers[0], request.page_numbers
+        )
+        return self.assign_pages(fields, request.page_numbers), usage
 
     def extract_fields(self, text: str, page_number: int) -> List[Dict[str, Any]]:
         """Extract fields from text using OpenAI's LLM."""
-        prompt = f"""
-        You are a document analysis expert. Analyze the following text from page {page_number} of a document and extract key-value pairs.
-        Focus on common fields in documents like:
-        - Dates
-        - Amounts (with currency symbols)
-        - Names
-        - Account numbers
-        - Reference numbers
-        - Addresses
-        - Phone numbers
-        - Email addresses
-        - Status indicators
-        - Section headers
-        - Total amounts
-        - Due dates
-        - Service periods
-
-        For each field you find, provide:
-        1. A clear, concise field name (e.g., "total_amount", "due_date", "account_number")
-        2. The exact value as it appears in the document
-        3. A brief description of what the field represents
-        4. The section name where this field appears (e.g., "header", "billing_summary", "call_details")
-        5. The approximate bounding box coordinates where this field appears in the document (x, y, width, height)
+        prompt = build_extraction_prompt(text, page_number, self.include_bounding_boxes)
+        fields, _ = self._extract(text, prompt, page_number)
+        return fields
 
-        Text to analyze:
-        {text}
+    def _request_prompt(self, request: ExtractionRequest) -> str:
+        page_numbers = request.page_numbers
+        return build_extraction_prompt(
+            request.text,
+            page_numbers[0],
+            self.include_bounding_boxes,
+            page_numbers if request.is_batch else None
+        )
 
-        Return the results as a JSON object with a "fields" array containing objects with this structure:
-        {{
-            "fields": [
-                {{
-                    "field_name": "string",
-                    "field_value": "string",
-                    "description": "string",
-                    "section_name": "string",
-                    "bounding_box": {{
-                        "x": float,
-                        "y": float,
-                        "width": float,
-                        "height": float
-                    }}
-                }}
-            ]
-        }}
+    @staticmethod
+    def assign_pages(fields: List[Dict[str, Any]], page_numbers: List[int]) -> List[Dict[str, Any]]:
+        """Set each field's ``page_number``, keeping the model's only if it is one of ``page_numbers``."""
+        for field in fields:
+            try:
+                page_number = int(field.get("page_number"))
+            except (TypeError, ValueError):
+                page_number = None
+            field["page_number"] = page_number if page_number in page_numbers else page_numbers[0]
+        return fields
+
+    def extraction_body(self, prompt: str, model: Optional[str] = None) -> Dict[str, Any]:
+        """Chat completion arguments for an extraction prompt."""
+        system_prompt = "You are a document analysis expert. Extract key-value pairs from documents"
+        if self.include_bounding_boxes:
+            system_prompt += " and provide their locations"
+        return {
+            "model": model or self.model,
+            "messages": [
+                {"role": "system", "content": f"{system_prompt}."},
+                {"role": "user", "content": prompt}
+            ],
+            "temperature": 0.1,
+            "response_format": {"type": "json_object"}
+        }
+
+    def request_body(self, request: ExtractionRequest) -> Dict[str, Any]:
+        """Chat completion arguments for a planned request, for sending in a batch job."""
+        return self.extraction_body(self._request_prompt(request))
+
+    def _cache_get(self, key: str) -> Optional[Any]:
+        cached = self.cache.get(key)
+        metrics.LLM_CACHE.labels("miss" if cached is None else "hit").inc()
+        if cached is not None:
+            metrics.LLM_REQUESTS.labels("cached").inc()
+        return cached
+
+    @staticmethod
+    def count_tokens(usage: Any) -> None:
+        """Add a completion's token usage to the metrics."""
+        metrics.LLM_TOKENS.labels("prompt").inc(usage.prompt_tokens)
+        metrics.LLM_TOKENS.labels("completion").inc(usage.completion_tokens)
+
+    def cached_request(self, request: ExtractionRequest) -> Optional[List[Dict[str, Any]]]:
+        """Return a planned request's fields from the result cache, or None."""
+        if not self.cache:
+            return None
+        fields = self._cache_get(self.cache.make_key(request.text, self.cascade.name, self.prompt_version))
+        return None if fields is None else self.assign_pages(fields, request.page_numbers)
 
-        Important:
-        - Extract ALL fields you can find, even if they seem obvious
-        - Use consistent field names (lowercase, underscores)
-        - Include currency symbols with amounts
-        - Preserve exact formatting of values
-        - Make bounding box coordinates reasonable (0-1000 range)
-        - Identify clear section boundaries
+    def parse_request_response(self, request: ExtractionRequest, content: str) -> List[Dict[str, Any]]:
+        """Parse the completion of a planned request sent in a batch job, and cache it."""
+        fields = json.loads(content).get("fields", [])
+        if self.cache:
+            self.cache.set(
+                self.cache.make_key(request.text, self.cascade.name, self.prompt_version),
+                self.cascade.name, self.prompt_version, fields
+            )
+        return self.assign_pages(fields, request.page_numbers)
+
+    def _send_completion(self, **kwargs: Any) -> Any:
+        """Send a chat completion request to OpenAI."""
+        return self.client.chat.completions.create(**kwargs)
+
+    def _create_completion(self, **kwargs: Any) -> Any:
+        """Send a chat completion request through the shared rate limiter."""
+        estimated_tokens = sum(estimate_tokens(m["content"]) for m in kwargs["messages"])
+        return self.rate_limiter.call(
+            lambda: self._send_completion(**kwargs),
+            estimated_tokens=estimated_tokens,
+            usage_tokens=lambda response: response.usage.total_tokens if response.usage else estimated_tokens
+        )
+
+    def _extract(
+        self,
+        text: str,
+        prompt: str,
+        page_number: int,
+        page_numbers: Optional[List[int]] = None
+    ) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Call the LLM with a prepared prompt, going through the result cache.
+
+        Model tiers are tried in order until an answer passes the cascade's
+        validation; the last tier's answer is used as is. Raises
+        ``LLMRequestError`` when the last tier keeps failing after retries,
+        so a throttled page is reported instead of coming back empty.
         """
+        import openai
+
+        usage = {
+            "requests": 0, "cached_requests": 0, "escalated_requests": 0,
+            "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0
+        }
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(text, self.cascade.name, self.prompt_version)
+            cached_fields = self._cache_get(cache_key)
+            if cached_fields is not None:
+                usage["cached_requests"] = 1
+                return cached_fields, usage
+
+        page_numbers = page_numbers or [page_number]
+        for model in self.cascade.models:
+            last = self.cascade.is_last(model)
+            started = time.perf_counter()
+            try:
+                response = self._create_completion(**self.extraction_body(prompt, model))
+            except openai.OpenAIError as e:
+                self.cascade.record(model, "failed", time.perf_counter() - started)
+                metrics.LLM_REQUESTS.labels("failed").inc()
+                if last:
+                    raise LLMRequestError(f"LLM request for page {page_number} failed: {str(e)}") from e
+                logger.warning(f"{model} failed for page {page_number}, escalating: {str(e)}")
+                usage["escalated_requests"] += 1
+                continue
+            seconds = time.perf_counter() - started
+            usage["requests"] += 1
+            metrics.LLM_REQUESTS.labels("ok").inc()
+            if response.usage:
+                usage["prompt_tokens"] += response.usage.prompt_tokens
+                usage["completion_tokens"] += response.usage.completion_tokens
+                self.count_tokens(response.usage)
+
+            fields, problem = self.cascade.validate(response.choices[0].message.content, text, page_numbers)
+            if problem is not None and not last:
+                usage["cost_usd"] += self.cascade.record(model, "escalated", seconds, response.usage)
+                usage["escalated_requests"] += 1
+                logger.info(f"Escalating page {page_number} from {model}: {problem}")
+                continue
+            usage["cost_usd"] += self.cascade.record(model, "accepted", seconds, response.usage)
+            if fields is None:
+                logger.error(f"Error in LLM extraction for page {page_number}: {problem}")
+                return [], usage
+            if not fields:
+                logger.warning(f"No fields extracted from page {page_number}")
+                logger.debug(f"Raw text of page {page_number}: {text[:200]}...")
+            if cache_key:
+                self.cache.set(cache_key, self.cascade.name, self.prompt_version, fields)
+            return fields, usage
+
+    def label_body(
+        self,
+        header: Optional[List[str]],
+        sample_rows: List[List[str]],
+        model: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Chat completion arguments for naming a table's columns."""
+        return {
+            "model": model or self.model,
+            "messages": [
+                {"role": "system", "content": "You are a document analysis expert. Name the columns of tables."},
+                {"role": "user", "content": build_column_label_prompt(header, sample_rows)}
+            ],
+            "temperature": 0.1,
+            "response_format": {"type": "json_object"}
+        }
 
+    def _label_key(self, header: Optional[List[str]], sample_rows: List[List[str]]) -> str:
+        return self.cache.make_key(build_column_label_prompt(header, sample_rows), self.cascade.name, PROMPT_VERSION)
+
+    def cached_labels(self, header: Optional[List[str]], sample_rows: List[List[str]]) -> Optional[Dict[str, Any]]:
+        """Return a table's column labels from the result cache, or None."""
+        if not self.cache:
+            return None
+        cached = self._cache_get(self._label_key(header, sample_rows))
+        return cached[0] if cached else None
+
+    def parse_labels(self, content: str, header: Optional[List[str]], sample_rows: List[List[str]]) -> Optional[Dict[str, Any]]:
+        """Parse a column-labeling completion and cache it; None unless there is one name per column."""
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a document analysis expert. Extract key-value pairs from documents and provide their locations."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.1,
-                response_format={"type": "json_object"}
-            )
-            
-            result = json.loads(response.choices[0].message.content)
-            if not result.get("fields"):
-                print(f"No fields extracted from page {page_number}")
-                print(f"Raw text: {text[:200]}...")  # Print first 200 chars for debugging
-            return result.get("fields", [])
-            
-        except Exception as e:
-            print(f"Error in LLM extraction: {str(e)}")
-            return []
+            result = json.loads(content)
+        except ValueError:
+            return None
+        columns = result.get("columns")
+        if not isinstance(columns, list) or len(columns) != len(sample_rows[0]):
+            return None
+        labels = {
+            "section_name": str(result.get("section_name") or "table"),
+            "columns": [str(column) for column in columns]
+        }
+        if self.cache:
+            self.cache.set(self._label_key(header, sample_rows), self.cascade.name, PROMPT_VERSION, [labels])
+        return labels
+
+    def label_columns(self, header: Optional[List[str]], sample_rows: List[List[str]]) -> Optional[Dict[str, Any]]:
+        """Name a table's columns from its header and a few sample rows.
+
+        Returns ``{"section_name", "columns"}``, or None if the request fails
+        or the answer does not have one name per column.
+        """
+        import openai
+
+        cached = self.cached_labels(header, sample_rows)
+        if cached is not None:
+            return cached
+        for model in self.cascade.models:
+            started = time.perf_counter()
+            try:
+                response = self._create_completion(**self.label_body(header, sample_rows, model))
+            except openai.OpenAIError as e:
+                self.cascade.record(model, "failed", time.perf_counter() - started)
+                metrics.LLM_REQUESTS.labels("failed").inc()
+                logger.warning(f"Column labeling with {model} failed: {str(e)}")
+                continue
+            except Exception as e:
+                self.cascade.record(model, "failed", time.perf_counter() - started)
+                metrics.LLM_REQUESTS.labels("failed").inc()
+                logger.error(f"Error in column labeling with {model}: {str(e)}")
+                return None
+            seconds = time.perf_counter() - started
+            metrics.LLM_REQUESTS.labels("ok").inc()
+            if response.usage:
+                self.count_tokens(response.usage)
+            labels = self.parse_labels(response.choices[0].message.content, header, sample_rows)
+            if labels is None and not self.cascade.is_last(model):
+                self.cascade.record(model, "escalated", seconds, response.usage)
+                continue
+            self.cascade.record(model, "accepted", seconds, response.usage)
+            return labels
+        return None
 
     def identify_sections(self, text: str) -> List[Dict[str, Any]]:
         """Identify document sections using OpenAI's LLM."""
@@ -121,7 +520,7 @@ class LLMService:
         """
 
         try:
-            response = self.client.chat.completions.create(
+            response = self._create_completion(
                 model=self.model,
                 messages=[
                     {"role": "system", "content": "You are a document analysis expert. Identify distinct sections in documents."},
@@ -135,5 +534,5 @@ class LLMService:
             return result.get("sections", [])
             
         except Exception as e:
-            print(f"Error in section identification: {str(e)}")
+            logger.error(f"Error in section identification: {str(e)}")
             return []
@@ -0,0 +1,120 @@
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import threading
+
+from app.config import settings
+from app.utils import metrics
+
+def normalize(text: str) -> str:
+    return " ".join(text.split()).lower()
+
+def _empty_stats() -> Dict[str, Any]:
+    return {
+        "requests": 0, "accepted": 0, "escalated": 0, "failed": 0, "seconds": 0.0,
+        "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0
+    }
+
+class ModelCascade:
+    """Model tiers tried in order, cheapest first.
+
+    A tier's answer is accepted if it passes ``validate``; otherwise the
+    request moves to the next tier. The last tier's parseable answer is
+    always accepted. Per-tier request outcomes, latency, tokens and
+    estimated cost are counted for ``stats`` and the metrics endpoint.
+    """
+
+    def __init__(
+        self,
+        models: Optional[List[str]] = None,
+        prices: Optional[Dict[str, List[float]]] = None,
+        min_fields_per_page: Optional[int] = None,
+        min_verbatim_ratio: Optional[float] = None
+    ):
+        self.models = list(models or settings.LLM_MODEL_TIERS)
+        self.prices = settings.LLM_MODEL_PRICES if prices is None else prices
+        self.min_fields_per_page = (
+            settings.LLM_CASCADE_MIN_FIELDS_PER_PAGE if min_fields_per_page is None else min_fields_per_page
+        )
+        self.min_verbatim_ratio = (
+            settings.LLM_CASCADE_MIN_VERBATIM_RATIO if min_verbatim_ratio is None else min_verbatim_ratio
+        )
+        self._lock = threading.Lock()
+        self._stats = {model: _empty_stats() for model in self.models}
+
+    @property
+    def name(self) -> str:
+        """Identifies the tier list, e.g. for cache keys."""
+        return "+".join(self.models)
+
+    def is_last(self, model: str) -> bool:
+        return model == self.models[-1]
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int) -> float:
+        """Estimated cost in US dollars from the per-million-token prices in settings."""
+        prompt_price, completion_price = self.prices.get(model, (0.0, 0.0))
+        return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+    def validate(self, content: str, text: str, page_numbers: List[int]) -> Tuple[Optional[List[Dict[str, Any]]], Optional[str]]:
+        """Check an extraction answer; returns its fields (None if unparseable) and the problem, if any.
+
+        The answer must be a JSON object with a ``fields`` list of objects
+        with a name and value, give at least ``min_fields_per_page`` fields
+        for every page in the request, and have at least
+        ``min_verbatim_ratio`` of its values appear verbatim in ``text``.
+        """
+        try:
+            fields = json.loads(content).get("fields")
+        except (ValueError, AttributeError):
+            return None, "malformed JSON"
+        if not isinstance(fields, list) or not all(isinstance(field, dict) for field in fields):
+            return None, "malformed fields"
+        if any(field.get("field_name") is None or field.get("field_value") is None for field in fields):
+            return fields, "field without a name or value"
+
+        per_page = {page_number: 0 for page_number in page_numbers}
+        for field in fields:
+            try:
+                page_number = int(field.get("page_number", page_numbers[0]))
+            except (TypeError, ValueError):
+                page_number = page_numbers[0]
+            if page_number in per_page:
+                per_page[page_number] += 1
+        missing = [page_number for page_number, count in per_page.items() if count < self.min_fields_per_page]
+        if missing:
+            return fields, f"too few fields for pages {missing}"
+
+        if fields and self.min_verbatim_ratio > 0:
+            haystack = normalize(text)
+            found = sum(normalize(str(field["field_value"])) in haystack for field in fields)
+            if found < self.min_verbatim_ratio * len(fields):
+                return fields, f"only {found} of {len(fields)} values found in the text"
+        return fields, None
+
+    def record(self, model: str, outcome: str, seconds: float, usage: Any = None) -> float:
+        """Count one request to ``model``; returns its estimated cost."""
+        prompt_tokens = usage.prompt_tokens if usage else 0
+        completion_tokens = usage.completion_tokens if usage else 0
+        cost = self.cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            stats = self._stats.setdefault(model, _empty_stats())
+            stats["requests"] += 1
+            stats[outcome] += 1
+            stats["seconds"] += seconds
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["cost_usd"] += cost
+        metrics.LLM_TIER_REQUESTS.labels(model, outcome).inc()
+        metrics.LLM_TIER_SECONDS.labels(model).observe(seconds)
+        metrics.LLM_COST.labels(model).inc(cost)
+        return cost
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-tier request outcomes, escalation rate, mean latency, tokens and cost."""
+        with self._lock:
+            snapshot = {model: dict(stats) for model, stats in self._stats.items()}
+        for stats in snapshot.values():
+            requests = stats["requests"]
+            stats["escalation_rate"] = round(stats["escalated"] / requests, 4) if requests else 0.0
+            stats["mean_latency_ms"] = round(stats.pop("seconds") / requests * 1000, 1) if requests else 0.0
+            stats["cost_usd"] = round(stats["cost_usd"], 6)
+        return snapshot
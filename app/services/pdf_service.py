@@ -1,38 +1,225 @@
 import os
-from typing import List, Tuple, Dict
-from PyPDF2 import PdfReader
-from pdf2image import convert_from_path
-from PIL import Image
+from concurrent.futures import ProcessPoolExecutor
+from typing import TYPE_CHECKING, List, Tuple, Dict, Optional, Union
+import asyncio
+import hashlib
 import io
+import mmap
+import multiprocessing
 from app.config import settings
+from app.services.layout_index import LayoutBuilder, PageLayout
+from app.services.table_detector import DetectedTable, TableDetector
+
+# PyPDF2, pdf2image and PIL are imported where used, to keep startup fast
+if TYPE_CHECKING:
+    from PIL import Image
+
+TABLE_DETECTOR = TableDetector(settings.TABLE_MIN_ROWS, settings.TABLE_MIN_COLUMNS)
+
+def clean_text(text: str) -> str:
+    """Normalize whitespace in text extracted from a PDF page."""
+    # Remove multiple spaces and newlines
+    text = ' '.join(text.split())
+    # Add some spacing between sections
+    return text.replace('. ', '.\n')
+
+def page_fingerprint(text: str) -> str:
+    """Fingerprint a page by its cleaned text, for matching pages across versions."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+class ParsedPDF:
+    """A PDF opened once, with page text extracted lazily and cached.
+
+    Accepts the raw bytes of an upload or a path. Paths are memory-mapped
+    rather than read into memory. Validation, page count and per-page text
+    all come from the same ``PdfReader``. With ``with_layout`` the same text
+    extraction pass also records word positions for each page.
+    """
+
+    def __init__(self, source: Union[bytes, str], with_layout: bool = False):
+        self.with_layout = with_layout
+        self._file = None
+        self._mmap = None
+        self._texts: Dict[int, str] = {}
+        self._layouts: Dict[int, PageLayout] = {}
+        try:
+            if isinstance(source, (bytes, bytearray, memoryview)):
+                stream = io.BytesIO(source)
+            elif os.path.getsize(source) == 0:
+                # Empty files cannot be mapped; let PdfReader report them
+                stream = io.BytesIO(b"")
+            else:
+                self._file = open(source, "rb")
+                self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                stream = self._mmap
+            from PyPDF2 import PdfReader
+
+            self.reader = PdfReader(stream)
+        except Exception:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        """Release the memory map and file handle, if any.
+
+        Page text and layouts extracted so far stay available.
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "ParsedPDF":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def page_count(self) -> int:
+        return len(self.reader.pages)
+
+    @property
+    def is_encrypted(self) -> bool:
+        return self.reader.is_encrypted
+
+    def page_text(self, page_number: int) -> str:
+        """Get the cleaned text of a page, numbered from 1."""
+        if page_number not in self._texts:
+            page = self.reader.pages[page_number - 1]
+            if self.with_layout:
+                builder = LayoutBuilder(float(page.mediabox.width), float(page.mediabox.height))
+                text = page.extract_text(
+                    visitor_operand_before=builder.visit_operand,
+                    visitor_text=builder.visit_text
+                )
+                self._layouts[page_number] = builder.build()
+            else:
+                text = page.extract_text()
+            self._texts[page_number] = clean_text(text)
+        return self._texts[page_number]
+
+    def page_layout(self, page_number: int) -> Optional[PageLayout]:
+        """Get the word positions of a page, if opened ``with_layout``."""
+        if not self.with_layout:
+            return None
+        self.page_text(page_number)
+        return self._layouts[page_number]
+
+    def texts(self) -> List[str]:
+        """Get the cleaned text of every page, in page order."""
+        return [self.page_text(page_number) for page_number in range(1, self.page_count + 1)]
+
+    def add_pages(self, first_page: int, texts: List[str], layouts: List[Optional[PageLayout]]) -> None:
+        """Cache page text and layouts extracted elsewhere, starting at ``first_page``."""
+        for page_number, (text, layout) in enumerate(zip(texts, layouts), first_page):
+            self._texts[page_number] = text
+            if layout is not None:
+                self._layouts[page_number] = layout
+
+def extract_page_range(
+    source: Union[bytes, str],
+    first_page: int,
+    last_page: int,
+    with_layout: bool
+) -> Tuple[List[str], List[Optional[PageLayout]]]:
+    """Extract the cleaned text (and layouts) of pages ``first_page`` to ``last_page``.
+
+    Runs in a parse worker process; only the text and the compact layout
+    arrays are sent back.
+    """
+    with ParsedPDF(source, with_layout=with_layout) as pdf:
+        pages = range(first_page, last_page + 1)
+        return [pdf.page_text(n) for n in pages], [pdf.page_layout(n) for n in pages]
+
+class ParsePool:
+    """Extracts page text on a pool of worker processes.
+
+    PyPDF2 text extraction is pure Python and CPU-bound, so running it on the
+    event loop stalls every request and uses one core. Documents longer than
+    ``pages_per_task`` are split into page ranges parsed in parallel.
+    """
+
+    def __init__(self, workers: Optional[int] = None, pages_per_task: Optional[int] = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.pages_per_task = max(1, pages_per_task or settings.PDF_PARSE_PAGES_PER_TASK)
+        # Workers are not forked from the server process, which runs threads
+        start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(start_method)
+        )
+
+    async def start(self) -> None:
+        """Start the worker processes now instead of on the first documents."""
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, os.getpid) for _ in range(self.workers)))
+
+    async def extract(self, pdf: ParsedPDF, source: Union[bytes, str]) -> None:
+        """Extract every page of ``pdf`` (opened from ``source``) into its cache."""
+        loop = asyncio.get_running_loop()
+        ranges = [
+            (first, min(first + self.pages_per_task - 1, pdf.page_count))
+            for first in range(1, pdf.page_count + 1, self.pages_per_task)
+        ]
+        results = await asyncio.gather(*(
+            loop.run_in_executor(self._executor, extract_page_range, source, first, last, pdf.with_layout)
+            for first, last in ranges
+        ))
+        for (first, _), (texts, layouts) in zip(ranges, results):
+            pdf.add_pages(first, texts, layouts)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(cancel_futures=True)
 
 class PDFService:
+    @staticmethod
+    def open_pdf(source: Union[bytes, str]) -> ParsedPDF:
+        """Open a PDF from bytes or a path for validation and text extraction."""
+        return ParsedPDF(source, with_layout=settings.LAYOUT_BOUNDING_BOXES)
+
+    @staticmethod
+    def detect_tables(layout: PageLayout) -> List[DetectedTable]:
+        """Find tables on a page from its word positions."""
+        return TABLE_DETECTOR.detect(layout)
+
     @staticmethod
     def extract_text(pdf_path: str) -> List[str]:
         """Extract text from each page of the PDF."""
-        reader = PdfReader(pdf_path)
-        texts = []
-        for page in reader.pages:
-            # Extract text and clean it
-            text = page.extract_text()
-            # Remove multiple spaces and newlines
-            text = ' '.join(text.split())
-            # Add some spacing between sections
-            text = text.replace('. ', '.\n')
-            texts.append(text)
-        return texts
+        with ParsedPDF(pdf_path) as pdf:
+            return pdf.texts()
 
     @staticmethod
     def get_page_count(pdf_path: str) -> int:
         """Get the total number of pages in the PDF."""
-        reader = PdfReader(pdf_path)
-        return len(reader.pages)
+        with ParsedPDF(pdf_path) as pdf:
+            return pdf.page_count
 
     @staticmethod
-    def convert_to_images(pdf_path: str) -> List[Image.Image]:
+    def convert_to_images(pdf_path: str) -> List["Image.Image"]:
         """Convert PDF pages to images."""
+        from pdf2image import convert_from_path
+
         return convert_from_path(pdf_path)
 
+    @staticmethod
+    def render_page(pdf_path: str, page_number: int, dpi: int, width: Optional[int] = None) -> "Image.Image":
+        """Render a single page, scaled to ``width`` pixels if given."""
+        from pdf2image import convert_from_path
+
+        images = convert_from_path(
+            pdf_path,
+            dpi=dpi,
+            first_page=page_number,
+            last_page=page_number,
+            size=(width, None) if width else None
+        )
+        if not images:
+            raise ValueError(f"Could not render page {page_number}")
+        return images[0]
+
     @staticmethod
     def save_uploaded_file(file_content: bytes, filename: str) -> str:
         """Save uploaded PDF file to disk."""
@@ -51,24 +238,20 @@ class PDFService:
             os.remove(file_path)
 
     @staticmethod
-    def validate_pdf(file_content: bytes) -> Tuple[bool, str]:
-        """Validate PDF file content."""
+    def validate_pdf(pdf: ParsedPDF) -> Tuple[bool, str]:
+        """Validate a parsed PDF."""
         try:
-            # Try to read the PDF
-            pdf_stream = io.BytesIO(file_content)
-            reader = PdfReader(pdf_stream)
-            
             # Check if PDF is empty
-            if len(reader.pages) == 0:
+            if pdf.page_count == 0:
                 return False, "PDF file is empty"
             
             # Check if PDF is encrypted
-            if reader.is_encrypted:
+            if pdf.is_encrypted:
                 return False, "PDF file is encrypted"
             
-            # Try to extract text from first page to verify it's readable
-            first_page = reader.pages[0]
-            text = first_page.extract_text()
+            # Try to extract text from first page to verify it's readable.
+            # The text is cached, so page 1 is not extracted again later.
+            text = pdf.page_text(1)
             if not text.strip():
                 return False, "PDF file appears to be unreadable or contains no text"
             
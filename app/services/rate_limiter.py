@@ -0,0 +1,209 @@
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+from functools import lru_cache
+import logging
+import random
+import threading
+import time
+
+from app.config import settings
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+@lru_cache(maxsize=None)
+def retryable_errors() -> Tuple[type, ...]:
+    """Errors worth retrying: throttling, timeouts, dropped connections and 5xx."""
+    import openai
+
+    return (
+        openai.RateLimitError,
+        openai.APITimeoutError,
+        openai.APIConnectionError,
+        openai.InternalServerError,
+    )
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``per_minute`` units."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Block until ``amount`` units are available and return the seconds waited."""
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def adjust(self, amount: float) -> None:
+        """Charge (or refund, if negative) units once the real cost is known."""
+        with self._lock:
+            self._refill()
+            self.tokens -= amount
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight requests.
+
+    The limit grows by one every ``limit`` successful requests and halves on
+    every throttled one, never leaving ``[1, max_limit]``.
+    """
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self, throttled: bool = False) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(1.0, self.limit / 2)
+            else:
+                self.limit = min(float(self.max_limit), self.limit + 1 / self.limit)
+            self._condition.notify_all()
+
+class RateLimiter:
+    """Client-side throttling shared by every OpenAI call in the process.
+
+    Each call waits for the requests-per-minute and tokens-per-minute buckets
+    and a slot from the AIMD concurrency controller. Retryable errors are
+    retried with full-jitter exponential backoff, honoring ``Retry-After``.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int,
+        tokens_per_minute: int,
+        max_concurrency: int,
+        max_retries: int,
+        base_delay: float,
+        max_delay: float
+    ):
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.concurrency = AdaptiveConcurrency(max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.counters = {
+            "requests": 0,
+            "succeeded": 0,
+            "throttled": 0,
+            "timeouts": 0,
+            "server_errors": 0,
+            "retries": 0,
+            "failed": 0,
+            "wait_seconds": 0.0,
+        }
+        self._lock = threading.Lock()
+
+    def _count(self, name: str, amount: float = 1) -> None:
+        with self._lock:
+            self.counters[name] += amount
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(self.max_delay, float(retry_after))
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def call(self, send: Callable[[], T], estimated_tokens: int = 0, usage_tokens: Optional[Callable[[T], int]] = None) -> T:
+        """Run ``send`` under the rate limits, retrying retryable errors."""
+        import openai
+
+        attempt = 0
+        while True:
+            waited = 0.0
+            with metrics.stage("llm_wait"):
+                if self.request_bucket:
+                    waited += self.request_bucket.acquire(1)
+                if self.token_bucket:
+                    waited += self.token_bucket.acquire(estimated_tokens)
+                self.concurrency.acquire()
+            if waited:
+                self._count("wait_seconds", waited)
+
+            self._count("requests")
+            error = None
+            try:
+                with metrics.stage("llm_request"):
+                    result = send()
+            except retryable_errors() as e:
+                error = e
+            finally:
+                self.concurrency.release(throttled=isinstance(error, openai.RateLimitError))
+
+            if error is None:
+                self._count("succeeded")
+                if self.token_bucket and usage_tokens:
+                    self.token_bucket.adjust(usage_tokens(result) - estimated_tokens)
+                return result
+
+            if isinstance(error, openai.RateLimitError):
+                self._count("throttled")
+            elif isinstance(error, openai.APITimeoutError):
+                self._count("timeouts")
+            else:
+                self._count("server_errors")
+            if attempt >= self.max_retries:
+                self._count("failed")
+                raise error
+
+            delay = self._backoff(attempt, error)
+            logger.warning(
+                f"OpenAI request failed ({type(error).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s"
+            )
+            self._count("retries")
+            metrics.LLM_RETRIES.labels(type(error).__name__).inc()
+            with metrics.stage("llm_backoff"):
+                time.sleep(delay)
+            attempt += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Return throttling counters and the current concurrency limit."""
+        with self._lock:
+            stats = dict(self.counters)
+        stats["wait_seconds"] = round(stats["wait_seconds"], 3)
+        stats["concurrency_limit"] = int(self.concurrency.limit)
+        stats["in_flight"] = self.concurrency.in_flight
+        return stats
+
+@lru_cache()
+def get_rate_limiter() -> RateLimiter:
+    return RateLimiter(
+        requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+        max_concurrency=settings.LLM_MAX_CONCURRENCY,
+        max_retries=settings.LLM_MAX_RETRIES,
+        base_delay=settings.LLM_RETRY_BASE_DELAY,
+        max_delay=settings.LLM_RETRY_MAX_DELAY
+    )
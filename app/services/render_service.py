@@ -0,0 +1,129 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import logging
+import os
+import tempfile
+import threading
+
+from app.config import settings
+from app.services.pdf_service import PDFService
+from app.services.storage_service import DocumentStore
+from app.utils import metrics
+
+logger = logging.getLogger(__name__)
+
+RENDER_FORMATS = {
+    "png": "image/png",
+    "webp": "image/webp",
+}
+
+class RenderCache:
+    """Rendered page images on disk, evicted least recently used first.
+
+    Recency is the file's mtime, bumped on every hit, so the order survives
+    restarts. Sizes are tracked in memory to avoid rescanning the directory.
+    """
+
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.cache_dir = cache_dir or settings.RENDER_CACHE_DIR
+        self.max_bytes = max_bytes or settings.RENDER_CACHE_MAX_BYTES
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._scan()
+
+    def _scan(self) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.startswith("."):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, name, size in sorted(entries):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    def get(self, name: str) -> Optional[str]:
+        """Return the cached file's path and mark it recently used, or None."""
+        path = os.path.join(self.cache_dir, name)
+        with self._lock:
+            if name not in self._entries or not os.path.exists(path):
+                self._total_bytes -= self._entries.pop(name, 0)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(name)
+            self.hits += 1
+        os.utime(path)
+        return path
+
+    def put(self, name: str, image: Any, image_format: str) -> str:
+        """Save an image under ``name`` and evict old entries over the size limit."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=".render-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                image.save(f, format=image_format.upper())
+            path = os.path.join(self.cache_dir, name)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+        size = os.path.getsize(path)
+        with self._lock:
+            self._total_bytes += size - self._entries.pop(name, 0)
+            self._entries[name] = size
+            self._evict()
+        return path
+
+    def _evict(self) -> None:
+        # The newest entry is kept even if it alone exceeds the limit
+        while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+            name, size = self._entries.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            try:
+                os.remove(os.path.join(self.cache_dir, name))
+            except FileNotFoundError:
+                pass
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "total_bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+class RenderService:
+    """Renders single PDF pages from the document store, with a disk cache."""
+
+    def __init__(self, store: DocumentStore, cache: Optional[RenderCache] = None):
+        self.store = store
+        self.cache = cache or RenderCache()
+
+    @staticmethod
+    def variant_name(content_hash: str, page_number: int, dpi: int, width: Optional[int], image_format: str) -> str:
+        """Name of a rendered page variant. It identifies the image exactly, so it doubles as its ETag."""
+        size = f"w{width}" if width else f"{dpi}dpi"
+        return f"{content_hash}-p{page_number}-{size}.{image_format}"
+
+    def render(self, content_hash: str, page_number: int, dpi: int, width: Optional[int], image_format: str) -> str:
+        """Return the path of the rendered page image, rendering it on a cache miss."""
+        name = self.variant_name(content_hash, page_number, dpi, width, image_format)
+        path = self.cache.get(name)
+        if path is not None:
+            return path
+
+        pdf_path = self.store.get(content_hash)
+        if pdf_path is None:
+            raise FileNotFoundError(f"Document {content_hash} is not in the store")
+        with metrics.stage("render"):
+            image = PDFService.render_page(pdf_path, page_number, dpi, width)
+        logger.info(f"Rendered page {page_number} of {content_hash} ({name})")
+        return self.cache.put(name, image, image_format)
@@ -0,0 +1,105 @@
+from typing import List, Optional, Tuple
+import re
+
+from app.schemas.field import FieldRow, make_field_row
+
+MONTHS = r"(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.?"
+DATE = rf"(?:\d{{4}}-\d{{2}}-\d{{2}}|\d{{1,2}}/\d{{1,2}}/\d{{2,4}}|{MONTHS} \d{{1,2}},? \d{{4}})"
+AMOUNT = r"-?\$\s?\d{1,3}(?:,\d{3})*(?:\.\d{2})?"
+
+class FieldRule:
+    """A regex that yields one field per match.
+
+    The pattern's ``value`` group is the field value. If the pattern has a
+    ``label`` group, the field name is derived from the matched label instead
+    of ``field_name``.
+    """
+
+    def __init__(self, field_name: str, pattern: str, description: str, section_name: str, flags: int = 0):
+        self.field_name = field_name
+        self.pattern = re.compile(pattern, flags)
+        self.description = description
+        self.section_name = section_name
+
+    def name_for(self, match: re.Match) -> str:
+        label = match.groupdict().get("label")
+        if label:
+            return re.sub(r"\W+", "_", label.lower()).strip("_")
+        return self.field_name
+
+# Labeled rules come first so they win over the bare date/amount rules
+DEFAULT_RULES = [
+    FieldRule(
+        "account_number",
+        r"\baccount\s*(?:number|no\.?|#)\s*[:#]?\s*(?P<value>[A-Z0-9][A-Z0-9-]{3,})",
+        "Account number",
+        "account_information",
+        re.IGNORECASE
+    ),
+    FieldRule(
+        "date",
+        rf"\b(?P<label>due date|statement date|bill date|billing date|invoice date|payment date)\s*:?\s*(?P<value>{DATE})",
+        "Labeled date",
+        "billing_summary",
+        re.IGNORECASE
+    ),
+    FieldRule(
+        "amount",
+        rf"\b(?P<label>total amount due|amount due|total due|new balance|previous balance|balance|total)\s*:?\s*(?P<value>{AMOUNT})",
+        "Labeled currency amount",
+        "billing_summary",
+        re.IGNORECASE
+    ),
+    FieldRule(
+        "email_address",
+        r"(?P<value>\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b)",
+        "Email address",
+        "contact_information"
+    ),
+    FieldRule(
+        "phone_number",
+        r"(?P<value>(?:\+?1[\s.-]?)?\(?\b\d{3}\)?[\s.-]?\d{3}[\s.-]\d{4}\b)",
+        "Phone number",
+        "contact_information"
+    ),
+    FieldRule("date", rf"(?P<value>\b{DATE})", "Date", "unknown"),
+    FieldRule("amount", rf"(?P<value>{AMOUNT})", "Currency amount", "unknown"),
+]
+
+class RuleExtractor:
+    """Finds common field types with compiled regexes before the LLM runs.
+
+    ``extract`` returns the fields it found and the page text with the matched
+    spans removed, so the LLM is only asked about what is left.
+    """
+
+    def __init__(self, rules: Optional[List[FieldRule]] = None):
+        self.rules = rules or DEFAULT_RULES
+
+    def extract(self, text: str, page_number: int) -> Tuple[List[FieldRow], str]:
+        """Extract rule-based fields from a page and return the remaining text."""
+        matches = []
+        for priority, rule in enumerate(self.rules):
+            for match in rule.pattern.finditer(text):
+                matches.append((match.start(), priority, rule, match))
+        # Earliest match wins; on ties the higher priority rule wins
+        matches.sort(key=lambda item: (item[0], item[1]))
+
+        fields = []
+        remaining = []
+        position = 0
+        for start, _, rule, match in matches:
+            if start < position:
+                continue  # Overlaps a match that was already taken
+            fields.append(make_field_row(
+                rule.name_for(match),
+                match.group("value").strip(),
+                rule.description,
+                rule.section_name,
+                page_number
+            ))
+            remaining.append(text[position:start])
+            position = match.end()
+        remaining.append(text[position:])
+
+        return fields, " ".join(" ".join(remaining).split())
@@ -0,0 +1,65 @@
+from typing import Optional
+import hashlib
+import logging
+import os
+import shutil
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def file_sha256(path: str) -> str:
+    """Hash a file in chunks without reading it into memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class DocumentStore:
+    """Content-addressed storage for original PDFs.
+
+    Files are stored under their sha256 (``ab/abcd....pdf``), so uploading the
+    same document twice keeps a single copy.
+    """
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or settings.DOCUMENT_STORE_DIR
+
+    def path_for(self, content_hash: str) -> str:
+        return os.path.join(self.root, content_hash[:2], f"{content_hash}.pdf")
+
+    def put(self, path: str) -> str:
+        """Move a file into the store and return its content hash.
+
+        The source file is consumed: it is moved into place, or removed if the
+        store already holds the same content.
+        """
+        content_hash = file_sha256(path)
+        destination = self.path_for(content_hash)
+        if os.path.exists(destination):
+            os.remove(path)
+        else:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            os.replace(path, destination)
+            logger.info(f"Stored document {content_hash}")
+        return content_hash
+
+    def add(self, path: str, content_hash: Optional[str] = None) -> str:
+        """Copy a file into the store, leaving the source in place, and return its content hash."""
+        content_hash = content_hash or file_sha256(path)
+        destination = self.path_for(content_hash)
+        if not os.path.exists(destination):
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            partial = f"{destination}.{os.getpid()}.tmp"
+            shutil.copyfile(path, partial)
+            os.replace(partial, destination)
+            logger.info(f"Stored document {content_hash}")
+        return content_hash
+
+    def get(self, content_hash: str) -> Optional[str]:
+        """Return the stored file's path, or None if it is not in the store."""
+        path = self.path_for(content_hash)
+        return path if os.path.exists(path) else None
@@ -0,0 +1,163 @@
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import os
+import time
+import traceback
+
+from sqlalchemy.orm import Session
+from app.database.crud import create_document, find_previous_version, reusable_page_fields
+from app.database.database import async_session
+from app.database.writer import DatabaseWriter
+from app.schemas.document import DocumentSummary
+from app.schemas.field import FieldRow
+from app.services.extraction_service import ExtractionListener, ExtractionService
+from app.services.storage_service import DocumentStore
+from app.config import settings
+from app.utils import metrics
+from app.utils.helpers import json_default
+
+logger = logging.getLogger(__name__)
+
+def format_sse(event: str, data: Dict[str, Any]) -> bytes:
+    """Encode one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=json_default)}\n\n".encode()
+
+class QueueListener(ExtractionListener):
+    """Forwards a document's extraction progress to a queue of SSE events.
+
+    Callbacks run on the event loop, so the queue is written without locking.
+    """
+
+    def __init__(self, queue: asyncio.Queue, index: int, filename: str):
+        self.queue = queue
+        self.index = index
+        self.filename = filename
+        self.started = time.perf_counter()
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self.started) * 1000, 1)
+
+    def on_document(self, total_pages: int) -> None:
+        self.queue.put_nowait(("document", {
+            "index": self.index,
+            "filename": self.filename,
+            "total_pages": total_pages,
+            "elapsed_ms": self.elapsed_ms()
+        }))
+
+    def on_page(self, page_number: int, fields: List[FieldRow], error: Optional[str] = None) -> None:
+        self.queue.put_nowait(("page", {
+            "index": self.index,
+            "filename": self.filename,
+            "page_number": page_number,
+            "fields": fields,
+            "error": error,
+            "elapsed_ms": self.elapsed_ms()
+        }))
+
+class UploadStreamService:
+    """Processes spooled uploads and streams their progress as Server-Sent Events.
+
+    Events, in order for each document (``index`` is its position in the
+    upload): ``document`` once the page count is known, ``page`` as each page
+    finishes, then ``complete`` with the saved document, stats and stage
+    timings, or ``error``. A final ``done`` event closes the stream.
+    """
+
+    def __init__(
+        self,
+        extraction_service: ExtractionService,
+        document_store: DocumentStore,
+        database_writer: Optional[DatabaseWriter] = None
+    ):
+        self.extraction_service = extraction_service
+        self.document_store = document_store
+        self.writer = database_writer or DatabaseWriter()
+
+    async def _process(self, index: int, path: str, filename: str, queue: asyncio.Queue) -> None:
+        listener = QueueListener(queue, index, filename)
+        try:
+            previous = None
+            previous_pages = None
+            if settings.DOCUMENT_VERSIONING:
+                async with async_session() as db:
+                    previous = await db.run_sync(find_previous_version, filename)
+                    previous_pages = await db.run_sync(reusable_page_fields, previous)
+            result = await self.extraction_service.process_document(path, filename, listener, previous_pages)
+            if "error" in result:
+                queue.put_nowait(("error", {"index": index, "filename": filename, "detail": result["error"]}))
+                return
+
+            stats = result["stats"]
+            timings = stats["timings"]
+            with metrics.stage("store") as store_timer:
+                content_hash = await asyncio.to_thread(self.document_store.put, path)
+            timings["store_ms"] = store_timer.ms
+
+            def write(db: Session) -> DocumentSummary:
+                db_document = create_document(
+                    db, result["document"], stats, result["extracted_fields"], content_hash, previous,
+                    result["tables"]
+                )
+                return DocumentSummary(
+                    id=db_document.id,
+                    filename=db_document.filename,
+                    total_pages=db_document.total_pages,
+                    upload_date=db_document.upload_date,
+                    field_count=len(result["extracted_fields"])
+                )
+
+            with metrics.stage("db") as db_timer:
+                summary = await self.writer.submit(write)
+            timings["db_ms"] = db_timer.ms
+
+            queue.put_nowait(("complete", {
+                "index": index,
+                "filename": filename,
+                "document": summary.model_dump(),
+                "stats": stats,
+                "elapsed_ms": listener.elapsed_ms()
+            }))
+        except Exception as e:
+            logger.error(f"Error streaming document {filename}: {str(e)}")
+            logger.error(traceback.format_exc())
+            queue.put_nowait(("error", {"index": index, "filename": filename, "detail": str(e)}))
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+            queue.put_nowait((None, None))
+
+    async def stream(self, uploads: List[Tuple[str, str]]) -> AsyncIterator[bytes]:
+        """Process ``(spooled_path, filename)`` uploads in order, yielding SSE events.
+
+        Owns the spooled files: each is moved into the document store or
+        removed, including when the client disconnects mid-stream.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+        task = None
+        started = time.perf_counter()
+        completed = 0
+        try:
+            for index, (path, filename) in enumerate(uploads):
+                task = asyncio.create_task(self._process(index, path, filename, queue))
+                while True:
+                    event, data = await queue.get()
+                    if event is None:
+                        break
+                    completed += event == "complete"
+                    yield format_sse(event, data)
+                await task
+            yield format_sse("done", {
+                "documents": completed,
+                "failed": len(uploads) - completed,
+                "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+            })
+        finally:
+            if task is not None and not task.done():
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+            for path, _ in uploads:
+                if os.path.exists(path):
+                    os.remove(path)
@@ -0,0 +1,185 @@
+from bisect import bisect_right
+import re
+from typing import List, Optional, Tuple
+
+from app.services.layout_index import ASCENT, AVERAGE_CHAR_WIDTH, DESCENT, PageLayout
+
+# A cell: left and right edge in points, and its text
+Cell = Tuple[float, float, str]
+# A box as (x, y, width, height) in the API's scaled units
+Box = Tuple[float, float, float, float]
+
+def column_names(header: Optional[List[str]], count: int) -> List[str]:
+    """Snake-case column names from a header, or ``column_1``... without one."""
+    names: List[str] = []
+    for i in range(count):
+        name = re.sub(r"[^a-z0-9]+", "_", header[i].lower()).strip("_") if header else ""
+        name = name or f"column_{i + 1}"
+        if name in names:
+            name = f"{name}_{i + 1}"
+        names.append(name)
+    return names
+
+class DetectedTable:
+    """A table found on a page.
+
+    ``rows`` hold one string per column (empty where a row has no value)
+    and ``cell_boxes`` the matching cell boxes (None where empty). ``words``
+    are the layout indices of the table's words, header included, so the
+    caller can remove them from the page text before other extractors run.
+    """
+
+    __slots__ = ("header", "rows", "box", "cell_boxes", "words")
+
+    def __init__(
+        self,
+        header: Optional[List[str]],
+        rows: List[List[str]],
+        box: Box,
+        cell_boxes: List[List[Optional[Box]]],
+        words: List[int]
+    ):
+        self.header = header
+        self.rows = rows
+        self.box = box
+        self.cell_boxes = cell_boxes
+        self.words = words
+
+    @property
+    def column_count(self) -> int:
+        return len(self.rows[0])
+
+    @property
+    def signature(self) -> Tuple:
+        """Tables with the same signature share column labels."""
+        return (tuple(self.header) if self.header else None, self.column_count)
+
+class TableDetector:
+    """Finds tables in a page layout by column alignment.
+
+    Words are grouped into lines by vertical position and into cells by the
+    horizontal gaps between them. Runs of consecutive lines with at least
+    ``min_columns`` cells are table candidates; their columns are the
+    x-ranges covered by cells in every row, separated by vertical gutters of
+    whitespace. A candidate is kept if its rows line up with at least
+    ``min_columns`` of those columns. All passes work on the layout's flat
+    word arrays and are linear after one sort.
+    """
+
+    def __init__(self, min_rows: int = 3, min_columns: int = 3, cell_gap: float = 1.5, row_gap: float = 1.5):
+        self.min_rows = min_rows
+        self.min_columns = min_columns
+        self.cell_gap = cell_gap  # In average character widths
+        self.row_gap = row_gap  # In line heights
+
+    @staticmethod
+    def _lines(layout: PageLayout) -> List[List[int]]:
+        """Group word indices into lines, top to bottom, each in content order."""
+        centers = [(y0 + y1) / 2 for y0, y1 in zip(layout.y0, layout.y1)]
+        lines: List[List[int]] = []
+        line_center = 0.0
+        for i in sorted(range(len(layout)), key=centers.__getitem__):
+            if not lines or centers[i] - line_center > (layout.y1[i] - layout.y0[i]) / 2:
+                lines.append([])
+                line_center = centers[i]
+            lines[-1].append(i)
+        return [sorted(line) for line in lines]
+
+    def _cells(self, layout: PageLayout, line: List[int]) -> List[Cell]:
+        """Merge a line's words into cells, left to right."""
+        cells: List[Cell] = []
+        for i in sorted(line, key=layout.x0.__getitem__):
+            font_size = (layout.y1[i] - layout.y0[i]) / (ASCENT + DESCENT)
+            if cells and layout.x0[i] - cells[-1][1] <= font_size * AVERAGE_CHAR_WIDTH * self.cell_gap:
+                x0, _, text = cells[-1]
+                cells[-1] = (x0, layout.x1[i], f"{text} {layout.word(i)}")
+            else:
+                cells.append((layout.x0[i], layout.x1[i], layout.word(i)))
+        return cells
+
+    @staticmethod
+    def _columns(rows: List[List[Cell]]) -> List[float]:
+        """Left edges of the columns: cell x-ranges merged across rows."""
+        columns: List[List[float]] = []
+        for x0, x1 in sorted((x0, x1) for cells in rows for x0, x1, _ in cells):
+            if columns and x0 <= columns[-1][1]:
+                columns[-1][1] = max(columns[-1][1], x1)
+            else:
+                columns.append([x0, x1])
+        return [x0 for x0, _ in columns]
+
+    @staticmethod
+    def _assign(cells: List[Cell], starts: List[float]) -> Tuple[List[str], List[Optional[Tuple[float, float]]]]:
+        """Put each cell in its column; returns the column texts and their left and right edges."""
+        row = [""] * len(starts)
+        edges: List[Optional[Tuple[float, float]]] = [None] * len(starts)
+        for x0, x1, text in cells:
+            column = max(0, bisect_right(starts, (x0 + x1) / 2) - 1)
+            row[column] = f"{row[column]} {text}" if row[column] else text
+            edge = edges[column]
+            edges[column] = (min(edge[0], x0), max(edge[1], x1)) if edge else (x0, x1)
+        return row, edges
+
+    def _build(self, layout: PageLayout, region: List[Tuple[List[int], List[Cell]]]) -> Optional[DetectedTable]:
+        # A first line without digits is the header; columns come from the body
+        header_cells = None
+        body = region
+        if not any(c.isdigit() for _, _, text in region[0][1] for c in text):
+            header_cells = region[0][1]
+            body = region[1:]
+        if len(body) < self.min_rows:
+            return None
+
+        starts = self._columns([cells for _, cells in body])
+        if len(starts) < self.min_columns:
+            return None
+        rows = []
+        cell_boxes = []
+        for line, cells in body:
+            row, edges = self._assign(cells, starts)
+            top = min(layout.y0[i] for i in line)
+            bottom = max(layout.y1[i] for i in line)
+            rows.append(row)
+            cell_boxes.append([layout.scale_box(edge[0], top, edge[1], bottom) if edge else None for edge in edges])
+        aligned = sum(sum(1 for value in row if value) >= self.min_columns for row in rows)
+        if aligned < 0.8 * len(rows):
+            return None
+
+        words = sorted(i for line, _ in region for i in line)
+        box = layout.scale_box(
+            min(layout.x0[i] for i in words),
+            min(layout.y0[i] for i in words),
+            max(layout.x1[i] for i in words),
+            max(layout.y1[i] for i in words)
+        )
+        return DetectedTable(
+            self._assign(header_cells, starts)[0] if header_cells else None,
+            rows,
+            box,
+            cell_boxes,
+            words
+        )
+
+    def detect(self, layout: PageLayout) -> List[DetectedTable]:
+        """Find the tables on a page, top to bottom."""
+        tables = []
+        region: List[Tuple[List[int], List[Cell]]] = []
+        region_bottom = 0.0
+        for line in self._lines(layout):
+            cells = self._cells(layout, line)
+            top = min(layout.y0[i] for i in line)
+            bottom = max(layout.y1[i] for i in line)
+            is_row = len(cells) >= self.min_columns
+            if region and (not is_row or top - region_bottom > self.row_gap * (bottom - top)):
+                table = self._build(layout, region)
+                if table is not None:
+                    tables.append(table)
+                region = []
+            if is_row:
+                region.append((line, cells))
+                region_bottom = bottom
+        if region:
+            table = self._build(layout, region)
+            if table is not None:
+                tables.append(table)
+        return tables
@@ -0,0 +1,52 @@
+from datetime import date, datetime
+from typing import Any, Optional
+import math
+import re
+
+# Rough average for English text with OpenAI tokenizers
+CHARS_PER_TOKEN = 4
+
+# Bare digit strings longer than this are account numbers, IDs and the like
+MAX_PLAIN_DIGITS = 7
+NUMBER_PATTERN = re.compile(r"^(\()?\s*(-)?\s*[$€£]?\s*(-)?(\d{1,3}(?:,\d{3})+|\d+)(\.\d+)?\s*(\))?$")
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%B %d, %Y", "%b %d, %Y", "%B %d %Y", "%b %d %Y")
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of LLM tokens in a piece of text."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def json_default(value: Any) -> str:
+    """``json.dumps`` fallback that writes dates and datetimes in ISO format."""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def parse_number(value: str) -> Optional[float]:
+    """Parse an amount or plain number such as ``$1,234.50`` or ``(12.00)``.
+
+    Returns None if the whole value is not a number, so identifiers with
+    separators (phone numbers, dates) are left alone. Long runs of bare
+    digits (account and reference numbers) are not amounts either.
+    """
+    value = value.strip()
+    if value.isdigit() and len(value) > MAX_PLAIN_DIGITS:
+        return None
+    match = NUMBER_PATTERN.match(value)
+    if not match:
+        return None
+    open_paren, minus, inner_minus, digits, fraction, close_paren = match.groups()
+    if bool(open_paren) != bool(close_paren):
+        return None
+    number = float(digits.replace(",", "") + (fraction or ""))
+    return -number if open_paren or minus or inner_minus else number
+
+def parse_date(value: str) -> Optional[date]:
+    """Parse a date in the formats the rule extractor recognizes."""
+    value = " ".join(value.replace(".", "").split())
+    value = re.sub(r"^Sept\b", "Sep", value, flags=re.IGNORECASE)
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    return None
@@ -0,0 +1,267 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+import threading
+import time
+
+# Lightweight in-process metrics rendered in the Prometheus text format.
+# Recording costs a lock acquisition (and a bisect for histograms), so it
+# is cheap enough for the per-page and per-request paths.
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+class Metric:
+    """Base class; children are keyed by label values."""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Return the child for these label values, creating it on first use."""
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+class Counter(Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield "_total", _format_labels(self.labelnames, values), child.value
+
+class Gauge(Metric):
+    """A gauge, set directly or read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], float]] = None
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._function = function
+
+    def _samples(self):
+        if self._function is not None:
+            yield "", "", self._function()
+            return
+        for values, child in list(self._children.items()):
+            yield "", _format_labels(self.labelnames, values), child.value
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                yield "_bucket", _format_labels(self.labelnames, values, le), cumulative
+            yield "_sum", _format_labels(self.labelnames, values), total
+            yield "_count", _format_labels(self.labelnames, values), cumulative
+
+class Registry:
+    def __init__(self):
+        self.metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, labelnames))
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+# Application metrics
+STAGE_SECONDS = histogram(
+    "docparser_stage_seconds",
+    "Time spent in each processing stage.",
+    ("stage",)
+)
+DOCUMENTS = counter("docparser_documents", "Documents processed, by outcome.", ("status",))
+PAGES = counter("docparser_pages", "Pages processed.")
+TABLE_ROWS = counter("docparser_table_rows", "Table rows extracted by layout detection.")
+FIELDS = counter("docparser_fields", "Fields extracted, by source.", ("source",))
+LLM_REQUESTS = counter("docparser_llm_requests", "LLM extraction requests, by outcome.", ("status",))
+LLM_TOKENS = counter("docparser_llm_tokens", "LLM tokens used.", ("type",))
+LLM_CACHE = counter("docparser_llm_cache_lookups", "LLM result cache lookups.", ("result",))
+LLM_TIER_REQUESTS = counter("docparser_llm_tier_requests", "LLM requests per model tier, by outcome.", ("model", "outcome"))
+LLM_TIER_SECONDS = histogram("docparser_llm_tier_seconds", "LLM request latency per model tier.", ("model",))
+LLM_COST = counter("docparser_llm_cost_usd", "Estimated LLM spend in US dollars, per model.", ("model",))
+LLM_RETRIES = counter("docparser_llm_retries", "OpenAI requests retried, by error.", ("reason",))
+LLM_IN_FLIGHT = gauge("docparser_llm_in_flight", "OpenAI requests in flight.")
+LLM_CONCURRENCY_LIMIT = gauge("docparser_llm_concurrency_limit", "Current adaptive OpenAI concurrency limit.")
+DB_WRITE_BATCH = histogram(
+    "docparser_db_write_batch_size",
+    "Writes committed per database transaction.",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256)
+)
+DB_WRITE_QUEUE_DEPTH = gauge("docparser_db_write_queue_depth", "Database writes waiting for the writer.")
+JOB_QUEUE_DEPTH = gauge("docparser_job_queue_depth", "Ingestion jobs waiting for a worker.")
+RENDER_CACHE_BYTES = gauge("docparser_render_cache_bytes", "Size of the rendered page cache.")
+
+class Trace:
+    """Stage timings collected for one traced request."""
+
+    def __init__(self):
+        self.spans: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.spans.append((stage, seconds))
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Total milliseconds and count per stage, in first-seen order."""
+        result: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            spans = list(self.spans)
+        for stage, seconds in spans:
+            entry = result.setdefault(stage, {"ms": 0.0, "count": 0})
+            entry["ms"] += seconds * 1000
+            entry["count"] += 1
+        for entry in result.values():
+            entry["ms"] = round(entry["ms"], 1)
+        return result
+
+    def server_timing(self) -> str:
+        """Format the summary as a ``Server-Timing`` header value."""
+        return ", ".join(f"{stage};dur={entry['ms']}" for stage, entry in self.summary().items())
+
+current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+
+class StageTimer:
+    __slots__ = ("seconds",)
+
+    def __init__(self):
+        self.seconds = 0.0
+
+    @property
+    def ms(self) -> float:
+        return round(self.seconds * 1000, 1)
+
+def observe_stage(name: str, seconds: float) -> None:
+    """Record a duration measured elsewhere as processing stage ``name``."""
+    STAGE_SECONDS.labels(name).observe(seconds)
+    trace = current_trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+@contextmanager
+def stage(name: str) -> Iterator[StageTimer]:
+    """Time a block as processing stage ``name``.
+
+    The duration goes to the ``stage_seconds`` histogram and, if the current
+    request is being traced, to its trace. The yielded timer holds the
+    duration once the block exits.
+    """
+    timer = StageTimer()
+    started = time.perf_counter()
+    try:
+        yield timer
+    finally:
+        timer.seconds = time.perf_counter() - started
+        observe_stage(name, timer.seconds)
@@ -0,0 +1,69 @@
+"""Insert throughput for extracted fields: ORM objects vs. bulk Core insert.
+
+Each strategy writes the same rows into a fresh SQLite database.
+
+    python -m benchmarks.bulk_insert --fields 100000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import models
+from app.database.crud import insert_extracted_fields
+from app.schemas.field import make_field_row
+
+def make_rows(num_fields: int, page_size: int = 50):
+    return [
+        make_field_row(
+            f"field_{i % 25}",
+            f"value {i}",
+            "Synthetic field",
+            "call_details",
+            i // page_size + 1,
+            {"x": i % 1000, "y": i % 700, "width": 40, "height": 10}
+        )
+        for i in range(num_fields)
+    ]
+
+def orm_insert(db, document_id, rows) -> None:
+    """The previous approach: one ORM object per field."""
+    for row in rows:
+        db.add(models.ExtractedField(document_id=document_id, **row))
+
+def run(strategy, rows, documents: int) -> float:
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = create_engine(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+        models.Base.metadata.create_all(bind=engine)
+        db = sessionmaker(bind=engine)()
+        per_document = len(rows) // documents
+        started = time.perf_counter()
+        for i in range(documents):
+            document = models.Document(filename=f"doc{i}.pdf", total_pages=1)
+            db.add(document)
+            db.flush()
+            chunk = [dict(row) for row in rows[i * per_document:(i + 1) * per_document]]
+            strategy(db, document.id, chunk)
+        db.commit()
+        elapsed = time.perf_counter() - started
+        db.close()
+        engine.dispose()
+        return elapsed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fields", type=int, default=100_000)
+    parser.add_argument("--documents", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.fields)
+    print(f"{args.fields} fields across {args.documents} documents")
+    for name, strategy in (("orm", orm_insert), ("bulk", insert_extracted_fields)):
+        elapsed = run(strategy, rows, args.documents)
+        print(f"{name:>5}: {elapsed:7.2f}s  {args.fields / elapsed:10.0f} fields/s")
+
+if __name__ == "__main__":
+    main()
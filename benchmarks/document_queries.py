@@ -0,0 +1,173 @@
+"""Latency of the document and field read paths on a large seeded database.
+
+Seeds a SQLite database once (reused on later runs with the same sizes) and
+times each query, with and without the (document_id, page_number) index:
+
+- ``n_plus_one``: the previous ``GET /api/documents`` access pattern, a page of
+  documents whose fields are lazy-loaded one document at a time (N+1)
+- ``page_fields``: one page of documents with fields eager-loaded
+- ``page``: one page of documents without fields
+- ``summary``: one page of the summary projection
+- ``deep_page``/``deep_offset``: a page near the end by keyset vs. OFFSET
+- ``doc_fields``/``page_details``: the per-document and per-page field lookups
+- ``search_*``: ``/api/search`` by full text, exact value and numeric range
+  (these use their own indexes, so only the first column is meaningful)
+
+    python -m benchmarks.document_queries --documents 100000 --fields 10000000
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+
+from sqlalchemy import create_engine, func, insert, text
+from sqlalchemy.orm import sessionmaker
+
+from app.database import models
+from app.database.crud import list_document_summaries, list_documents, search_fields
+
+INDEX_NAME = "ix_extracted_fields_document_id_page_number"
+PAGES_PER_DOCUMENT = 10
+
+def seed(engine, num_documents: int, num_fields: int, batch_size: int = 50_000) -> None:
+    models.Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        # Building the index once after loading is much faster than maintaining it
+        conn.execute(text(f"DROP INDEX IF EXISTS {INDEX_NAME}"))
+        conn.execute(insert(models.Document), [
+            {"filename": f"doc{i}.pdf", "total_pages": PAGES_PER_DOCUMENT}
+            for i in range(num_documents)
+        ])
+
+    per_document = max(1, num_fields // num_documents)
+    started = time.perf_counter()
+    batch = []
+    for i in range(num_fields):
+        batch.append({
+            "document_id": i // per_document % num_documents + 1,
+            "field_name": f"field_{i % 25}",
+            "field_value": f"value {i}",
+            "description": "Synthetic field",
+            "bounding_box_x": 0.0,
+            "bounding_box_y": 0.0,
+            "bounding_box_width": 0.0,
+            "bounding_box_height": 0.0,
+            "section_name": "call_details",
+            "page_number": i % per_document % PAGES_PER_DOCUMENT + 1,
+            "value_number": float(i % 100_000),
+        })
+        if len(batch) == batch_size:
+            with engine.begin() as conn:
+                conn.execute(insert(models.ExtractedField), batch)
+            batch = []
+            print(f"\rseeded {i + 1}/{num_fields} fields", end="", flush=True)
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(insert(models.ExtractedField), batch)
+    print(f"\rseeded {num_fields} fields in {time.perf_counter() - started:.0f}s")
+
+def set_index(engine, enabled: bool) -> None:
+    with engine.begin() as conn:
+        if enabled:
+            conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {INDEX_NAME} ON extracted_fields (document_id, page_number)"
+            ))
+        else:
+            conn.execute(text(f"DROP INDEX IF EXISTS {INDEX_NAME}"))
+        conn.execute(text("ANALYZE"))
+
+def timed(fn, repeat: int) -> float:
+    """Median wall time of ``fn`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+def run_queries(Session, num_documents: int, limit: int, repeat: int, scan_repeat: int) -> dict:
+    deep_after_id = num_documents - limit
+    doc_ids = [random.randint(1, num_documents) for _ in range(repeat)]
+
+    def with_session(fn):
+        def run():
+            db = Session()
+            try:
+                fn(db)
+            finally:
+                db.close()
+        return run
+
+    def n_plus_one(db):
+        # response_model=List[Document] touched every document's fields
+        for document in db.query(models.Document).order_by(models.Document.id).limit(limit):
+            document.extracted_fields
+
+    def deep_offset(db):
+        db.query(models.Document).order_by(models.Document.id).offset(deep_after_id).limit(limit).all()
+
+    def doc_fields(db):
+        db.query(models.ExtractedField).filter(
+            models.ExtractedField.document_id == random.choice(doc_ids)
+        ).all()
+
+    def page_details(db):
+        db.query(models.ExtractedField).filter(
+            models.ExtractedField.document_id == random.choice(doc_ids),
+            models.ExtractedField.page_number == 1
+        ).all()
+
+    # Queries that scan the field table without the index run fewer times
+    queries = (
+        ("n_plus_one", n_plus_one, scan_repeat),
+        ("page_fields", lambda db: list_documents(db, limit, None, include_fields=True), scan_repeat),
+        ("page", lambda db: list_documents(db, limit), repeat),
+        ("summary", lambda db: list_document_summaries(db, limit), scan_repeat),
+        ("deep_page", lambda db: list_documents(db, limit, deep_after_id), repeat),
+        ("deep_offset", deep_offset, repeat),
+        ("doc_fields", doc_fields, scan_repeat),
+        ("page_details", page_details, scan_repeat),
+        ("search_text", lambda db: search_fields(db, limit, q=f"value {random.choice(doc_ids)}"), repeat),
+        ("search_exact", lambda db: search_fields(
+            db, limit, field_name="field_7", value=f"value {random.choice(doc_ids) * 25 + 7}"
+        ), repeat),
+        ("search_range", lambda db: search_fields(
+            db, limit, field_name="field_3", min_value=50_000, max_value=50_500
+        ), repeat),
+    )
+    return {name: timed(with_session(fn), n) for name, fn, n in queries}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--fields", type=int, default=10_000_000)
+    parser.add_argument("--limit", type=int, default=50, help="page size")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--scan-repeat", type=int, default=3, help="repeats for queries that may scan fields")
+    parser.add_argument("--db", default=None, help="SQLite file to seed or reuse")
+    args = parser.parse_args()
+
+    path = args.db or f"bench_queries_{args.documents}_{args.fields}.db"
+    engine = create_engine(f"sqlite:///{path}")
+    if not os.path.exists(path):
+        seed(engine, args.documents, args.fields)
+    else:
+        with engine.connect() as conn:
+            count = conn.execute(func.count(models.ExtractedField.id).select()).scalar()
+        print(f"Reusing {path} ({count} fields)")
+    Session = sessionmaker(bind=engine)
+
+    results = {}
+    for indexed in (True, False):
+        set_index(engine, indexed)
+        results[indexed] = run_queries(Session, args.documents, args.limit, args.repeat, args.scan_repeat)
+    set_index(engine, True)
+
+    print(f"{args.documents} documents, {args.fields} fields, page size {args.limit} (median ms)")
+    print(f"{'query':>13} {'indexed':>10} {'no index':>10}")
+    for name in results[True]:
+        print(f"{name:>13} {results[True][name]:>10.2f} {results[False][name]:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""A local stand-in for the OpenAI API used by the benchmarks."""
+from types import SimpleNamespace
+from typing import Any
+import hashlib
+import json
+import re
+import time
+
+from app.services.llm_service import LLMService
+from app.utils.helpers import estimate_tokens
+
+PAGE_TAG = re.compile(r"=== PAGE (\d+) ===")
+COLUMN_COUNT = re.compile(r"exactly (\d+) snake_case column names")
+
+class FakeLLMService(LLMService):
+    """LLMService whose completions are generated locally after a fixed delay.
+
+    Planning, batching, rate limiting and response parsing run unchanged;
+    only the network call is replaced. Results are deterministic for a given
+    prompt. ``invalid_rate`` of the answers from all but the last model tier
+    have values that are not in the text, so they are escalated.
+    """
+
+    def __init__(self, latency: float = 0.5, fields_per_page: int = 10, invalid_rate: float = 0.0):
+        super().__init__()
+        self.latency = latency
+        self.fields_per_page = fields_per_page
+        self.invalid_rate = invalid_rate
+        self.cache = None
+
+    def _send_completion(self, **kwargs: Any) -> Any:
+        time.sleep(self.latency)
+        prompt = kwargs["messages"][-1]["content"]
+        column_count = COLUMN_COUNT.search(prompt)
+        if column_count:
+            return self._response(prompt, json.dumps({
+                "section_name": "call_details",
+                "columns": [f"column_{i}" for i in range(int(column_count.group(1)))]
+            }))
+
+        text = prompt.split("Text to analyze:", 1)[-1].split("Return the results", 1)[0]
+        page_numbers = [int(n) for n in PAGE_TAG.findall(text)] or [None]
+        words = [w for w in PAGE_TAG.sub(" ", text).split() if w.isalnum()] or ["empty"]
+        if not self.cascade.is_last(kwargs["model"]):
+            draw = int(hashlib.sha256(prompt.encode()).hexdigest()[:8], 16) / 0xFFFFFFFF
+            if draw < self.invalid_rate:
+                words = ["invented"]
+
+        fields = []
+        for page_number in page_numbers:
+            for i in range(self.fields_per_page):
+                field = {
+                    "field_name": f"field_{i}",
+                    "field_value": words[(i * 7) % len(words)],
+                    "description": "Synthetic field",
+                    "section_name": "body"
+                }
+                if page_number is not None:
+                    field["page_number"] = page_number
+                fields.append(field)
+        return self._response(prompt, json.dumps({"fields": fields}))
+
+    @staticmethod
+    def _response(prompt: str, content: str) -> Any:
+        prompt_tokens = estimate_tokens(prompt)
+        completion_tokens = estimate_tokens(content)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=SimpleNamespace(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=prompt_tokens + completion_tokens
+            )
+        )
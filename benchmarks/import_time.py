@@ -0,0 +1,71 @@
+"""Import-time budget for the API, measured with ``python -X importtime``.
+
+Imports the module in a fresh interpreter per sample and reports the
+fastest sample's total and the slowest direct imports. Exits with status 1
+if that total is over ``--budget-ms``, or if a dependency that is meant to
+load on first use (the OpenAI client, PDF and image libraries, pyarrow,
+Alembic) was imported.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --module app.cli --budget-ms 400
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import List, Tuple
+
+# Top-level packages that must not be imported by the module itself
+DEFERRED_PACKAGES = ("openai", "PIL", "PyPDF2", "pdf2image", "pyarrow", "alembic")
+
+def measure(module: str) -> Tuple[int, List[Tuple[str, int]], List[str]]:
+    """Import ``module`` once; returns its cumulative microseconds, its direct imports and every package loaded."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "OPENAI_API_KEY": os.environ.get("OPENAI_API_KEY", "import-time")},
+        check=True
+    )
+    total = 0
+    children: List[Tuple[str, int]] = []
+    packages = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        name = name.strip()
+        packages.add(name.split(".")[0])
+        if name == module:
+            total = int(cumulative)
+        elif depth == 1:
+            children.append((name, int(cumulative)))
+    return total, children, sorted(packages)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--budget-ms", type=float, default=1200.0)
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10, help="slowest direct imports to list")
+    args = parser.parse_args()
+
+    samples = [measure(args.module) for _ in range(args.samples)]
+    total, children, packages = min(samples, key=lambda sample: sample[0])
+    print(f"import {args.module}: {total / 1000:.0f}ms (fastest of {args.samples}, budget {args.budget_ms:.0f}ms)")
+    for name, cumulative in sorted(children, key=lambda child: -child[1])[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}ms  {name}")
+
+    failures = []
+    if total / 1000 > args.budget_ms:
+        failures.append(f"over budget by {total / 1000 - args.budget_ms:.0f}ms")
+    loaded = [package for package in DEFERRED_PACKAGES if package in packages]
+    if loaded:
+        failures.append(f"imported at startup: {', '.join(loaded)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
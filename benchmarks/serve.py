@@ -0,0 +1,32 @@
+"""Run the API with the LLM replaced by FakeLLMService.
+
+The database in DATABASE_URL is migrated to the latest revision first.
+
+    python -m benchmarks.serve --port 8100 --latency 0.2
+"""
+import argparse
+import os
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--fields-per-page", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    import uvicorn
+    from app.database.schema import upgrade_schema
+
+    # Before importing the app: Alembic's logging setup disables existing loggers
+    upgrade_schema()
+    from app import main as app_main
+    from benchmarks.fake_llm import FakeLLMService
+
+    services = app_main.Services()
+    services.extraction_service.llm_service = FakeLLMService(args.latency, args.fields_per_page)
+    app_main.app.state.services = services
+    uvicorn.run(app_main.app, host="127.0.0.1", port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
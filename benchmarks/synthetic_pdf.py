@@ -0,0 +1,106 @@
+"""Deterministic synthetic PDFs for benchmarks.
+
+The PDFs are written by hand (Helvetica text only, uncompressed content
+streams) so no PDF authoring library is needed.
+"""
+from typing import List, Optional
+import random
+
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+LINE_HEIGHT = 12
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def make_pdf(pages: List[List[str]], pad_bytes: int = 0) -> bytes:
+    """Build a PDF with one text line per entry of each page.
+
+    ``pad_bytes`` appends an unreferenced stream of that size, which inflates
+    the file without changing its text.
+    """
+    objects: List[bytes] = []
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    font_id = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    pages_id = font_id + 2 * len(pages) + 1
+    page_ids = []
+    for lines in pages:
+        ops = ["BT", "/F1 9 Tf"]
+        y = PAGE_HEIGHT - 40
+        for line in lines:
+            ops.append(f"1 0 0 1 40 {y} Tm ({_escape(line)}) Tj")
+            y -= LINE_HEIGHT
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        content_id = add(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        page_ids.append(add(
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R "
+            b"/Resources << /Font << /F1 %d 0 R >> >> >>"
+            % (pages_id, PAGE_WIDTH, PAGE_HEIGHT, content_id, font_id)
+        ))
+    kids = b" ".join(b"%d 0 R" % page_id for page_id in page_ids)
+    add(b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids)))
+    catalog_id = add(b"<< /Type /Catalog /Pages %d 0 R >>" % pages_id)
+    if pad_bytes:
+        add(b"<< /Length %d >>\nstream\n%s\nendstream" % (pad_bytes, b"0" * pad_bytes))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for object_id, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (object_id, body)
+    xref_offset = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        len(objects) + 1, catalog_id, xref_offset
+    )
+    return bytes(out)
+
+def text_heavy_pages(num_pages: int, seed: int = 0) -> List[List[str]]:
+    """Statement-like pages: a header block followed by paragraphs."""
+    rng = random.Random(seed)
+    words = ("service", "charges", "account", "billing", "period", "payment",
+             "balance", "usage", "plan", "monthly", "terms", "conditions")
+    pages = []
+    for page_number in range(1, num_pages + 1):
+        lines = [
+            f"Account Number: {rng.randint(10**9, 10**10 - 1)}",
+            f"Statement Date: 2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            f"Total Amount Due: ${rng.randint(10, 999)}.{rng.randint(0, 99):02d}",
+            f"Customer Service: (800) 555-{rng.randint(1000, 9999)}",
+            f"Email: billing{page_number}@example.com",
+        ]
+        for _ in range(50):
+            lines.append(" ".join(rng.choice(words) for _ in range(14)) + ".")
+        pages.append(lines)
+    return pages
+
+def table_heavy_pages(num_pages: int, rows_per_page: int = 55, seed: int = 0) -> List[List[str]]:
+    """Call-detail style pages: one header row and fixed-width table rows."""
+    rng = random.Random(seed)
+    pages = []
+    for _ in range(num_pages):
+        lines = ["Date        Time      Number            Minutes   Amount"]
+        for _ in range(rows_per_page):
+            lines.append(
+                f"2024-03-{rng.randint(1, 28):02d}  {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}     "
+                f"({rng.randint(200, 999)}) 555-{rng.randint(1000, 9999)}    {rng.randint(1, 90):>3}       "
+                f"${rng.randint(0, 20)}.{rng.randint(0, 99):02d}"
+            )
+        pages.append(lines)
+    return pages
+
+def make_document(num_pages: int, kind: str = "text", pad_bytes: int = 0, seed: Optional[int] = None) -> bytes:
+    """Build a synthetic ``text`` or ``table`` heavy document."""
+    seed = num_pages if seed is None else seed
+    if kind == "table":
+        pages = table_heavy_pages(num_pages, seed=seed)
+    else:
+        pages = text_heavy_pages(num_pages, seed=seed)
+    return make_pdf(pages, pad_bytes=pad_bytes)
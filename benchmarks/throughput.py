@@ -0,0 +1,244 @@
+"""End-to-end extraction throughput against the fake LLM.
+
+For each mode, document kind and concurrency level, processes a batch of
+synthetic PDFs and reports documents/s, pages/s, p50/p99 per-document
+latency and peak RSS (Linux only):
+
+- ``service``: ``ExtractionService.process_document`` in this process, with
+  ``concurrency`` documents in flight
+- ``api``: ``POST /api/upload`` on a fresh server process per level, with
+  ``concurrency`` uploads in flight
+
+Results can be saved as JSON and compared with an earlier run; the exit
+status is 1 when any metric regressed by more than ``--threshold`` percent.
+
+    python -m benchmarks.throughput --concurrency 1 4 16 --output results.json
+    python -m benchmarks.throughput --concurrency 1 4 16 --compare results.json
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from benchmarks.synthetic_pdf import make_document
+from benchmarks.upload_memory import peak_rss_mb, wait_until_ready
+
+# Metric name -> True if higher is better
+METRICS = {
+    "docs_per_sec": True,
+    "pages_per_sec": True,
+    "p50_ms": False,
+    "p99_ms": False,
+    "peak_rss_mb": False,
+}
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile."""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def reset_peak_rss() -> None:
+    """Reset this process's peak RSS so each level is measured on its own."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+def summarize(mode: str, kind: str, concurrency: int, pages: int, latencies: List[float],
+              ok: int, seconds: float, peak_rss: float) -> dict:
+    return {
+        "mode": mode,
+        "kind": kind,
+        "concurrency": concurrency,
+        "documents": len(latencies),
+        "ok": ok,
+        "seconds": round(seconds, 3),
+        "docs_per_sec": round(ok / seconds, 2),
+        "pages_per_sec": round(ok * pages / seconds, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "peak_rss_mb": round(peak_rss, 1),
+    }
+
+def run_service_level(documents: List[bytes], concurrency: int, latency: float, fields_per_page: int) -> Tuple[List[float], int, float]:
+    from app.services.extraction_service import ExtractionService
+    from benchmarks.fake_llm import FakeLLMService
+
+    service = ExtractionService()
+    service.llm_service = FakeLLMService(latency, fields_per_page)
+    latencies: List[float] = []
+    ok = 0
+
+    async def run() -> float:
+        nonlocal ok
+        if service.parse_pool:
+            await service.parse_pool.start()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def process(i: int, pdf: bytes) -> None:
+            nonlocal ok
+            async with semaphore:
+                started = time.perf_counter()
+                result = await service.process_document(pdf, f"doc{i}.pdf")
+                latencies.append(time.perf_counter() - started)
+                ok += "error" not in result
+
+        started = time.perf_counter()
+        await asyncio.gather(*(process(i, pdf) for i, pdf in enumerate(documents)))
+        return time.perf_counter() - started
+
+    try:
+        seconds = asyncio.run(run())
+    finally:
+        service.close()
+    return latencies, ok, seconds
+
+def run_api_level(documents: List[bytes], concurrency: int, latency: float, fields_per_page: int, port: int) -> Tuple[List[float], int, float, float]:
+    url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{workdir}/bench.db",
+            UPLOAD_DIR=os.path.join(workdir, "uploads"),
+            DOCUMENT_STORE_DIR=os.path.join(workdir, "documents"),
+            LLM_CACHE_ENABLED="false",
+        )
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.serve", "--port", str(port),
+             "--latency", str(latency), "--fields-per-page", str(fields_per_page)],
+            env=env
+        )
+        try:
+            wait_until_ready(url)
+
+            def upload(i: int) -> Tuple[float, bool]:
+                files = [("files", (f"doc{i}.pdf", documents[i], "application/pdf"))]
+                started = time.perf_counter()
+                status = requests.post(f"{url}/api/upload", files=files).status_code
+                return time.perf_counter() - started, status == 200
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                outcomes = list(pool.map(upload, range(len(documents))))
+            elapsed = time.perf_counter() - started
+            return [t for t, _ in outcomes], sum(ok for _, ok in outcomes), elapsed, peak_rss_mb(server.pid)
+        finally:
+            server.terminate()
+            server.wait()
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def print_header() -> None:
+    print(f"{'mode':>7} {'kind':>5} {'conc':>5} {'ok':>5} {'docs/s':>8} {'pages/s':>8} "
+          f"{'p50 ms':>9} {'p99 ms':>9} {'peak MB':>8}")
+
+def print_row(row: dict) -> None:
+    print(
+        f"{row['mode']:>7} {row['kind']:>5} {row['concurrency']:>5} {row['ok']:>5} "
+        f"{row['docs_per_sec']:>8} {row['pages_per_sec']:>8} {row['p50_ms']:>9} "
+        f"{row['p99_ms']:>9} {row['peak_rss_mb']:>8}"
+    )
+
+def compare(baseline: dict, run: dict, threshold: float) -> bool:
+    """Print per-metric changes against a baseline run; return True if any regressed."""
+    results = run["results"]
+    for name in ("documents", "pages", "latency", "fields_per_page"):
+        if baseline["config"].get(name) != run["config"][name]:
+            print(f"Warning: --{name.replace('_', '-')} differs from the baseline "
+                  f"({baseline['config'].get(name)} vs. {run['config'][name]})")
+    key: Callable[[dict], tuple] = lambda row: (row["mode"], row["kind"], row["concurrency"])
+    previous: Dict[tuple, dict] = {key(row): row for row in baseline["results"]}
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'} from {baseline.get('created')}"
+          f" (regression threshold {threshold}%)")
+    regressed = False
+    for row in results:
+        old = previous.get(key(row))
+        if old is None:
+            continue
+        changes = []
+        for metric, higher_is_better in METRICS.items():
+            if not old[metric]:
+                continue
+            change = (row[metric] - old[metric]) / old[metric] * 100
+            worse = -change if higher_is_better else change
+            flag = " !" if worse > threshold else ""
+            regressed |= bool(flag)
+            changes.append(f"{metric} {change:+.1f}%{flag}")
+        print(f"{row['mode']:>7} {row['kind']:>5} {row['concurrency']:>5}  " + ", ".join(changes))
+    return regressed
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modes", nargs="+", choices=["service", "api"], default=["service", "api"])
+    parser.add_argument("--kinds", nargs="+", choices=["text", "table"], default=["text", "table"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--documents", type=int, default=16, help="documents per level")
+    parser.add_argument("--pages", type=int, default=10, help="pages per document")
+    parser.add_argument("--latency", type=float, default=0.2, help="fake LLM seconds per request")
+    parser.add_argument("--fields-per-page", type=int, default=10, help="fake LLM response size")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--output", help="write results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+    os.environ.setdefault("LLM_CACHE_ENABLED", "false")
+
+    results = []
+    print_header()
+    for kind in args.kinds:
+        documents = [make_document(args.pages, kind=kind, seed=i) for i in range(args.documents)]
+        for mode in args.modes:
+            for concurrency in args.concurrency:
+                if mode == "service":
+                    reset_peak_rss()
+                    latencies, ok, seconds = run_service_level(
+                        documents, concurrency, args.latency, args.fields_per_page
+                    )
+                    peak = peak_rss_mb(os.getpid())
+                else:
+                    latencies, ok, seconds, peak = run_api_level(
+                        documents, concurrency, args.latency, args.fields_per_page, args.port
+                    )
+                results.append(summarize(mode, kind, concurrency, args.pages, latencies, ok, seconds, peak))
+                print_row(results[-1])
+
+    run = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "threshold")},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(run, f, indent=2)
+        print(f"Saved results to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(baseline, run, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Peak server RSS while handling concurrent uploads.
+
+Starts a fresh API process (with the fake LLM) for each concurrency level,
+posts that many large PDFs at once to /api/upload and reads the server's
+peak resident set size (VmHWM, Linux only).
+
+    python -m benchmarks.upload_memory --concurrency 1 2 4 8 --size-mb 8
+"""
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from benchmarks.synthetic_pdf import make_document
+
+def peak_rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    raise RuntimeError("VmHWM not available")
+
+def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            requests.get(f"{url}/api/llm/stats", timeout=1)
+            return
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    raise RuntimeError("Server did not start")
+
+def run_level(concurrency: int, pdf: bytes, port: int, latency: float) -> dict:
+    url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as workdir:
+        env = dict(
+            os.environ,
+            DATABASE_URL=f"sqlite:///{workdir}/bench.db",
+            UPLOAD_DIR=os.path.join(workdir, "uploads"),
+            MAX_UPLOAD_SIZE=str(len(pdf) + 1),
+            LLM_CACHE_ENABLED="false",
+        )
+        server = subprocess.Popen(
+            [sys.executable, "-m", "benchmarks.serve", "--port", str(port), "--latency", str(latency)],
+            env=env
+        )
+        try:
+            wait_until_ready(url)
+            baseline = peak_rss_mb(server.pid)
+
+            def upload(i: int) -> int:
+                files = [("files", (f"doc{i}.pdf", pdf, "application/pdf"))]
+                return requests.post(f"{url}/api/upload", files=files).status_code
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as pool:
+                statuses = list(pool.map(upload, range(concurrency)))
+            elapsed = time.perf_counter() - started
+            return {
+                "concurrency": concurrency,
+                "ok": statuses.count(200),
+                "seconds": round(elapsed, 2),
+                "baseline_rss_mb": round(baseline, 1),
+                "peak_rss_mb": round(peak_rss_mb(server.pid), 1),
+            }
+        finally:
+            server.terminate()
+            server.wait()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--size-mb", type=float, default=8.0)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    pdf = make_document(args.pages, pad_bytes=int(args.size_mb * 1024 * 1024))
+    print(f"PDF size: {len(pdf) / 1024 / 1024:.1f}MB, {args.pages} pages")
+    print(f"{'concurrency':>11} {'ok':>4} {'seconds':>8} {'baseline MB':>12} {'peak MB':>8} {'delta MB':>9}")
+    for concurrency in args.concurrency:
+        row = run_level(concurrency, pdf, args.port, args.latency)
+        print(
+            f"{row['concurrency']:>11} {row['ok']:>4} {row['seconds']:>8} "
+            f"{row['baseline_rss_mb']:>12} {row['peak_rss_mb']:>8} "
+            f"{row['peak_rss_mb'] - row['baseline_rss_mb']:>9.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
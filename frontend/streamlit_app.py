@@ -1,17 +1,19 @@
 import streamlit as st
 import requests
 import json
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Tuple
 import os
 from PIL import Image
 import io
 import base64
-from pdf2image import convert_from_bytes
 import tempfile
 
 # API Configuration
 API_URL = "http://localhost:8000/api"
 
+# Pages are rendered by the API at this width for the viewer
+VIEWER_WIDTH = 800
+
 # Configure Streamlit page
 st.set_page_config(
     layout="wide",
@@ -34,6 +36,71 @@ def upload_documents(files: List[Any]) -> List[Dict[str, Any]]:
         return []
     return response.json()
 
+def stream_documents(files: List[Any]) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Upload documents and yield (event, data) pairs as the API streams results."""
+    files_data = []
+    for file in files:
+        files_data.append(
+            ("files", (file.name, file.getvalue(), "application/pdf"))
+        )
+
+    response = requests.post(f"{API_URL}/upload/stream", files=files_data, stream=True)
+    if response.status_code != 200:
+        st.error(f"Error uploading documents: {response.text}")
+        return
+    event = None
+    for line in response.iter_lines(decode_unicode=True):
+        if line.startswith("event: "):
+            event = line[len("event: "):]
+        elif line.startswith("data: "):
+            yield event, json.loads(line[len("data: "):])
+
+def process_documents_streaming(files: List[Any]) -> List[Dict[str, Any]]:
+    """Show each page's fields as soon as the API reports them.
+
+    The progress view is cleared once everything is processed, and the
+    processed documents are returned for the regular viewer.
+    """
+    documents = []
+    errors = []
+    progress = st.empty()
+    with progress.container():
+        panels = {}
+        for event, data in stream_documents(files):
+            if event == "document":
+                with st.expander(f"Processing: {data['filename']}", expanded=True):
+                    panels[data["index"]] = {
+                        "status": st.empty(),
+                        "table": st.empty(),
+                        "rows": [],
+                        "pages": 0,
+                        "total_pages": data["total_pages"]
+                    }
+            elif event == "page":
+                panel = panels[data["index"]]
+                panel["pages"] += 1
+                for field in data["fields"]:
+                    panel["rows"].append({
+                        "Field": field['field_name'],
+                        "Value": field['field_value'],
+                        "Section": field['section_name'],
+                        "Page": field['page_number']
+                    })
+                panel["status"].write(
+                    f"{panel['pages']} of {panel['total_pages']} pages done "
+                    f"({data['elapsed_ms'] / 1000:.1f}s)"
+                )
+                panel["table"].table(sorted(panel["rows"], key=lambda row: row["Page"]))
+            elif event == "complete":
+                documents.append(data["document"])
+            elif event == "error":
+                errors.append(f"Error processing {data['filename']}: {data['detail']}")
+    progress.empty()
+
+    for error in errors:
+        st.error(error)
+    return documents
+
 def get_document_fields(doc_id: int) -> List[Dict[str, Any]]:
     """Get extracted fields for a document."""
     response = requests.get(f"{API_URL}/documents/{doc_id}/fields")
@@ -50,34 +117,46 @@ def get_page_details(doc_id: int, page_number: int) -> Dict[str, Any]:
         return {}
     return response.json()
 
-def display_pdf_page(pdf_bytes: bytes, page_number: int, total_pages: int) -> None:
-    """Display a PDF page with bounding boxes."""
-    # Convert PDF page to image
-    images = convert_from_bytes(pdf_bytes, first_page=page_number, last_page=page_number)
-    if not images:
-        st.error("Could not convert PDF page to image")
-        return
-    
-    # Display the image
-    st.image(images[0], use_container_width=True)
+@st.cache_data(max_entries=64, show_spinner=False)
+def get_page_image(doc_id: int, page_number: int, width: int) -> bytes:
+    """Fetch a rendered page image. Cached so reruns do not refetch it."""
+    response = requests.get(
+        f"{API_URL}/documents/{doc_id}/pages/{page_number}/image",
+        params={"width": width, "format": "webp"}
+    )
+    response.raise_for_status()
+    return response.content
+
+def set_page(key: str, page_number: int) -> None:
+    st.session_state[key] = page_number
+
+def display_pdf_page(doc_id: int, total_pages: int) -> None:
+    """Display the current page of a document, fetched from the API."""
+    key = f"page_{doc_id}"
+    page_number = st.session_state.setdefault(key, 1)
+    try:
+        image = get_page_image(doc_id, page_number, VIEWER_WIDTH)
+    except requests.RequestException as e:
+        st.error(f"Could not load page image: {str(e)}")
+    else:
+        st.image(image, use_container_width=True)
     
-    # Add page navigation controls
+    # Add page navigation controls. Callbacks update the page before the
+    # rerun, so the new page is the one rendered.
     col1, col2, col3 = st.columns([1, 2, 1])
     with col1:
         if page_number > 1:
-            if st.button("Previous Page"):
-                st.session_state.current_page = page_number - 1
+            st.button("Previous Page", key=f"prev_{doc_id}", on_click=set_page, args=(key, page_number - 1))
     with col2:
         st.write(f"Page {page_number} of {total_pages}")
     with col3:
         if page_number < total_pages:
-            if st.button("Next Page"):
-                st.session_state.current_page = page_number + 1
+            st.button("Next Page", key=f"next_{doc_id}", on_click=set_page, args=(key, page_number + 1))
 
 def main():
-    # Initialize session state for page navigation
-    if 'current_page' not in st.session_state:
-        st.session_state.current_page = 1
+    # Processed documents survive reruns, e.g. when changing pages
+    if 'documents' not in st.session_state:
+        st.session_state.documents = []
 
     # Custom CSS for better layout and dark theme support
     st.markdown("""
@@ -127,43 +206,48 @@ def main():
             st.error("Maximum 5 documents allowed per upload")
             return
 
+        stream_results = st.checkbox("Show results as pages finish", value=True)
         if st.button("Process Documents"):
             with st.spinner("Processing documents..."):
                 # Upload documents
-                documents = upload_documents(uploaded_files)
+                if stream_results:
+                    documents = process_documents_streaming(uploaded_files)
+                else:
+                    documents = upload_documents(uploaded_files)
                 
                 if documents:
                     st.success(f"Successfully processed {len(documents)} documents")
-                    
-                    # Create tabs for each document
-                    for doc in documents:
-                        with st.expander(f"Document: {doc['filename']}", expanded=True):
-                            # Get document fields
-                            fields = get_document_fields(doc['id'])
-                            
-                            # Create two columns with better proportions (2:3 ratio)
-                            col1, col2 = st.columns([2, 3])
-                            
-                            with col1:
-                                st.subheader("Document Viewer")
-                                # Display PDF page with bounding boxes
-                                display_pdf_page(uploaded_files[0].getvalue(), st.session_state.current_page, doc['total_pages'])
-                            
-                            with col2:
-                                st.subheader("Extracted Fields")
-                                # Display fields in a table with better formatting
-                                if fields:
-                                    field_data = []
-                                    for field in fields:
-                                        field_data.append({
-                                            "Field": field['field_name'],
-                                            "Value": field['field_value'],
-                                            "Section": field['section_name'],
-                                            "Page": field['page_number']
-                                        })
-                                    st.table(field_data)
-                                else:
-                                    st.info("No fields extracted from this document")
+                    st.session_state.documents = documents
+
+    # Create tabs for each document
+    for doc in st.session_state.documents:
+        with st.expander(f"Document: {doc['filename']}", expanded=True):
+            # Get document fields
+            fields = get_document_fields(doc['id'])
+            
+            # Create two columns with better proportions (2:3 ratio)
+            col1, col2 = st.columns([2, 3])
+            
+            with col1:
+                st.subheader("Document Viewer")
+                # Display only the page being viewed, rendered by the API
+                display_pdf_page(doc['id'], doc['total_pages'])
+            
+            with col2:
+                st.subheader("Extracted Fields")
+                # Display fields in a table with better formatting
+                if fields:
+                    field_data = []
+                    for field in fields:
+                        field_data.append({
+                            "Field": field['field_name'],
+                            "Value": field['field_value'],
+                            "Section": field['section_name'],
+                            "Page": field['page_number']
+                        })
+                    st.table(field_data)
+                else:
+                    st.info("No fields extracted from this document")
 
 if __name__ == "__main__":
     main()
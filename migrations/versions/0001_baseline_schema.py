@@ -0,0 +1,68 @@
+"""Baseline schema.
+
+The documents and extracted_fields tables as the original app created them
+with create_all. Databases created before migrations were introduced should
+be stamped at this revision before upgrading.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17 01:39:04.239627
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('filename', sa.String(), nullable=True),
+    sa.Column('upload_date', sa.DateTime(), nullable=True),
+    sa.Column('total_pages', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_documents_filename'), ['filename'], unique=False)
+        batch_op.create_index(batch_op.f('ix_documents_id'), ['id'], unique=False)
+
+    op.create_table('extracted_fields',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('document_id', sa.Integer(), nullable=True),
+    sa.Column('field_name', sa.String(), nullable=True),
+    sa.Column('field_value', sa.String(), nullable=True),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('bounding_box_x', sa.Float(), nullable=True),
+    sa.Column('bounding_box_y', sa.Float(), nullable=True),
+    sa.Column('bounding_box_width', sa.Float(), nullable=True),
+    sa.Column('bounding_box_height', sa.Float(), nullable=True),
+    sa.Column('section_name', sa.String(), nullable=True),
+    sa.Column('page_number', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('extracted_fields', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_extracted_fields_id'), ['id'], unique=False)
+
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('extracted_fields', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_extracted_fields_id'))
+
+    op.drop_table('extracted_fields')
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_documents_id'))
+        batch_op.drop_index(batch_op.f('ix_documents_filename'))
+
+    op.drop_table('documents')
@@ -0,0 +1,79 @@
+"""Background ingestion jobs and their per-page progress.
+
+Before migrations, create_all may already have created these tables on an
+existing database, possibly without the page error column; those parts are
+skipped.
+
+Revision ID: 0001a
+Revises: 0001
+Create Date: 2026-10-17 01:39:04.239627
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001a'
+down_revision: Union[str, Sequence[str], None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    tables = inspector.get_table_names()
+    if 'ingestion_jobs' not in tables:
+        op.create_table('ingestion_jobs',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('filename', sa.String(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('file_path', sa.String(), nullable=True),
+        sa.Column('document_id', sa.Integer(), nullable=True),
+        sa.Column('total_pages', sa.Integer(), nullable=True),
+        sa.Column('pages_completed', sa.Integer(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('ingestion_jobs', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_ingestion_jobs_id'), ['id'], unique=False)
+            batch_op.create_index(batch_op.f('ix_ingestion_jobs_status'), ['status'], unique=False)
+
+    if 'ingestion_job_pages' not in tables:
+        op.create_table('ingestion_job_pages',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('job_id', sa.Integer(), nullable=True),
+        sa.Column('page_number', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(), nullable=True),
+        sa.Column('field_count', sa.Integer(), nullable=True),
+        sa.Column('error', sa.String(), nullable=True),
+        sa.Column('completed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['job_id'], ['ingestion_jobs.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('ingestion_job_pages', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_ingestion_job_pages_id'), ['id'], unique=False)
+            batch_op.create_index(batch_op.f('ix_ingestion_job_pages_job_id'), ['job_id'], unique=False)
+    elif 'error' not in {column['name'] for column in inspector.get_columns('ingestion_job_pages')}:
+        with op.batch_alter_table('ingestion_job_pages', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('error', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('ingestion_job_pages', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ingestion_job_pages_job_id'))
+        batch_op.drop_index(batch_op.f('ix_ingestion_job_pages_id'))
+
+    op.drop_table('ingestion_job_pages')
+    with op.batch_alter_table('ingestion_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ingestion_jobs_status'))
+        batch_op.drop_index(batch_op.f('ix_ingestion_jobs_id'))
+
+    op.drop_table('ingestion_jobs')
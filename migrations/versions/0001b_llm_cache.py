@@ -0,0 +1,47 @@
+"""LLM extraction result cache.
+
+Skipped if create_all already created the table before migrations.
+
+Revision ID: 0001b
+Revises: 0001a
+Create Date: 2026-10-17 01:39:04.239627
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001b'
+down_revision: Union[str, Sequence[str], None] = '0001a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if 'llm_cache' in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table('llm_cache',
+    sa.Column('key', sa.String(), nullable=False),
+    sa.Column('model', sa.String(), nullable=True),
+    sa.Column('prompt_version', sa.String(), nullable=True),
+    sa.Column('response', sa.Text(), nullable=True),
+    sa.Column('size_bytes', sa.Integer(), nullable=True),
+    sa.Column('hits', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('last_accessed', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('key')
+    )
+    with op.batch_alter_table('llm_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_llm_cache_last_accessed'), ['last_accessed'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('llm_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_llm_cache_last_accessed'))
+
+    op.drop_table('llm_cache')
@@ -0,0 +1,40 @@
+"""LLM request and token counts per document.
+
+Before migrations, create_all may already have added these columns on an
+existing database; those are skipped.
+
+Revision ID: 0001c
+Revises: 0001b
+Create Date: 2026-10-17 01:39:04.239627
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001c'
+down_revision: Union[str, Sequence[str], None] = '0001b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('documents')}
+    missing = [name for name in ('llm_requests', 'prompt_tokens', 'completion_tokens') if name not in columns]
+    if not missing:
+        return
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        for name in missing:
+            batch_op.add_column(sa.Column(name, sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_column('completion_tokens')
+        batch_op.drop_column('prompt_tokens')
+        batch_op.drop_column('llm_requests')
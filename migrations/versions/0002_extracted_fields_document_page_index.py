@@ -0,0 +1,36 @@
+"""Index extracted fields by document and page.
+
+Revision ID: 0002
+Revises: 0001c
+Create Date: 2026-10-17 01:45:12.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, Sequence[str], None] = '0001c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Before migrations, create_all may already have created the index on an
+    # existing database
+    op.create_index(
+        'ix_extracted_fields_document_id_page_number',
+        'extracted_fields',
+        ['document_id', 'page_number'],
+        unique=False,
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_extracted_fields_document_id_page_number', table_name='extracted_fields')
@@ -0,0 +1,125 @@
+"""Search over extracted fields.
+
+Adds parsed number and date columns with field_name composite indexes for
+structured search, and on SQLite an FTS5 index kept in sync by triggers.
+Existing rows are backfilled. Columns and indexes that create_all already
+added to an existing database before migrations are skipped.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17 02:10:37.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.helpers import parse_date, parse_number
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, Sequence[str], None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+FTS_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS extracted_fields_fts USING fts5(
+        field_name, field_value, description,
+        content='extracted_fields', content_rowid='id'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS extracted_fields_fts_insert AFTER INSERT ON extracted_fields BEGIN
+        INSERT INTO extracted_fields_fts(rowid, field_name, field_value, description)
+        VALUES (new.id, new.field_name, new.field_value, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS extracted_fields_fts_delete AFTER DELETE ON extracted_fields BEGIN
+        INSERT INTO extracted_fields_fts(extracted_fields_fts, rowid, field_name, field_value, description)
+        VALUES ('delete', old.id, old.field_name, old.field_value, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS extracted_fields_fts_update AFTER UPDATE ON extracted_fields BEGIN
+        INSERT INTO extracted_fields_fts(extracted_fields_fts, rowid, field_name, field_value, description)
+        VALUES ('delete', old.id, old.field_name, old.field_value, old.description);
+        INSERT INTO extracted_fields_fts(rowid, field_name, field_value, description)
+        VALUES (new.id, new.field_name, new.field_value, new.description);
+    END""",
+)
+
+BACKFILL_BATCH_SIZE = 10000
+
+
+def backfill_values() -> None:
+    conn = op.get_bind()
+    fields = sa.table(
+        'extracted_fields',
+        sa.column('id', sa.Integer),
+        sa.column('field_value', sa.String),
+        sa.column('value_number', sa.Float),
+        sa.column('value_date', sa.Date),
+    )
+    update = fields.update().where(fields.c.id == sa.bindparam('row_id')).values(
+        value_number=sa.bindparam('number'),
+        value_date=sa.bindparam('date'),
+    )
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(fields.c.id, fields.c.field_value)
+            .where(fields.c.id > last_id)
+            .order_by(fields.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        params = [
+            {'row_id': row.id, 'number': parse_number(row.field_value), 'date': parse_date(row.field_value)}
+            for row in rows
+            if row.field_value
+        ]
+        params = [p for p in params if p['number'] is not None or p['date'] is not None]
+        if params:
+            conn.execute(update, params)
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('extracted_fields')}
+    columns = [
+        sa.Column('value_number', sa.Float(), nullable=True),
+        sa.Column('value_date', sa.Date(), nullable=True),
+    ]
+    columns = [column for column in columns if column.name not in existing]
+    if columns:
+        with op.batch_alter_table('extracted_fields', schema=None) as batch_op:
+            for column in columns:
+                batch_op.add_column(column)
+    for name, columns in (
+        ('ix_extracted_fields_field_name_field_value', ['field_name', 'field_value']),
+        ('ix_extracted_fields_field_name_value_number', ['field_name', 'value_number']),
+        ('ix_extracted_fields_field_name_value_date', ['field_name', 'value_date']),
+    ):
+        op.create_index(name, 'extracted_fields', columns, unique=False, if_not_exists=True)
+
+    if op.get_bind().dialect.name == 'sqlite':
+        for statement in FTS_DDL:
+            op.execute(statement)
+        # Index the rows that existed before the triggers
+        op.execute("INSERT INTO extracted_fields_fts(extracted_fields_fts) VALUES ('rebuild')")
+
+    backfill_values()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'sqlite':
+        for name in ('insert', 'delete', 'update'):
+            op.execute(f"DROP TRIGGER IF EXISTS extracted_fields_fts_{name}")
+        op.execute("DROP TABLE IF EXISTS extracted_fields_fts")
+
+    with op.batch_alter_table('extracted_fields', schema=None) as batch_op:
+        batch_op.drop_index('ix_extracted_fields_field_name_value_date')
+        batch_op.drop_index('ix_extracted_fields_field_name_value_number')
+        batch_op.drop_index('ix_extracted_fields_field_name_field_value')
+        batch_op.drop_column('value_date')
+        batch_op.drop_column('value_number')
@@ -0,0 +1,34 @@
+"""Add the content hash of each document's stored PDF.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17 01:51:17.060659
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: Union[str, Sequence[str], None] = '0003'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Before migrations, create_all may already have added the column
+    if 'content_hash' not in {column['name'] for column in sa.inspect(op.get_bind()).get_columns('documents')}:
+        with op.batch_alter_table('documents', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('content_hash', sa.String(), nullable=True))
+    op.create_index(op.f('ix_documents_content_hash'), 'documents', ['content_hash'], unique=False, if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_documents_content_hash'))
+        batch_op.drop_column('content_hash')
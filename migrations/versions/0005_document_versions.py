@@ -0,0 +1,62 @@
+"""Document versions and per-page fingerprints.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17 02:13:26.941529
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, Sequence[str], None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Before migrations, create_all may already have created the table and
+    # columns on an existing database; those parts are skipped
+    inspector = sa.inspect(op.get_bind())
+    if 'page_fingerprints' not in inspector.get_table_names():
+        op.create_table('page_fingerprints',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('document_id', sa.Integer(), nullable=True),
+        sa.Column('page_number', sa.Integer(), nullable=True),
+        sa.Column('fingerprint', sa.String(), nullable=True),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('page_fingerprints', schema=None) as batch_op:
+            batch_op.create_index('ix_page_fingerprints_document_id_page_number', ['document_id', 'page_number'], unique=True)
+            batch_op.create_index(batch_op.f('ix_page_fingerprints_id'), ['id'], unique=False)
+
+    if 'version' not in {column['name'] for column in inspector.get_columns('documents')}:
+        with op.batch_alter_table('documents', schema=None) as batch_op:
+            batch_op.add_column(sa.Column('version', sa.Integer(), nullable=True))
+            batch_op.add_column(sa.Column('previous_version_id', sa.Integer(), nullable=True))
+            batch_op.create_index(batch_op.f('ix_documents_previous_version_id'), ['previous_version_id'], unique=False)
+            batch_op.create_foreign_key('fk_documents_previous_version_id', 'documents', ['previous_version_id'], ['id'])
+
+    # Existing documents are the first version of themselves
+    op.execute("UPDATE documents SET version = 1 WHERE version IS NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('documents', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_documents_previous_version_id', type_='foreignkey')
+        batch_op.drop_index(batch_op.f('ix_documents_previous_version_id'))
+        batch_op.drop_column('previous_version_id')
+        batch_op.drop_column('version')
+
+    with op.batch_alter_table('page_fingerprints', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_page_fingerprints_id'))
+        batch_op.drop_index('ix_page_fingerprints_document_id_page_number')
+
+    op.drop_table('page_fingerprints')
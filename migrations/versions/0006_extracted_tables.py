@@ -0,0 +1,68 @@
+"""Tables detected on pages and their rows.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17 02:17:20.286636
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, Sequence[str], None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Before migrations, create_all may already have created these tables
+    tables = sa.inspect(op.get_bind()).get_table_names()
+    if 'extracted_tables' not in tables:
+        op.create_table('extracted_tables',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('document_id', sa.Integer(), nullable=True),
+        sa.Column('page_number', sa.Integer(), nullable=True),
+        sa.Column('section_name', sa.String(), nullable=True),
+        sa.Column('columns', sa.JSON(), nullable=True),
+        sa.Column('header', sa.JSON(), nullable=True),
+        sa.Column('row_count', sa.Integer(), nullable=True),
+        sa.Column('bounding_box_x', sa.Float(), nullable=True),
+        sa.Column('bounding_box_y', sa.Float(), nullable=True),
+        sa.Column('bounding_box_width', sa.Float(), nullable=True),
+        sa.Column('bounding_box_height', sa.Float(), nullable=True),
+        sa.ForeignKeyConstraint(['document_id'], ['documents.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('extracted_tables', schema=None) as batch_op:
+            batch_op.create_index('ix_extracted_tables_document_id_page_number', ['document_id', 'page_number'], unique=False)
+            batch_op.create_index(batch_op.f('ix_extracted_tables_id'), ['id'], unique=False)
+
+    if 'table_rows' not in tables:
+        op.create_table('table_rows',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('table_id', sa.Integer(), nullable=True),
+        sa.Column('row_index', sa.Integer(), nullable=True),
+        sa.Column('cells', sa.JSON(), nullable=True),
+        sa.ForeignKeyConstraint(['table_id'], ['extracted_tables.id'], ),
+        sa.PrimaryKeyConstraint('id')
+        )
+        with op.batch_alter_table('table_rows', schema=None) as batch_op:
+            batch_op.create_index(batch_op.f('ix_table_rows_table_id'), ['table_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('table_rows', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_table_rows_table_id'))
+
+    op.drop_table('table_rows')
+    with op.batch_alter_table('extracted_tables', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_extracted_tables_id'))
+        batch_op.drop_index('ix_extracted_tables_document_id_page_number')
+
+    op.drop_table('extracted_tables')
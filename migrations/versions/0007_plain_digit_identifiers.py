@@ -0,0 +1,61 @@
+"""Clear the numeric value of long digit-only identifiers.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 04:02:41.518330
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, Sequence[str], None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Matches MAX_PLAIN_DIGITS in app.utils.helpers when this revision was written
+MAX_PLAIN_DIGITS = 7
+
+fields = sa.table(
+    'extracted_fields',
+    sa.column('id', sa.Integer),
+    sa.column('field_value', sa.String),
+    sa.column('value_number', sa.Float),
+)
+
+
+def _identifier_rows(conn, has_number: bool):
+    """Fields whose whole value is a run of more than MAX_PLAIN_DIGITS digits."""
+    rows = conn.execute(
+        sa.select(fields.c.id, fields.c.field_value).where(
+            fields.c.value_number.isnot(None) if has_number else fields.c.value_number.is_(None),
+            sa.func.length(sa.func.trim(fields.c.field_value)) > MAX_PLAIN_DIGITS,
+        )
+    ).all()
+    return [row for row in rows if row.field_value.strip().isdigit()]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    rows = _identifier_rows(conn, has_number=True)
+    if rows:
+        conn.execute(
+            fields.update().where(fields.c.id == sa.bindparam('row_id')).values(value_number=None),
+            [{'row_id': row.id} for row in rows],
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    rows = _identifier_rows(conn, has_number=False)
+    if rows:
+        conn.execute(
+            fields.update().where(fields.c.id == sa.bindparam('row_id')).values(value_number=sa.bindparam('number')),
+            [{'row_id': row.id, 'number': float(row.field_value)} for row in rows],
+        )
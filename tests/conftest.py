@@ -0,0 +1,66 @@
+"""Point the app at a scratch database and storage before any test imports it."""
+import os
+import tempfile
+
+import pytest
+
+SCRATCH_DIR = tempfile.mkdtemp(prefix="doc-parser-tests-")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(SCRATCH_DIR, 'doc_parser.db')}",
+    "OPENAI_API_KEY": "test",
+    "UPLOAD_DIR": os.path.join(SCRATCH_DIR, "uploads"),
+    "DOCUMENT_STORE_DIR": os.path.join(SCRATCH_DIR, "documents"),
+    "RENDER_CACHE_DIR": os.path.join(SCRATCH_DIR, "renders"),
+    "LLM_BATCH_JOB_DIR": os.path.join(SCRATCH_DIR, "batches"),
+})
+
+@pytest.fixture(scope="session")
+def schema():
+    from app.database.schema import upgrade_schema
+
+    upgrade_schema()
+
+@pytest.fixture
+def database(schema):
+    """The migrated scratch database, emptied before the test."""
+    from app.database import models
+    from app.database.database import engine
+
+    with engine.begin() as connection:
+        for table in reversed(models.Base.metadata.sorted_tables):
+            connection.execute(table.delete())
+    return engine
+
+@pytest.fixture
+def api(monkeypatch, database):
+    """Start the app on the fake LLM and return a TestClient for it.
+
+    Pass an LLM service to use instead of a zero-latency FakeLLMService.
+    """
+    from fastapi.testclient import TestClient
+
+    from app import main
+    from app.config import settings
+    from app.services.extraction_service import ExtractionService
+    from app.services.rate_limiter import get_rate_limiter
+    from benchmarks.fake_llm import FakeLLMService
+
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "PDF_PARSE_WORKERS", 0)
+    get_rate_limiter.cache_clear()
+    clients = []
+
+    def start(llm_service=None) -> TestClient:
+        extraction_service = ExtractionService()
+        extraction_service.llm_service = llm_service or FakeLLMService(latency=0)
+        main.app.state.services = main.Services(extraction_service)
+        clients.append(TestClient(main.app).__enter__())
+        return clients[-1]
+
+    yield start
+    for client in clients:
+        client.__exit__(None, None, None)
+    main.app.state.services = None
+    get_rate_limiter.cache_clear()
@@ -0,0 +1,75 @@
+"""The offline benchmarks are deterministic and flag regressions against a saved run."""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.extraction_service import ExtractionService
+from app.services.rate_limiter import get_rate_limiter
+from benchmarks.fake_llm import FakeLLMService
+from benchmarks.synthetic_pdf import make_document
+from benchmarks.throughput import compare, percentile, run_service_level, summarize
+
+@pytest.fixture
+def offline(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "PDF_PARSE_WORKERS", 0)
+    get_rate_limiter.cache_clear()
+    yield
+    get_rate_limiter.cache_clear()
+
+def extract(document, **fake_options):
+    service = ExtractionService()
+    service.llm_service = FakeLLMService(latency=0, **fake_options)
+    try:
+        result = asyncio.run(service.process_document(document, "doc.pdf"))
+    finally:
+        service.close()
+    return [(f["page_number"], f["field_name"], f["field_value"]) for f in result["extracted_fields"]], result["stats"]
+
+def test_synthetic_documents_depend_only_on_their_seed():
+    assert make_document(3, seed=1) == make_document(3, seed=1)
+    assert make_document(3, seed=1) != make_document(3, seed=2)
+    assert make_document(2, kind="table", seed=1) != make_document(2, kind="text", seed=1)
+
+def test_fake_llm_answers_the_same_document_identically(offline):
+    document = make_document(4, seed=7)
+
+    first, stats = extract(document, fields_per_page=5)
+    second, _ = extract(document, fields_per_page=5)
+
+    assert first == second
+    assert sorted({page for page, _, _ in first}) == [1, 2, 3, 4]
+    assert stats["requests"] > 0 and stats["failed_requests"] == 0
+
+def test_service_level_processes_every_document(offline):
+    documents = [make_document(2, seed=i) for i in range(4)]
+
+    latencies, ok, seconds = run_service_level(documents, concurrency=2, latency=0, fields_per_page=3)
+
+    assert (len(latencies), ok) == (4, 4)
+    row = summarize("service", "text", 2, 2, latencies, ok, seconds, peak_rss=0)
+    assert row["docs_per_sec"] == round(4 / seconds, 2) and row["pages_per_sec"] == round(8 / seconds, 2)
+
+def test_percentile_is_nearest_rank():
+    samples = list(range(1, 101))
+    assert (percentile(samples, 50), percentile(samples, 99), percentile([5], 99)) == (50, 99, 5)
+
+def run_with(docs_per_sec, p99_ms):
+    row = {"mode": "service", "kind": "text", "concurrency": 4, "docs_per_sec": docs_per_sec,
+           "pages_per_sec": docs_per_sec * 10, "p50_ms": 100.0, "p99_ms": p99_ms, "peak_rss_mb": 200.0}
+    config = {"documents": 16, "pages": 10, "latency": 0.2, "fields_per_page": 10}
+    return {"created": "2026-10-17T00:00:00+00:00", "commit": "abc123", "config": config, "results": [row]}
+
+@pytest.mark.parametrize("docs_per_sec, p99_ms, regressed", [
+    (10.0, 500.0, False),
+    (9.5, 540.0, False),  # Within the 10% threshold
+    (8.0, 500.0, True),   # Throughput dropped
+    (10.0, 600.0, True),  # Latency grew
+    (12.0, 400.0, False),
+])
+def test_compare_flags_regressions_past_the_threshold(docs_per_sec, p99_ms, regressed, capsys):
+    assert compare(run_with(10.0, 500.0), run_with(docs_per_sec, p99_ms), threshold=10.0) is regressed
+    assert (" !" in capsys.readouterr().out) is regressed
@@ -0,0 +1,26 @@
+"""Fields from overlapping chunks of a split page are merged; other repeats are kept."""
+from app.schemas.field import make_field_row
+from app.services.extraction_service import ExtractionService
+
+def rows(*values: str, page_number: int = 1):
+    return [make_field_row("charge", value, None, "charges", page_number) for value in values]
+
+def test_merge_drops_fields_repeated_from_the_previous_chunk():
+    merged = ExtractionService._merge_chunks({
+        0: rows("$5.00", "$7.50"),
+        1: rows("$7.50", "$9.99"),
+        2: rows("$9.99", "$1.25")
+    })
+    assert [field["field_value"] for field in merged] == ["$5.00", "$7.50", "$9.99", "$1.25"]
+
+def test_merge_keeps_repeated_rows_within_a_chunk():
+    merged = ExtractionService._merge_chunks({
+        1: rows("$7.50", "$7.50", "$7.50"),
+        0: rows("$7.50")
+    })
+    # One of chunk 1's three rows is the overlap with chunk 0
+    assert [field["field_value"] for field in merged] == ["$7.50", "$7.50", "$7.50"]
+
+def test_finish_page_keeps_repeated_fields_of_unsplit_pages():
+    fields = rows("$7.50", "$7.50")
+    assert ExtractionService._finish_page(fields, None) == fields
@@ -0,0 +1,53 @@
+"""Pages are extracted concurrently, up to LLM_MAX_CONCURRENCY at a time."""
+import asyncio
+import math
+
+import pytest
+
+from app.config import settings
+from app.services.extraction_service import ExtractionService
+from app.services.rate_limiter import get_rate_limiter, retryable_errors
+from benchmarks.fake_llm import FakeLLMService
+from benchmarks.synthetic_pdf import make_document
+
+LATENCY = 0.3  # Seconds per fake LLM call
+
+@pytest.fixture
+def extraction_service(monkeypatch):
+    """Build an ExtractionService on the fake LLM with a given concurrency limit."""
+    services = []
+    # Import openai now so its first-use import is not part of the timing
+    retryable_errors()
+
+    def build(limit: int) -> ExtractionService:
+        monkeypatch.setattr(settings, "LLM_MAX_CONCURRENCY", limit)
+        monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+        monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 0)
+        monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 0)
+        monkeypatch.setattr(settings, "PDF_PARSE_WORKERS", 0)
+        # The shared rate limiter takes its concurrency limit from settings
+        get_rate_limiter.cache_clear()
+        service = ExtractionService()
+        service.llm_service = FakeLLMService(latency=LATENCY)
+        services.append(service)
+        return service
+
+    yield build
+    for service in services:
+        service.close()
+    get_rate_limiter.cache_clear()
+
+@pytest.mark.parametrize("pages, limit", [(8, 1), (8, 2), (8, 4), (6, 4)])
+def test_wall_clock_scales_with_concurrency_limit(extraction_service, pages, limit):
+    service = extraction_service(limit)
+    content = make_document(pages, kind="text")
+
+    result = asyncio.run(service.process_document(content, "statement.pdf"))
+
+    assert "error" not in result
+    assert result["stats"]["requests"] == pages  # One request per page
+    assert {field["page_number"] for field in result["extracted_fields"]} == set(range(1, pages + 1))
+    # Wall-clock time of the LLM stage, from the first call to the last result
+    elapsed = result["stats"]["timings"]["llm_ms"] / 1000
+    expected = math.ceil(pages / limit) * LATENCY
+    assert expected <= elapsed < expected + LATENCY, f"{pages} pages at limit {limit} took {elapsed:.2f}s"
@@ -0,0 +1,77 @@
+"""A processed document is written with one executemany insert per kind of row."""
+from datetime import date
+
+import pytest
+from sqlalchemy import event
+
+from app.database import models
+from app.database.crud import create_document, search_fields
+from app.database.database import SessionLocal
+from app.schemas.document import DocumentCreate
+from app.schemas.field import make_field_row
+
+STATS = {
+    "requests": 2,
+    "prompt_tokens": 300,
+    "completion_tokens": 40,
+    "failed_pages": [2],
+    "page_fingerprints": ["a" * 64, "b" * 64, "c" * 64],
+}
+
+@pytest.fixture
+def db(database):
+    session = SessionLocal()
+    yield session
+    session.close()
+
+@pytest.fixture
+def statements(database):
+    """Record each INSERT sent to the database with its number of parameter sets."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT"):
+            table = statement.split()[2]
+            executed.append((table, len(parameters) if executemany else 1))
+
+    event.listen(database, "before_cursor_execute", record)
+    yield executed
+    event.remove(database, "before_cursor_execute", record)
+
+def test_document_rows_are_inserted_in_bulk(db, statements):
+    fields = [
+        make_field_row(f"field_{i}", value, "Synthetic field", "body", page_number)
+        for i, (value, page_number) in enumerate([("$1,234.50", 1), ("March 5, 2024", 1), ("Acme Utilities", 3)])
+    ]
+    table = {
+        "page_number": 3, "section_name": "call_details", "columns": ["date", "amount"], "header": None,
+        "rows": [["2024-03-05", "$3.40"], ["2024-03-06", "$0.85"]],
+        "bounding_box_x": 0.0, "bounding_box_y": 0.0, "bounding_box_width": 0.0, "bounding_box_height": 0.0,
+    }
+
+    document = create_document(
+        db, DocumentCreate(filename="statement.pdf", total_pages=3), STATS, fields, "f" * 64, tables=[table]
+    )
+    db.commit()
+
+    assert statements == [
+        ("documents", 1), ("extracted_fields", 3), ("extracted_tables", 1), ("table_rows", 2), ("page_fingerprints", 2)
+    ]
+    stored = db.query(models.ExtractedField).filter_by(document_id=document.id).order_by(models.ExtractedField.id).all()
+    assert [(f.field_value, f.page_number, f.value_number, f.value_date) for f in stored] == [
+        ("$1,234.50", 1, 1234.5, None), ("March 5, 2024", 1, None, date(2024, 3, 5)), ("Acme Utilities", 3, None, None)
+    ]
+    assert (document.version, document.llm_requests, document.content_hash) == (1, 2, "f" * 64)
+    # The failed page has no fingerprint, so a new version extracts it again
+    assert [p.page_number for p in db.query(models.PageFingerprint).filter_by(document_id=document.id)] == [1, 3]
+
+def test_bulk_inserted_fields_are_searchable(db):
+    fields = [make_field_row("provider", "Acme Utilities", "Provider name", "header", 1)]
+    document = create_document(db, DocumentCreate(filename="statement.pdf", total_pages=1), STATS, fields)
+    db.commit()
+
+    hits, _ = search_fields(db, limit=10, q="acme")
+
+    assert [(field.document_id, field.field_value, filename) for field, filename in hits] == [
+        (document.id, "Acme Utilities", "statement.pdf")
+    ]
@@ -0,0 +1,69 @@
+"""Field exports stream NDJSON, CSV and Parquet a batch of rows at a time."""
+import csv
+import io
+import json
+
+import pytest
+
+from app.database.crud import create_document
+from app.database.database import SessionLocal
+from app.schemas.document import DocumentCreate
+from app.schemas.field import make_field_row
+from app.services.export_service import COLUMN_NAMES, ExportService
+
+STATS = {"requests": 1, "prompt_tokens": 0, "completion_tokens": 0, "failed_pages": [], "page_fingerprints": []}
+VALUES = ["$1,234.50", "March 5, 2024", "Acme Utilities"]
+
+@pytest.fixture
+def documents(database):
+    """Two documents of three fields each; returns their IDs."""
+    db = SessionLocal()
+    try:
+        ids = []
+        for filename in ("first.pdf", "second.pdf"):
+            fields = [make_field_row(f"field_{i}", value, None, "body", 1) for i, value in enumerate(VALUES)]
+            ids.append(create_document(db, DocumentCreate(filename=filename, total_pages=1), STATS, fields).id)
+        db.commit()
+        return ids
+    finally:
+        db.close()
+
+def test_ndjson_is_sent_a_batch_at_a_time(documents):
+    chunks = list(ExportService(batch_size=4).export("ndjson"))
+
+    assert [chunk.count(b"\n") for chunk in chunks] == [4, 2]
+    rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert list(rows[0]) == COLUMN_NAMES
+    assert [(row["filename"], row["field_value"]) for row in rows[:3]] == [("first.pdf", value) for value in VALUES]
+    assert (rows[0]["value_number"], rows[1]["value_date"]) == (1234.5, "2024-03-05")
+
+def test_csv_has_one_header(documents):
+    chunks = list(ExportService(batch_size=4).export("csv", field_name="field_2"))
+
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+    assert [(row["filename"], row["field_value"]) for row in rows] == [
+        ("first.pdf", "Acme Utilities"), ("second.pdf", "Acme Utilities")
+    ]
+
+def test_parquet_writes_a_row_group_per_batch(documents):
+    pq = pytest.importorskip("pyarrow.parquet")
+
+    content = b"".join(ExportService(batch_size=4).export("parquet", document_ids=[documents[1]]))
+
+    parquet = pq.ParquetFile(io.BytesIO(content))
+    assert parquet.metadata.num_row_groups == 1
+    table = parquet.read()
+    assert table.column_names == COLUMN_NAMES
+    assert table.column("field_value").to_pylist() == VALUES
+    assert set(table.column("filename").to_pylist()) == {"second.pdf"}
+
+def test_export_endpoint_streams_the_requested_format(api, documents):
+    client = api()
+
+    response = client.get("/api/export", params={"format": "csv", "document_id": documents[0]})
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="fields.csv"'
+    assert len(list(csv.DictReader(io.StringIO(response.text)))) == len(VALUES)
+
+    assert client.get("/api/export").text.count("\n") == 2 * len(VALUES)
+    assert client.get("/api/export", params={"format": "xml"}).status_code == 400
@@ -0,0 +1,32 @@
+"""Parsing typed values out of extracted field text."""
+import pytest
+
+from app.utils.helpers import parse_date, parse_number
+
+@pytest.mark.parametrize("value, number", [
+    ("$1,234.50", 1234.5),
+    ("(12.00)", -12.0),
+    ("- $ 40", -40.0),
+    ("1234567", 1234567.0),
+    ("12345678.00", 12345678.0),
+    ("$12345678", 12345678.0),
+    ("12,345,678", 12345678.0),
+])
+def test_amounts_are_parsed(value, number):
+    assert parse_number(value) == number
+
+@pytest.mark.parametrize("value", [
+    "1234567890",  # Account number
+    " 00012345678 ",
+    "555-123-4567",
+    "2026-10-17",
+    "(12.00",
+    "12 items",
+])
+def test_identifiers_are_not_numbers(value):
+    assert parse_number(value) is None
+
+def test_dates_are_parsed_in_rule_formats():
+    assert str(parse_date("Sept. 3, 2026")) == "2026-09-03"
+    assert str(parse_date("03/09/26")) == "2026-03-09"
+    assert parse_date("1234567890") is None
@@ -0,0 +1,180 @@
+"""Batch ingestion: versioning by name within the archive, and the offline batch-LLM mode."""
+import asyncio
+import json
+import os
+
+import pytest
+
+from app.config import settings
+from app.database import models
+from app.database.database import SessionLocal
+from app.services.batch_llm_service import LocalBatchBackend
+from app.services.extraction_service import ExtractionService
+from app.services.ingest_service import BatchIngestService, IngestCheckpoint, iter_pdf_paths
+from app.services.rate_limiter import get_rate_limiter
+from app.services.storage_service import DocumentStore
+from benchmarks.fake_llm import FakeLLMService
+from benchmarks.synthetic_pdf import make_pdf
+
+PAGES = [
+    ["Statement for March", "Account Number: 1234567890", "Opening balance carried over from February."],
+    ["Payments received during the period are listed on the following lines.", "Thank you for your business."],
+]
+
+@pytest.fixture
+def ingest(monkeypatch, tmp_path, database):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "PDF_PARSE_WORKERS", 0)
+    monkeypatch.setattr(settings, "RULE_EXTRACTION_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_BATCH_MAX_PAGES", 1)  # One LLM request per page
+    get_rate_limiter.cache_clear()
+    services = []
+
+    def run(files, batch_backend=None, **options):
+        service = ExtractionService()
+        service.llm_service = FakeLLMService(latency=0)
+        services.append(service)
+        ingest_service = BatchIngestService(
+            service, DocumentStore(str(tmp_path / "store")), IngestCheckpoint(str(tmp_path / "checkpoint.jsonl")),
+            llm_batch_backend=batch_backend(service.llm_service) if batch_backend else None,
+            **options
+        )
+        return asyncio.run(ingest_service.run(files))
+
+    yield run
+    for service in services:
+        service.close()
+    get_rate_limiter.cache_clear()
+
+def write_pdf(path, pages):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(make_pdf(pages))
+    return str(path)
+
+def stored_documents():
+    db = SessionLocal()
+    try:
+        return [
+            (document.filename, document.version, document.previous_version_id, document.llm_requests)
+            for document in db.query(models.Document).order_by(models.Document.id)
+        ]
+    finally:
+        db.close()
+
+def test_directory_files_are_versioned_by_relative_path(ingest, tmp_path):
+    write_pdf(tmp_path / "in" / "a" / "statement.pdf", PAGES)
+    write_pdf(tmp_path / "in" / "b" / "statement.pdf", PAGES + [["This page was added in the second file and has not been extracted before."]])
+
+    progress = ingest(list(iter_pdf_paths([str(tmp_path / "in")])), versioning=True)
+
+    assert progress.completed == 2
+    assert sorted(document[:3] for document in stored_documents()) == [
+        ("a/statement.pdf", 1, None), ("b/statement.pdf", 1, None)
+    ]
+
+def test_same_name_in_one_run_becomes_the_next_version(ingest, tmp_path):
+    first = write_pdf(tmp_path / "a" / "statement.pdf", PAGES)
+    second = write_pdf(tmp_path / "b" / "statement.pdf", PAGES + [["This page was added in the second file and has not been extracted before."]])
+
+    ingest(list(iter_pdf_paths([first, second])), versioning=True, concurrency=1)
+
+    (_, _, _, first_requests), (name, version, previous_id, second_requests) = stored_documents()
+    assert (name, version) == ("statement.pdf", 2)
+    assert previous_id is not None
+    # The first file was committed before the second was extracted, so its
+    # two pages were reused and only the new page went to the LLM
+    assert (first_requests, second_requests) == (2, 1)
+
+def test_concurrent_same_name_files_get_distinct_versions(ingest, tmp_path):
+    files = [
+        (write_pdf(tmp_path / str(i) / "statement.pdf", [[f"Statement number {i} for the period."]]), "statement.pdf")
+        for i in range(4)
+    ]
+
+    ingest(files, versioning=True, concurrency=4, batch_size=2)
+
+    assert sorted(version for _, version, _, _ in stored_documents()) == [1, 2, 3, 4]
+
+class FlakyBatchBackend(LocalBatchBackend):
+    """Leaves pages marked MISSING out of the output and answers pages marked REJECTED with an error line."""
+
+    def __init__(self, llm_service, watched_dir):
+        super().__init__(llm_service)
+        self.watched_dir = watched_dir
+        self.open_files = None
+
+    def submit(self, input_path):
+        if os.path.isdir("/proc/self/fd"):
+            self.open_files = [
+                target for target in (os.path.realpath(f"/proc/self/fd/{fd}") for fd in os.listdir("/proc/self/fd"))
+                if target.startswith(self.watched_dir)
+            ]
+        return super().submit(input_path)
+
+    def poll(self, job_id, output_path):
+        with open(self._jobs[job_id]) as f:
+            requests = {request["custom_id"]: json.dumps(request["body"]) for request in map(json.loads, f)}
+        super().poll(job_id, output_path)
+        with open(output_path) as f:
+            results = [json.loads(line) for line in f]
+        with open(output_path, "w") as out:
+            for result in results:
+                body = requests[result["custom_id"]]
+                if "MISSING" in body:
+                    continue
+                if "REJECTED" in body:
+                    result = {
+                        "custom_id": result["custom_id"],
+                        "response": {"status_code": 400, "body": {"error": {"message": "Invalid request"}}},
+                        "error": None
+                    }
+                out.write(json.dumps(result) + "\n")
+        return True
+
+def test_batch_mode_stores_fields_and_reports_failed_pages(ingest, tmp_path):
+    inputs = tmp_path / "in"
+    write_pdf(inputs / "complete.pdf", PAGES)
+    write_pdf(inputs / "partial.pdf", [
+        PAGES[0],
+        ["MISSING from the batch output, so this page has no result at all."],
+        ["REJECTED by the batch job, so this page gets an error line instead."],
+    ])
+    (inputs / "broken.pdf").write_bytes(b"not a pdf")
+    backends = []
+
+    def backend(llm_service):
+        backends.append(FlakyBatchBackend(llm_service, str(inputs)))
+        return backends[-1]
+
+    progress = ingest(list(iter_pdf_paths([str(inputs)])), batch_backend=backend)
+
+    assert (progress.completed, progress.failed) == (2, 1)
+    # Documents waiting for the job had already closed their PDFs
+    assert backends[0].open_files in (None, [])
+
+    db = SessionLocal()
+    try:
+        pages = {
+            document.filename: sorted({field.page_number for field in document.extracted_fields})
+            for document in db.query(models.Document)
+        }
+        fingerprinted = {
+            document.filename: sorted(fingerprint.page_number for fingerprint in db.query(models.PageFingerprint)
+                                      .filter(models.PageFingerprint.document_id == document.id))
+            for document in db.query(models.Document)
+        }
+    finally:
+        db.close()
+    assert pages == {"complete.pdf": [1, 2], "partial.pdf": [1]}
+    # Failed pages are not fingerprinted, so a later version extracts them again
+    assert fingerprinted == {"complete.pdf": [1, 2], "partial.pdf": [1]}
+
+    with open(tmp_path / "checkpoint.jsonl") as f:
+        entries = {os.path.basename(entry["path"]): entry for entry in map(json.loads, f)}
+    assert {name: entry["status"] for name, entry in entries.items()} == {
+        "complete.pdf": "done", "partial.pdf": "done", "broken.pdf": "failed"
+    }
+    assert entries["broken.pdf"]["error"].startswith("Invalid PDF file")
+    assert all(entries[name]["document_id"] for name in ("complete.pdf", "partial.pdf"))
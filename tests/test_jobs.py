@@ -0,0 +1,66 @@
+"""Background ingestion jobs report per-page progress and the fields extracted so far."""
+import threading
+import time
+
+from app.config import settings
+from benchmarks.fake_llm import FakeLLMService
+from benchmarks.synthetic_pdf import make_pdf
+
+PAGES = [
+    ["Statement for March", "Opening balance carried over from the previous statement period."],
+    ["Payments received during the period are listed on the following lines."],
+    ["Thank you for your business, and please keep this statement for your records."],
+]
+
+class GatedLLMService(FakeLLMService):
+    """Holds back the answer for the last page until ``release`` is set."""
+
+    def __init__(self):
+        super().__init__(latency=0, fields_per_page=3)
+        self.release = threading.Event()
+
+    def _send_completion(self, **kwargs):
+        if PAGES[-1][0] in kwargs["messages"][-1]["content"]:
+            assert self.release.wait(timeout=10)
+        return super()._send_completion(**kwargs)
+
+def wait_for_job(client, job_id, until):
+    for _ in range(200):
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if until(job):
+            return job
+        time.sleep(0.05)
+    raise AssertionError(f"Job {job_id} stuck at {job}")
+
+def test_job_reports_completed_pages_before_it_finishes(api, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BATCH_MAX_PAGES", 1)  # One LLM request per page
+    monkeypatch.setattr(settings, "RULE_EXTRACTION_ENABLED", False)
+    llm_service = GatedLLMService()
+    client = api(llm_service)
+
+    response = client.post("/api/jobs", files=[("files", ("statement.pdf", make_pdf(PAGES), "application/pdf"))])
+    assert response.status_code == 202
+    (job,) = response.json()
+    assert job["status"] == "queued"
+
+    partial = wait_for_job(client, job["id"], lambda job: job["pages_completed"] == len(PAGES) - 1)
+    assert (partial["status"], partial["total_pages"]) == ("processing", len(PAGES))
+    assert sorted(page["page_number"] for page in partial["pages"]) == [1, 2]
+    assert sorted({field["page_number"] for field in partial["extracted_fields"]}) == [1, 2]
+
+    llm_service.release.set()
+    done = wait_for_job(client, job["id"], lambda job: job["status"] not in ("queued", "processing"))
+    assert (done["status"], done["pages_completed"], done["error"]) == ("completed", len(PAGES), None)
+    assert len(done["extracted_fields"]) == 3 * len(PAGES)
+    document = client.get(f"/api/documents/{done['document_id']}").json()
+    assert (document["filename"], document["llm_requests"]) == ("statement.pdf", len(PAGES))
+
+def test_unreadable_upload_fails_its_job(api):
+    client = api()
+
+    (job,) = client.post("/api/jobs", files=[("files", ("broken.pdf", b"not a pdf", "application/pdf"))]).json()
+
+    done = wait_for_job(client, job["id"], lambda job: job["status"] not in ("queued", "processing"))
+    assert done["status"] == "failed"
+    assert done["error"].startswith("Invalid PDF file")
+    assert [job["id"] for job in client.get("/api/jobs", params={"status": "failed"}).json()] == [done["id"]]
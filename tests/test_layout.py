@@ -0,0 +1,73 @@
+"""Bounding boxes come from the word positions in the PDF, not from the LLM."""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.extraction_service import ExtractionService
+from app.services.layout_index import ASCENT, AVERAGE_CHAR_WIDTH, BOX_SCALE
+from app.services.pdf_service import ParsedPDF
+from app.services.rate_limiter import get_rate_limiter
+from benchmarks.fake_llm import FakeLLMService
+from benchmarks.synthetic_pdf import LINE_HEIGHT, PAGE_HEIGHT, PAGE_WIDTH, make_pdf
+
+FONT_SIZE = 9  # As set by make_pdf, with lines starting at x=40, y=40 from the top
+PAGE = ["Statement for March", "Account Number: 1234567890", "Amount Due: $42.00 by March 5, 2024", "Payment: 42"]
+
+@pytest.fixture
+def layout():
+    with ParsedPDF(make_pdf([PAGE]), with_layout=True) as pdf:
+        return pdf.page_layout(1)
+
+def expected_box(line, column, length):
+    advance = FONT_SIZE * AVERAGE_CHAR_WIDTH
+    baseline = 40 + line * LINE_HEIGHT
+    return (
+        round((40 + column * advance) * BOX_SCALE / PAGE_WIDTH, 1),
+        round((baseline - FONT_SIZE * ASCENT) * BOX_SCALE / PAGE_HEIGHT, 1),
+        round(length * advance * BOX_SCALE / PAGE_WIDTH, 1),
+        round(FONT_SIZE * BOX_SCALE / PAGE_HEIGHT, 1),
+    )
+
+def test_words_keep_their_text_and_order(layout):
+    assert len(layout) == 15
+    assert [layout.word(i) for i in range(3)] == ["Statement", "for", "March"]
+    assert layout.text_without({0, 1, 2}) == " ".join(PAGE[1:])
+
+def test_value_box_is_found_by_position(layout):
+    assert layout.find_box("1234567890") == expected_box(1, 16, 10)
+    # Case and spacing of the value do not matter; a multi-word value spans its words
+    assert layout.find_box("account  NUMBER:") == expected_box(1, 0, 15)
+
+def test_whole_word_match_is_preferred_over_substring(layout):
+    # "42" occurs first inside "$42.00" and then as a word of its own
+    assert layout.find_box("42") == expected_box(3, 9, 2)
+    # A value found only inside a word gets the whole word's box
+    assert layout.find_box("arch") == expected_box(0, 14, 5)
+
+def test_unknown_value_has_no_box(layout):
+    assert layout.find_box("not on the page") is None
+    assert layout.find_box("   ") is None
+
+def test_extracted_fields_get_layout_boxes(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "PDF_PARSE_WORKERS", 0)
+    monkeypatch.setattr(settings, "LAYOUT_BOUNDING_BOXES", True)
+    get_rate_limiter.cache_clear()
+    service = ExtractionService()
+    service.llm_service = FakeLLMService(latency=0)
+    try:
+        result = asyncio.run(service.process_document(make_pdf([PAGE]), "statement.pdf"))
+    finally:
+        service.close()
+        get_rate_limiter.cache_clear()
+
+    boxes = {
+        field["field_value"]: (field["bounding_box_x"], field["bounding_box_y"],
+                               field["bounding_box_width"], field["bounding_box_height"])
+        for field in result["extracted_fields"]
+    }
+    assert boxes["1234567890"] == expected_box(1, 16, 10)
+    assert boxes["$42.00"] == expected_box(2, 12, 6)
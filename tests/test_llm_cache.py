@@ -0,0 +1,62 @@
+"""Cache lookups only read; hit counts, access times and the size are kept in memory."""
+import sqlite3
+
+import pytest
+
+from app.config import settings
+from app.database import models
+from app.database.database import SessionLocal, engine
+from app.services.cache_service import LLMCache
+
+FIELDS = [{"field_name": "total", "field_value": "$12.00"}]
+
+def stored_entries():
+    db = SessionLocal()
+    try:
+        return {entry.key: entry.hits for entry in db.query(models.LLMCacheEntry)}
+    finally:
+        db.close()
+
+@pytest.fixture
+def cache(database):
+    return LLMCache(max_bytes=1024)
+
+def test_hits_are_counted_in_memory_and_written_in_bulk(cache):
+    cache.set("a", "model", "v1", FIELDS)
+    cache.set("b", "model", "v1", FIELDS)
+
+    assert cache.get("a") == FIELDS
+    assert cache.get("a") == FIELDS
+    assert cache.get("missing") is None
+    assert stored_entries() == {"a": 0, "b": 0}
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 1, 2)
+    assert stored_entries() == {"a": 2, "b": 0}
+
+def test_hit_while_another_connection_writes(cache):
+    cache.set("a", "model", "v1", FIELDS)
+    writer = sqlite3.connect(engine.url.database, isolation_level=None)
+    try:
+        writer.execute("BEGIN IMMEDIATE")
+        assert cache.get("a") == FIELDS
+        writer.execute("ROLLBACK")
+    finally:
+        writer.close()
+    assert cache.hits == 1 and cache.misses == 0
+
+def test_least_recently_used_entries_are_evicted(cache, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ACCESS_FLUSH_INTERVAL", 3600)
+    entry_size = len('[{"field_name": "total", "field_value": "$12.00"}]')
+    count = cache.max_bytes // entry_size
+    for i in range(count):
+        cache.set(str(i), "model", "v1", FIELDS)
+    assert cache.evictions == 0
+
+    # Reading the oldest entry makes it the most recent, though only in memory
+    assert cache.get("0") == FIELDS
+    cache.set("new", "model", "v1", FIELDS)
+
+    assert cache.evictions == 1
+    assert "0" in stored_entries() and "1" not in stored_entries()
+    assert cache.stats()["size_bytes"] == count * entry_size
@@ -0,0 +1,89 @@
+"""Pages go to the cheapest model first and are escalated when its answer fails validation."""
+import asyncio
+import json
+
+import openai
+import pytest
+
+from app.config import settings
+from app.services.extraction_service import ExtractionService
+from app.services.model_cascade import ModelCascade
+from app.services.rate_limiter import get_rate_limiter
+from benchmarks.fake_llm import FakeLLMService
+from benchmarks.synthetic_pdf import make_document
+
+CHEAP, STRONG = "cheap-model", "strong-model"
+PAGES = 4
+
+@pytest.fixture
+def extract(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "PDF_PARSE_WORKERS", 0)
+    monkeypatch.setattr(settings, "RULE_EXTRACTION_ENABLED", False)
+    monkeypatch.setattr(settings, "TABLE_EXTRACTION_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_BATCH_MAX_PAGES", 1)  # One LLM request per page
+    monkeypatch.setattr(settings, "LLM_MODEL_TIERS", [CHEAP, STRONG])
+    monkeypatch.setattr(settings, "LLM_MODEL_PRICES", {CHEAP: [1.0, 1.0], STRONG: [10.0, 10.0]})
+    get_rate_limiter.cache_clear()
+
+    def run(llm_service):
+        service = ExtractionService()
+        service.llm_service = llm_service
+        try:
+            result = asyncio.run(service.process_document(make_document(PAGES, seed=3), "doc.pdf"))
+        finally:
+            service.close()
+        return result, llm_service.cascade.stats()
+
+    yield run
+    get_rate_limiter.cache_clear()
+
+def test_valid_cheap_answers_are_accepted(extract):
+    result, stats = extract(FakeLLMService(latency=0, fields_per_page=3))
+
+    assert (stats[CHEAP]["accepted"], stats[STRONG]["requests"]) == (PAGES, 0)
+    assert (result["stats"]["requests"], result["stats"]["escalated_requests"]) == (PAGES, 0)
+
+def test_invalid_cheap_answers_are_escalated(extract):
+    result, stats = extract(FakeLLMService(latency=0, fields_per_page=3, invalid_rate=1.0))
+
+    assert (stats[CHEAP]["escalated"], stats[CHEAP]["escalation_rate"]) == (PAGES, 1.0)
+    assert stats[STRONG]["accepted"] == PAGES
+    assert stats[STRONG]["cost_usd"] > stats[CHEAP]["cost_usd"] > 0
+    assert result["stats"]["escalated_requests"] == PAGES
+    # Only the strong model's answers, with values from the text, are kept
+    assert "invented" not in {field["field_value"] for field in result["extracted_fields"]}
+
+class FailingCheapModel(FakeLLMService):
+    def _send_completion(self, **kwargs):
+        if kwargs["model"] == CHEAP:
+            raise openai.OpenAIError("model unavailable")
+        return super()._send_completion(**kwargs)
+
+def test_failed_cheap_requests_are_escalated(extract):
+    result, stats = extract(FailingCheapModel(latency=0, fields_per_page=3))
+
+    assert (stats[CHEAP]["failed"], stats[STRONG]["accepted"]) == (PAGES, PAGES)
+    assert result["stats"]["failed_pages"] == []
+    assert len(result["extracted_fields"]) == 3 * PAGES
+
+@pytest.mark.parametrize("content, problem", [
+    ("not json", "malformed JSON"),
+    (json.dumps({"fields": "none"}), "malformed fields"),
+    (json.dumps({"fields": [{"field_name": "total"}]}), "field without a name or value"),
+    (json.dumps({"fields": [{"field_name": "total", "field_value": "$5", "page_number": 1}]}), "too few fields for pages [2]"),
+    (json.dumps({"fields": [
+        {"field_name": "total", "field_value": "$5", "page_number": 1},
+        {"field_name": "name", "field_value": "Invented Name", "page_number": 2},
+    ]}), "only 1 of 2 values found in the text"),
+    (json.dumps({"fields": [
+        {"field_name": "total", "field_value": "$5", "page_number": 1},
+        {"field_name": "name", "field_value": "acme  UTILITIES", "page_number": 2},
+    ]}), None),
+])
+def test_validation_reports_the_first_problem(content, problem):
+    cascade = ModelCascade([CHEAP, STRONG], prices={}, min_fields_per_page=1, min_verbatim_ratio=1.0)
+
+    assert cascade.validate(content, "Total: $5\nAcme Utilities", [1, 2])[1] == problem
@@ -0,0 +1,82 @@
+"""Each document is opened once, and each page's text is extracted once."""
+import asyncio
+
+import pytest
+from PyPDF2 import PdfReader, PageObject
+
+from app.config import settings
+from app.services.extraction_service import ExtractionService
+from app.services.pdf_service import ParsedPDF
+from app.services.rate_limiter import get_rate_limiter
+from benchmarks.fake_llm import FakeLLMService
+from benchmarks.synthetic_pdf import make_pdf
+
+PAGES = [
+    ["Statement for March", "Opening balance carried over from the previous statement period."],
+    ["Payments received during the period are listed on the following lines."],
+    ["Thank you for your business, and please keep this statement for your records."],
+]
+
+@pytest.fixture
+def extraction_service(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "PDF_PARSE_WORKERS", 0)
+    get_rate_limiter.cache_clear()
+    service = ExtractionService()
+    service.llm_service = FakeLLMService(latency=0)
+    yield service
+    service.close()
+    get_rate_limiter.cache_clear()
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    """Count PdfReader constructions and page text extractions."""
+    calls = {"readers": 0, "pages": 0}
+    init, extract_text = PdfReader.__init__, PageObject.extract_text
+
+    def counting_init(self, *args, **kwargs):
+        calls["readers"] += 1
+        init(self, *args, **kwargs)
+
+    def counting_extract_text(self, *args, **kwargs):
+        calls["pages"] += 1
+        return extract_text(self, *args, **kwargs)
+
+    monkeypatch.setattr(PdfReader, "__init__", counting_init)
+    monkeypatch.setattr(PageObject, "extract_text", counting_extract_text)
+    return calls
+
+@pytest.mark.parametrize("from_path", [False, True])
+def test_document_is_parsed_once(extraction_service, parse_calls, tmp_path, from_path):
+    content = make_pdf(PAGES)
+    source = content
+    if from_path:
+        source = tmp_path / "statement.pdf"
+        source.write_bytes(content)
+        source = str(source)
+
+    result = asyncio.run(extraction_service.process_document(source, "statement.pdf"))
+
+    assert "error" not in result
+    assert result["document"].total_pages == len(PAGES)
+    assert {field["page_number"] for field in result["extracted_fields"]} == {1, 2, 3}
+    assert parse_calls == {"readers": 1, "pages": len(PAGES)}
+
+def test_page_text_is_cached_and_survives_close(tmp_path):
+    path = tmp_path / "statement.pdf"
+    path.write_bytes(make_pdf(PAGES))
+
+    with ParsedPDF(str(path)) as pdf:
+        texts = pdf.texts()
+        assert pdf.page_text(1) is texts[0]
+    pdf.close()
+
+    assert pdf.texts() == texts == ParsedPDF(path.read_bytes()).texts()
+    assert texts[1] == " ".join(PAGES[1])
+
+def test_invalid_pdf_is_reported_without_raising(extraction_service):
+    result = asyncio.run(extraction_service.process_document(b"not a pdf", "broken.pdf"))
+
+    assert result["error"].startswith("Invalid PDF file")
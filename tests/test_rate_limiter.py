@@ -0,0 +1,108 @@
+"""OpenAI calls are retried on 429s, with the AIMD concurrency limit backing off and recovering."""
+import json
+from typing import Callable, Optional
+
+import httpx
+import pytest
+from openai import OpenAI
+
+from app.config import settings
+from app.services.llm_service import ExtractionRequest, LLMRequestError, LLMService
+from app.services.rate_limiter import get_rate_limiter
+
+MAX_CONCURRENCY = 4
+MAX_RETRIES = 3
+
+COMPLETION = {
+    "id": "chatcmpl-test",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "test",
+    "choices": [{
+        "index": 0,
+        "message": {"role": "assistant", "content": json.dumps({"fields": []})},
+        "finish_reason": "stop"
+    }],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15}
+}
+
+class StubServer:
+    """Answers chat completions with ``throttled`` 429s, then 200s."""
+
+    def __init__(self, throttled: int, on_request: Optional[Callable[[], None]] = None):
+        self.throttled = throttled
+        self.on_request = on_request
+        self.calls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        if self.on_request:
+            self.on_request()
+        if self.calls <= self.throttled:
+            return httpx.Response(429, headers={"retry-after": "0"}, json={"error": {"message": "Rate limit reached"}})
+        return httpx.Response(200, json=COMPLETION)
+
+@pytest.fixture
+def llm_service(monkeypatch):
+    """Build an LLMService whose OpenAI client talks to a stub server."""
+    monkeypatch.setattr(settings, "LLM_MAX_CONCURRENCY", MAX_CONCURRENCY)
+    monkeypatch.setattr(settings, "LLM_MAX_RETRIES", MAX_RETRIES)
+    monkeypatch.setattr(settings, "LLM_RETRY_BASE_DELAY", 0.01)
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+
+    def build(server: StubServer) -> LLMService:
+        get_rate_limiter.cache_clear()
+        service = LLMService()
+        service._client = OpenAI(
+            api_key="test",
+            max_retries=0,
+            http_client=httpx.Client(transport=httpx.MockTransport(server))
+        )
+        return service
+
+    yield build
+    get_rate_limiter.cache_clear()
+
+def complete(service: LLMService):
+    return service._create_completion(model="test", messages=[{"role": "user", "content": "Extract fields"}])
+
+def test_retries_throttled_requests(llm_service):
+    server = StubServer(throttled=2)
+    service = llm_service(server)
+
+    response = complete(service)
+
+    assert response.choices[0].message.content == json.dumps({"fields": []})
+    assert server.calls == 3
+    stats = service.rate_limiter.stats()
+    assert (stats["throttled"], stats["retries"], stats["succeeded"], stats["failed"]) == (2, 2, 1, 0)
+
+def test_concurrency_limit_halves_on_429_and_recovers(llm_service):
+    limits = []
+    server = StubServer(throttled=2, on_request=lambda: limits.append(service.rate_limiter.concurrency.limit))
+    service = llm_service(server)
+
+    complete(service)
+    # Halved by each 429, then grown by 1/limit on the success
+    assert limits == [4, 2, 1]
+    assert service.rate_limiter.stats()["concurrency_limit"] == 2
+
+    for _ in range(10):
+        complete(service)
+    assert service.rate_limiter.stats()["concurrency_limit"] == MAX_CONCURRENCY
+
+def test_raises_llm_request_error_when_retries_run_out(llm_service):
+    server = StubServer(throttled=1000)
+    service = llm_service(server)
+
+    with pytest.raises(LLMRequestError):
+        service.extract_request(ExtractionRequest([(1, "Account Number: 1234567890")]))
+
+    # Every model tier is tried, each with all of its retries
+    tiers = len(service.cascade.models)
+    assert server.calls == tiers * (MAX_RETRIES + 1)
+    stats = service.rate_limiter.stats()
+    assert (stats["retries"], stats["failed"], stats["succeeded"]) == (tiers * MAX_RETRIES, tiers, 0)
+    assert stats["concurrency_limit"] == 1
@@ -0,0 +1,71 @@
+"""Regex rules pick out common fields before the LLM, which only sees the rest of the page."""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.extraction_service import ExtractionService
+from app.services.rate_limiter import get_rate_limiter
+from app.services.rule_extractor import RuleExtractor
+from benchmarks.fake_llm import FakeLLMService
+from benchmarks.synthetic_pdf import make_pdf
+
+@pytest.fixture
+def extraction_service(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "PDF_PARSE_WORKERS", 0)
+    monkeypatch.setattr(settings, "RULE_EXTRACTION_ENABLED", True)
+    get_rate_limiter.cache_clear()
+    service = ExtractionService()
+    service.llm_service = FakeLLMService(latency=0, fields_per_page=2)
+    yield service
+    service.close()
+    get_rate_limiter.cache_clear()
+
+def fields_of(text):
+    fields, remaining = RuleExtractor().extract(text, page_number=3)
+    return [(field["field_name"], field["field_value"]) for field in fields], remaining
+
+@pytest.mark.parametrize("text, expected", [
+    ("Account No. AB-12345", [("account_number", "AB-12345")]),
+    ("Due Date: March 5, 2024", [("due_date", "March 5, 2024")]),
+    ("Statement date 03/01/2024", [("statement_date", "03/01/2024")]),
+    ("Total Amount Due: $1,234.56", [("total_amount_due", "$1,234.56")]),
+    ("Write to billing@example.com", [("email_address", "billing@example.com")]),
+    ("Call (415) 555-1234 or +1 212.555.9876", [("phone_number", "(415) 555-1234"), ("phone_number", "+1 212.555.9876")]),
+    ("Paid 2024-02-28 a refund of -$5.00", [("date", "2024-02-28"), ("amount", "-$5.00")]),
+    ("Nothing to see on this line", []),
+])
+def test_rules_match_common_fields(text, expected):
+    assert fields_of(text)[0] == expected
+
+def test_labeled_rules_win_over_bare_patterns():
+    fields, remaining = fields_of("Balance $20.00 paid on 2024-03-05, then Amount Due $7.50")
+
+    assert fields == [("balance", "$20.00"), ("date", "2024-03-05"), ("amount_due", "$7.50")]
+    assert remaining == "paid on , then"
+
+def test_fields_carry_page_and_parsed_values():
+    (field,), _ = RuleExtractor().extract("Total: $1,234.56", page_number=3)
+
+    assert (field["page_number"], field["section_name"], field["value_number"]) == (3, "billing_summary", 1234.56)
+
+def test_page_covered_by_rules_skips_the_llm(extraction_service):
+    pages = [
+        ["Account Number: 1234567890", "Due Date: 2024-03-05", "Amount Due: $42.00"],
+        ["Payments received during the period are listed on the following lines.", "Total: $42.00"],
+    ]
+
+    result = asyncio.run(extraction_service.process_document(make_pdf(pages), "statement.pdf"))
+
+    stats = result["stats"]
+    assert (stats["rule_fields"], stats["llm_pages_skipped"], stats["requests"]) == (4, 1, 1)
+    assert stats["tokens_saved"] > 0
+    by_page = {}
+    for field in result["extracted_fields"]:
+        by_page.setdefault(field["page_number"], []).append(field["field_name"])
+    assert by_page[1] == ["account_number", "due_date", "amount_due"]
+    # Page 2 gets its rule field and the LLM's fields for the remaining text
+    assert by_page[2].count("total") == 1 and len(by_page[2]) == 3
@@ -0,0 +1,50 @@
+"""Importing the app is cheap: heavy dependencies load on first use and the schema is left to Alembic."""
+import functools
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, inspect
+
+from app import main
+from app.database.schema import SchemaOutOfDateError, check_schema
+from benchmarks.import_time import DEFERRED_PACKAGES, measure
+
+@pytest.mark.parametrize("module", ["app.main", "app.cli"])
+def test_import_defers_heavy_dependencies(module):
+    _, _, packages = measure(module)
+
+    assert set(DEFERRED_PACKAGES).isdisjoint(packages)
+
+def test_import_does_not_touch_the_database(tmp_path):
+    database = tmp_path / "fresh.db"
+
+    subprocess.run(
+        [sys.executable, "-c", "import app.main"],
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{database}"},
+        check=True
+    )
+
+    assert not database.exists() or inspect(create_engine(f"sqlite:///{database}")).get_table_names() == []
+
+def test_schema_check_requires_the_latest_migration(tmp_path, schema):
+    unmigrated = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+
+    with pytest.raises(SchemaOutOfDateError, match="no revision.*alembic upgrade head"):
+        check_schema(unmigrated)
+    check_schema()  # The migrated scratch database
+
+def test_app_does_not_start_on_an_unmigrated_database(tmp_path, monkeypatch):
+    unmigrated = create_engine(f"sqlite:///{tmp_path / 'fresh.db'}")
+    monkeypatch.setattr(main, "check_schema", functools.partial(check_schema, unmigrated))
+
+    def services():
+        pytest.fail("Services were started before the schema check")
+
+    monkeypatch.setattr(main, "Services", services)
+
+    with pytest.raises(SchemaOutOfDateError):
+        with TestClient(main.app):
+            pass
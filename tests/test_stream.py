@@ -0,0 +1,51 @@
+"""Uploads streamed over Server-Sent Events report each document, page by page, in order."""
+import json
+import os
+
+from app.config import settings
+from benchmarks.synthetic_pdf import make_pdf
+
+PAGES = [
+    ["Statement for March", "Opening balance carried over from the previous statement period."],
+    ["Payments received during the period are listed on the following lines."],
+]
+
+def parse_events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        assert event.startswith("event: ") and data.startswith("data: ")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+def test_events_arrive_in_order_per_document(api, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BATCH_MAX_PAGES", 1)
+    client = api()
+
+    response = client.post("/api/upload/stream", files=[
+        ("files", ("first.pdf", make_pdf(PAGES), "application/pdf")),
+        ("files", ("broken.pdf", b"not a pdf", "application/pdf")),
+        ("files", ("second.pdf", make_pdf(PAGES[:1]), "application/pdf")),
+    ])
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    assert [(event, data.get("index")) for event, data in events] == [
+        ("document", 0), ("page", 0), ("page", 0), ("complete", 0),
+        ("error", 1),
+        ("document", 2), ("page", 2), ("complete", 2),
+        ("done", None),
+    ]
+    assert sorted(data["page_number"] for event, data in events[1:3]) == [1, 2]
+    assert all(data["fields"] and data["error"] is None for event, data in events if event == "page")
+    assert events[4][1]["detail"].startswith("Invalid PDF file")
+
+    complete = events[3][1]
+    assert complete["document"]["field_count"] == sum(len(data["fields"]) for _, data in events[1:3])
+    assert {"parse_ms", "store_ms", "db_ms"} <= set(complete["stats"]["timings"])
+    stored = client.get(f"/api/documents/{complete['document']['id']}").json()
+    assert (stored["filename"], len(stored["extracted_fields"])) == ("first.pdf", complete["document"]["field_count"])
+    assert events[-1][1]["documents"] == 2 and events[-1][1]["failed"] == 1
+    # Spooled uploads are moved into the document store or removed
+    assert [name for name in os.listdir(settings.UPLOAD_DIR) if name.endswith(".pdf")] == []
@@ -0,0 +1,65 @@
+"""Detected tables are taken out of the page text by word index and stored as fields too."""
+import asyncio
+
+import pytest
+
+from app.config import settings
+from app.services.extraction_service import ExtractionService
+from app.services.pdf_service import ParsedPDF, PDFService
+from app.services.rate_limiter import get_rate_limiter
+from benchmarks.fake_llm import FakeLLMService
+from benchmarks.synthetic_pdf import make_pdf
+
+ROWS = [
+    "2024-03-05  10:12     (415) 555-1234    12       $3.40",
+    "2024-03-06  08:45     (212) 555-9876     3       $0.85",
+    "2024-03-07  17:30     (415) 555-1234    41       $9.10",
+]
+PAGE = [
+    "Account Number: 1234567890",
+    f"Disputed call: {ROWS[0]}",
+    "Call details for the billing period are listed below.",
+    "Date        Time      Number            Minutes   Amount",
+    *ROWS,
+    "Thank you for your business.",
+]
+
+@pytest.fixture
+def extraction_service(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_CACHE_ENABLED", False)
+    monkeypatch.setattr(settings, "LLM_REQUESTS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "LLM_TOKENS_PER_MINUTE", 0)
+    monkeypatch.setattr(settings, "PDF_PARSE_WORKERS", 0)
+    get_rate_limiter.cache_clear()
+    service = ExtractionService()
+    service.llm_service = FakeLLMService(latency=0)
+    yield service
+    service.close()
+    get_rate_limiter.cache_clear()
+
+def test_remove_tables_keeps_identical_text_outside_the_table():
+    with ParsedPDF(make_pdf([PAGE]), with_layout=True) as pdf:
+        pdf.texts()
+        layout = pdf.page_layout(1)
+        tables = PDFService.detect_tables(layout)
+        text = ExtractionService._remove_tables(layout, tables)
+
+    assert len(tables) == 1 and len(tables[0].rows) == len(ROWS)
+    assert "Disputed call: 2024-03-05 10:12 (415) 555-1234 12 $3.40" in text
+    assert "Minutes" not in text and "$9.10" not in text
+    assert "Thank you for your business." in text
+
+def test_table_cells_become_fields(extraction_service):
+    result = asyncio.run(extraction_service.process_document(make_pdf([PAGE]), "calls.pdf"))
+
+    assert result["stats"]["tables"] == 1
+    table_fields = [field for field in result["extracted_fields"] if field["section_name"] == "call_details"]
+    assert len(table_fields) == len(ROWS) * 5
+    first_row = [field for field in table_fields if field["description"] == "Row 1 of the call_details table"]
+    assert [(field["field_name"], field["field_value"]) for field in first_row] == [
+        ("column_0", "2024-03-05"), ("column_1", "10:12"), ("column_2", "(415) 555-1234"),
+        ("column_3", "12"), ("column_4", "$3.40")
+    ]
+    # Each cell keeps its own box, not the first match of its value on the page
+    assert len({field["bounding_box_y"] for field in table_fields}) == len(ROWS)
+    assert all(field["bounding_box_width"] > 0 for field in table_fields)
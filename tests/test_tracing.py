@@ -0,0 +1,45 @@
+"""Traced requests get a Server-Timing header; untraced ones pass through untouched."""
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.main import TraceMiddleware
+from app.utils import metrics
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.add_middleware(TraceMiddleware)
+
+    @app.get("/work")
+    def work():
+        with metrics.stage("parse"):
+            pass
+        return {"ok": True}
+
+    return TestClient(app)
+
+def test_traced_request_reports_stages():
+    client = make_client()
+    for response in (client.get("/work", headers={"X-Trace": "1"}), client.get("/work", params={"trace": "1"})):
+        assert response.status_code == 200
+        stages = [entry.split(";")[0] for entry in response.headers["Server-Timing"].split(", ")]
+        assert stages == ["parse", "request"]
+
+def test_untraced_request_is_passed_through():
+    client = make_client()
+    response = client.get("/work", params={"trace": "0"})
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
+
+def test_untraced_request_keeps_the_server_send():
+    calls = []
+
+    async def app(scope, receive, send):
+        calls.append(send)
+
+    async def send(message):
+        pass
+
+    asyncio.run(TraceMiddleware(app)({"type": "http", "headers": [], "query_string": b""}, None, send))
+    assert calls == [send]
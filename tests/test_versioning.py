@@ -0,0 +1,55 @@
+"""A re-uploaded document becomes a new version and only its changed pages go to the LLM."""
+from app.config import settings
+from benchmarks.synthetic_pdf import make_pdf
+
+COVER = ["Statement for March", "Opening balance carried over from the previous statement period."]
+PAYMENTS = ["Payments received during the period are listed on the following lines."]
+CLOSING = ["Thank you for your business, and please keep this statement for your records."]
+NOTICE = ["Notice: the terms and conditions of your plan change at the start of next month."]
+
+def upload(client, pages, filename="statement.pdf"):
+    response = client.post("/api/upload", files=[("files", (filename, make_pdf(pages), "application/pdf"))])
+    assert response.status_code == 200
+    (document,) = response.json()
+    return document
+
+def fields_by_page(document):
+    pages = {}
+    for field in document["extracted_fields"]:
+        pages.setdefault(field["page_number"], []).append((field["field_name"], field["field_value"]))
+    return pages
+
+def test_unchanged_pages_are_reused_from_the_previous_version(api, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_BATCH_MAX_PAGES", 1)  # One LLM request per page
+    monkeypatch.setattr(settings, "DOCUMENT_VERSIONING", True)
+    client = api()
+    first = upload(client, [COVER, PAYMENTS, CLOSING])
+
+    # A page is inserted at the front and the closing page is changed
+    second = upload(client, [NOTICE, COVER, PAYMENTS, CLOSING + ["Page 4 of 4"]])
+
+    assert (first["version"], second["version"], second["previous_version_id"]) == (1, 2, first["id"])
+    assert (first["llm_requests"], second["llm_requests"]) == (3, 2)
+    old, new = fields_by_page(first), fields_by_page(second)
+    # Reused fields follow their page to its new position
+    assert (new[2], new[3]) == (old[1], old[2])
+    assert new[4] != old[3]
+
+    # Re-uploading the new version unchanged needs no LLM requests at all
+    third = upload(client, [NOTICE, COVER, PAYMENTS, CLOSING + ["Page 4 of 4"]])
+    assert (third["version"], third["llm_requests"]) == (3, 0)
+    assert fields_by_page(third) == new
+
+def test_other_filenames_and_disabled_versioning_start_over(api, monkeypatch):
+    monkeypatch.setattr(settings, "DOCUMENT_VERSIONING", True)
+    client = api()
+    upload(client, [COVER, PAYMENTS])
+
+    other = upload(client, [COVER, PAYMENTS], filename="other.pdf")
+    assert (other["version"], other["previous_version_id"]) == (1, None)
+    assert other["llm_requests"] > 0
+
+    monkeypatch.setattr(settings, "DOCUMENT_VERSIONING", False)
+    unversioned = upload(client, [COVER, PAYMENTS])
+    assert (unversioned["version"], unversioned["previous_version_id"]) == (1, None)
+    assert unversioned["llm_requests"] == other["llm_requests"]